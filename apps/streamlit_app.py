@@ -17,6 +17,7 @@ from talus_standard_report.constants import (
     SELECTBOX_DEFAULT,
     STANDARD_REPORT_TITLE,
 )
+from talus_standard_report.engines.detection_counts import get_unique_peptides_proteins
 from talus_standard_report.figures.file_size_dataframe import FileSizeDataFrame
 from talus_standard_report.figures.nuclear_protein_overlap_figure import (
     NuclearProteinOverlapFigure,
@@ -34,13 +35,21 @@ from talus_standard_report.figures.peptide_intensities_scatter_matrix_figure imp
 from talus_standard_report.figures.protein_intensities_heatmap import (
     ProteinIntensitiesHeatmap,
 )
+from talus_standard_report.figures.protein_overlap_upset_figure import (
+    ProteinOverlapUpSetFigure,
+)
+from talus_standard_report.figures.subcellular_location_enrichment_figure import (
+    SubcellularLocationEnrichmentFigure,
+)
 from talus_standard_report.figures.peptide_intensities_box_plot_figure import PeptideIntensitiesBoxPlotFigure
 from talus_standard_report.figures.unique_peptides_proteins_figure import (
     UniquePeptidesProteinsFigure,
 )
 from talus_standard_report.utils import (
     PDF,
+    get_data_bundle_download_link,
     get_file_to_condition_map,
+    get_html_report_download_link,
     streamlit_static_downloads_folder,
 )
 
@@ -82,15 +91,13 @@ def main() -> None:
         metadata=metadata
     )
 
-    unique_peptides_proteins = data_loader.get_unique_peptides_proteins(dataset=dataset, tool=tool_choice.lower())
     quant_proteins = data_loader.get_quant_proteins(dataset=dataset, tool=tool_choice.lower())
     quant_peptides = data_loader.get_quant_peptides(dataset=dataset, tool=tool_choice.lower())
 
     nuclear_proteins = data_loader.get_nuclear_proteins()
+    protein_locations = data_loader.get_protein_locations()
+    expected_fractions_of_locations = data_loader.get_expected_fractions_of_locations()
 
-    unique_peptides_proteins["Sample Name"] = unique_peptides_proteins[
-        "Sample Name"
-    ].apply(lambda name: file_to_condition.get(name, name))
     quant_proteins.columns = [
         file_to_condition.get(col, col)
         for col in quant_proteins.columns
@@ -100,6 +107,21 @@ def main() -> None:
         for col in quant_peptides.columns
     ]
 
+    # The counts are derived from the quant matrices, only older datasets need the download
+    quant_matrices_available = not (quant_peptides.empty or quant_proteins.empty)
+    if quant_matrices_available:
+        unique_peptides_proteins = get_unique_peptides_proteins(
+            dataset_name=dataset,
+            quant_peptides=quant_peptides,
+            quant_proteins=quant_proteins,
+        )
+    else:
+        unique_peptides_proteins = data_loader.get_unique_peptides_proteins(dataset=dataset, tool=tool_choice.lower())
+        if not unique_peptides_proteins.empty:
+            unique_peptides_proteins["Sample Name"] = unique_peptides_proteins[
+                "Sample Name"
+            ].apply(lambda name: file_to_condition.get(name, name))
+
     custom_protein_uploader = CustomProteinUploader()
 
     conditional_figures = [
@@ -127,6 +149,8 @@ def main() -> None:
                 width=900,
                 height=750,
                 downloads_path=downloads_path,
+                quant_peptides=quant_peptides if quant_matrices_available else None,
+                quant_proteins=quant_proteins if quant_matrices_available else None,
             ),
         ),
         (
@@ -144,6 +168,21 @@ def main() -> None:
                 downloads_path=downloads_path,
             ),
         ),
+        (
+            not quant_proteins.empty,
+            ProteinOverlapUpSetFigure(
+                title="An UpSet Plot showing the overlap between protein collections and the proteins detected in each sample",
+                short_title="Protein Overlap UpSet",
+                dataset_name=dataset,
+                data=quant_proteins,
+                description_placeholder="An UpSet plot showing the overlap between the selected protein sets. Each bar counts the proteins that are in exactly the sets marked below it. The bars on the left show the size of every set.",
+                width=1000,
+                height=700,
+                protein_collections=nuclear_proteins,
+                custom_protein_uploader=custom_protein_uploader,
+                downloads_path=downloads_path,
+            ),
+        ),
         (
             not quant_proteins.empty,
             GOEnrichmentFigure(
@@ -158,6 +197,25 @@ def main() -> None:
                 metadata=metadata
             ),
         ),
+        (
+            not (
+                quant_proteins.empty
+                or protein_locations.empty
+                or expected_fractions_of_locations.empty
+            ),
+            SubcellularLocationEnrichmentFigure(
+                title="Heatmap Plot mapping the Subcellular Location Enrichment",
+                short_title="Subcellular Location Enrichment",
+                dataset_name=dataset,
+                data=quant_proteins,
+                description_placeholder="A heatmap showing the enrichment of each subcellular location in each sample. The enrichment score is the fraction of the detected proteins found in a location divided by the fraction expected for that location. Scores above 1 mean a location is overrepresented.",
+                width=900,
+                height=750,
+                protein_locations=protein_locations,
+                expected_fractions_of_locations=expected_fractions_of_locations,
+                downloads_path=downloads_path,
+            ),
+        ),
         (
             not quant_peptides.empty,
             PeptideIntensitiesBoxPlotFigure(
@@ -192,6 +250,7 @@ def main() -> None:
                 short_title="Number of Peptides per Protein",
                 dataset_name=dataset,
                 data=quant_proteins,
+                quant_peptides=quant_peptides if not quant_peptides.empty else None,
                 description_placeholder="A histogram plotting the distribution of the number of peptides detected for each protein. It uses the data from the final report and therefore represents the data across all runs. The last bar to the right represents a catch-all and includes everything above this value. Ideally we should have more than two peptides for each protein but the more the better. The more peptides we have, the more confident we are in a detection. Having only one peptide could be due to randomness.",
                 width=900,
                 height=750,
@@ -246,11 +305,39 @@ def main() -> None:
         with st.spinner(text="Loading"):
             pdf = PDF()
             pdf.set_title(STANDARD_REPORT_TITLE)
-            for figure in figures:
-                if figure.is_active:
-                    pdf.print_figure(figure=figure, write_directory_path=downloads_path)
+            pdf.print_figures(
+                figures=[figure for figure in figures if figure.is_active]
+            )
+
+            html = pdf.get_html_download_link(downloads_path=downloads_path)
+            st.markdown(html, unsafe_allow_html=True)
 
-            html = pdf.get_html_download_link()
+    if st.button("Export to HTML"):
+        with st.spinner(text="Loading"):
+            html = get_html_report_download_link(
+                title=STANDARD_REPORT_TITLE,
+                figures=[figure for figure in figures if figure.is_active],
+                downloads_path=downloads_path,
+            )
+            st.markdown(html, unsafe_allow_html=True)
+
+    include_csv = st.checkbox("Include CSV files", value=False)
+    if st.button("Download data bundle"):
+        with st.spinner(text="Loading"):
+            active_figures = [figure for figure in figures if figure.is_active]
+            html = get_data_bundle_download_link(
+                dataset_name=dataset,
+                parameters={
+                    "tool": tool_choice,
+                    "figures": {
+                        str(figure.title): figure.parameters
+                        for figure in active_figures
+                    },
+                },
+                figures=active_figures,
+                downloads_path=downloads_path,
+                include_csv=include_csv,
+            )
             st.markdown(html, unsafe_allow_html=True)
 
 
@@ -1,8 +1,15 @@
 """src/talus_standard_report/components/custom_protein_uploader.py module."""
-import pandas as pd
 import streamlit as st
 
-from talus_utils.fasta import parse_fasta_header_uniprot_protein
+from talus_standard_report.constants import PROTEIN_COLLECTIONS_PATH
+from talus_standard_report.engines.protein_collections import (
+    get_protein_collection_library,
+)
+from talus_standard_report.engines.protein_lists import (
+    content_hash,
+    get_protein_list,
+    get_protein_list_format,
+)
 
 
 class CustomProteinUploader:
@@ -13,46 +20,88 @@ class CustomProteinUploader:
         self._data = set()
         self._protein_column = None
         self._use_custom_proteins = False
+        self._selected_proteins = set()
+        self._library = get_protein_collection_library(path=PROTEIN_COLLECTIONS_PATH)
 
     def display(self):
-        """Display the custom protein uploader."""
+        """Display the custom protein uploader.
+        Uploads are parsed once per content, so reruns and re-uploads are free.
+        """
         st.sidebar.header("Custom Protein List")
         self._uploaded_files = st.sidebar.file_uploader(
-            "Choose a file (.csv)", accept_multiple_files=True
+            "Choose a file (.csv, .tsv, .txt, .fasta)", accept_multiple_files=True
         )
-        for uploaded_file in self._uploaded_files:
-            custom_df = pd.read_csv(uploaded_file, sep=None)
+        self._data = set()
+        for i, uploaded_file in enumerate(self._uploaded_files):
+            content = uploaded_file.getvalue()
+            upload_hash = content_hash(content=content)
+            list_format = get_protein_list_format(
+                content_hash=upload_hash, content=content, file_name=uploaded_file.name
+            )
             st.sidebar.write(uploaded_file.name)
-            self._protein_column = st.sidebar.selectbox(
-                "Select Protein Column",
-                options=list(custom_df.columns),
-                key="custom_protein_uploader",
+            protein_column = None
+            if list_format.kind == "table":
+                self._protein_column = protein_column = st.sidebar.selectbox(
+                    "Select Protein Column",
+                    options=list(list_format.columns),
+                    key=f"custom_protein_uploader_{i}",
+                )
+            self._data.update(
+                get_protein_list(
+                    content_hash=upload_hash,
+                    content=content,
+                    list_format=list_format,
+                    protein_column=protein_column,
+                )
             )
-            custom_df[self._protein_column] = custom_df[self._protein_column].apply(
-                parse_fasta_header_uniprot_protein
+
+        if len(self._data) != 0:
+            collection_name = st.sidebar.text_input(
+                "Collection name", key="custom_protein_uploader_collection_name"
             )
-            self._data.update(list(custom_df[self._protein_column].tolist()))
+            if st.sidebar.button("Save to library") and collection_name.strip():
+                version = self._library.save(name=collection_name, proteins=self._data)
+                st.sidebar.success(f"Saved {collection_name.strip()} (v{version}).")
 
     def display_choice(self, session_key: str):
-        """Display the choice whether to use custom proteins or not.
+        """Display the choice of custom proteins.
+        It is whether to use the uploaded proteins and which library collections to add.
 
         Parameters
         ----------
         session_key : str
             Session key to create a unique idenitifer in the Streamlit session state.
         """
+        self._selected_proteins = set()
         if len(self._data) != 0:
-            self._use_custom_proteins = st.sidebar.checkbox(
+            if st.sidebar.checkbox(
                 "Use custom proteins",
                 key=f"{session_key}_custom_proteins",
                 value=True,
+            ):
+                self._selected_proteins.update(self._data)
+        if self._library.names:
+            collection_names = st.sidebar.multiselect(
+                "Protein collections",
+                options=self._library.names,
+                key=f"{session_key}_protein_collections",
             )
+            for collection_name in collection_names:
+                self._selected_proteins.update(
+                    self._library.proteins(name=collection_name)
+                )
+        self._use_custom_proteins = len(self._selected_proteins) != 0
 
     @property
     def data(self):
         """Getter for data."""
         return self._data
 
+    @property
+    def selected_proteins(self):
+        """Getter for selected_proteins."""
+        return self._selected_proteins
+
     @property
     def uploaded_files(self):
         """Getter for uploaded_files."""
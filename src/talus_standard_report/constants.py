@@ -1,4 +1,7 @@
 """src/talus_standard_report/constants.py module."""
+import os
+
+from pathlib import Path
 from typing import Final
 
 
@@ -14,3 +17,12 @@ MAX_NUM_PROTEINS_HEATMAP: Final = 100
 MAX_NUM_PEPTIDES_HEATMAP: Final = 100
 MIN_PEPTIDES_HIT_SELECTION: Final = 2
 MAX_NAN_VALUES_HIT_SELECTION: Final = 2
+PCA_NUM_COMPONENTS: Final = 3
+MAX_NUM_INTERSECTIONS_UPSET: Final = 30
+GO_SNAPSHOT_PATH: Final = os.environ.get(
+    "GO_SNAPSHOT_PATH", str(Path.home() / ".talus_standard_report" / "go_snapshot")
+)
+PROTEIN_COLLECTIONS_PATH: Final = os.environ.get(
+    "PROTEIN_COLLECTIONS_PATH", "protein_collections"
+)
+MAX_PDF_RENDER_WORKERS: Final = 4
@@ -0,0 +1,186 @@
+"""src/talus_standard_report/engines/clustering.py module."""
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional
+
+import dash_bio as dashbio
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import PCA
+
+from talus_standard_report.engines.ranking import top_k_indices
+
+
+# Every start of the chronological range is its own selection
+MAX_CACHED_CLUSTERGRAMS = 64
+
+
+@st.cache(
+    allow_output_mutation=True,
+    hash_funcs={pd.DataFrame: lambda _: None},
+    max_entries=MAX_CACHED_CLUSTERGRAMS,
+)
+def get_clustergram_traces(
+    dataset_name: str,
+    selection: Hashable,
+    data: pd.DataFrame,
+    cluster: str = "all",
+    color_threshold: Optional[Dict[str, float]] = None,
+    color_map: Optional[List[List[Any]]] = None,
+) -> Dict[str, Any]:
+    """Get the dendrogram and heatmap traces of a clustergram.
+    The hierarchical clustering of the rows and/or columns only runs once per
+    dataset, selection and cluster mode. The data itself is not hashed.
+    Only the MAX_CACHED_CLUSTERGRAMS most recently used traces are kept.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    selection : Hashable
+        A key identifying the selected rows. E.g. ('pca', 1).
+    data : pd.DataFrame
+        The selected data to cluster.
+    cluster : str, optional
+        The dimension to cluster. Can be one of {'all', 'row', 'col'}, by default 'all'.
+    color_threshold : Optional[Dict[str, float]], optional
+        The dendrogram color thresholds for 'row' and 'col', by default None.
+    color_map : Optional[List[List[Any]]], optional
+        The heatmap color scale, by default None.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The computed traces to pass to dashbio.Clustergram(computed_traces=...).
+    """
+    _, computed_traces = dashbio.Clustergram(
+        data=data,
+        cluster=cluster,
+        color_threshold=color_threshold,
+        color_map=color_map,
+        return_computed_traces=True,
+    )
+    return computed_traces
+
+
+class PeptideClusters(NamedTuple):
+    """The assignment of every row to a cluster and the cluster centroids."""
+
+    labels: np.ndarray
+    distances: np.ndarray
+    centroids: pd.DataFrame
+
+    def members(self, cluster: int, k: Optional[int] = None) -> np.ndarray:
+        """Get the row positions of a cluster, closest to the centroid first.
+
+        Parameters
+        ----------
+        cluster : int
+            The cluster number.
+        k : Optional[int], optional
+            The maximum number of members to return, by default None.
+
+        Returns
+        -------
+        np.ndarray
+            The row positions of the cluster members.
+        """
+        positions = np.flatnonzero(self.labels == cluster)
+        k = positions.shape[0] if k is None else k
+        return positions[top_k_indices(values=-self.distances[positions], k=k)]
+
+
+def fit_peptide_clusters(
+    data: pd.DataFrame,
+    n_clusters: int,
+    n_components: int = 10,
+    batch_size: int = 1024,
+    random_state: int = 42,
+) -> PeptideClusters:
+    """Group all rows with mini-batch k-means on their PCA-reduced log10 intensities.
+    Missing values and intensities below 1 are set to 1 before the log transform.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The input intensities (rows x samples).
+    n_clusters : int
+        The number of clusters.
+    n_components : int, optional
+        The number of principal components to cluster on, by default 10.
+    batch_size : int, optional
+        The mini-batch size of k-means, by default 1024.
+    random_state : int, optional
+        The random state of the PCA and k-means, by default 42.
+
+    Returns
+    -------
+    PeptideClusters
+        The cluster labels, the distance of each row to its cluster center and the
+        centroids (clusters x samples) as the geometric mean intensity of each cluster.
+    """
+    values = data.to_numpy(dtype=np.float32, na_value=np.nan)
+    values = np.log10(np.fmax(values, 1))
+
+    n_components = min(n_components, *values.shape)
+    reduced = PCA(
+        n_components=n_components, svd_solver="randomized", random_state=random_state
+    ).fit_transform(values)
+    model = MiniBatchKMeans(
+        n_clusters=min(n_clusters, values.shape[0]),
+        batch_size=batch_size,
+        n_init=3,
+        random_state=random_state,
+    )
+    labels = model.fit_predict(reduced)
+    distances = np.linalg.norm(reduced - model.cluster_centers_[labels], axis=1)
+
+    # Drop empty clusters and renumber the remaining ones by size
+    sizes = np.bincount(labels, minlength=model.n_clusters)
+    order = np.argsort(-sizes, kind="stable")[: np.count_nonzero(sizes)]
+    renumber = np.empty_like(sizes)
+    renumber[order] = np.arange(order.shape[0])
+    labels = renumber[labels]
+    sizes = sizes[order]
+
+    sums = np.stack(
+        [
+            np.bincount(labels, weights=column, minlength=sizes.shape[0])
+            for column in values.T
+        ],
+        axis=1,
+    )
+    centroids = pd.DataFrame(
+        np.power(10, sums / sizes[:, np.newaxis]),
+        index=[f"Cluster {i + 1} ({size} rows)" for i, size in enumerate(sizes)],
+        columns=data.columns,
+    )
+    return PeptideClusters(labels=labels, distances=distances, centroids=centroids)
+
+
+@st.cache(allow_output_mutation=True, hash_funcs={pd.DataFrame: lambda _: None})
+def get_peptide_clusters(
+    dataset_name: str, data_name: str, data: pd.DataFrame, n_clusters: int
+) -> PeptideClusters:
+    """Get the clusters of all rows, computing them only once per dataset.
+    The data itself is not hashed. It is identified by the dataset and data name.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    data_name : str
+        The name of the data within the dataset. E.g. 'quant_peptides'.
+    data : pd.DataFrame
+        The input intensities (rows x samples).
+    n_clusters : int
+        The number of clusters.
+
+    Returns
+    -------
+    PeptideClusters
+        The cluster labels, distances and centroids.
+        It is shared between figures and must not be mutated.
+    """
+    return fit_peptide_clusters(data=data, n_clusters=n_clusters)
@@ -0,0 +1,136 @@
+"""src/talus_standard_report/engines/data_bundle.py module."""
+import hashlib
+import io
+import json
+import zipfile
+
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, Sequence, Tuple
+
+import pandas as pd
+
+from talus_standard_report.engines.download_store import dataframe_content_hash
+
+
+PARQUET_COMPRESSION = "zstd"
+
+
+def write_parquet(df: pd.DataFrame, parquet_file: IO[bytes]) -> None:
+    """Write a dataframe as a compressed Parquet file.
+    Column names are stored as text, as are columns that mix types.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The dataframe.
+    parquet_file : IO[bytes]
+        The binary file to write to.
+    """
+    df = df.copy()
+    df.columns = [str(column) for column in df.columns]
+    buffer = io.BytesIO()
+    try:
+        df.to_parquet(buffer, compression=PARQUET_COMPRESSION)
+    except (TypeError, ValueError):
+        buffer = io.BytesIO()
+        object_columns = df.select_dtypes(include="object").columns
+        df[object_columns] = df[object_columns].astype(str)
+        df.to_parquet(buffer, compression=PARQUET_COMPRESSION)
+    parquet_file.write(buffer.getbuffer())
+
+
+def data_bundle_hash(
+    dataset_name: str,
+    parameters: Dict[str, Any],
+    tables: Sequence[Tuple[str, pd.DataFrame]],
+    include_csv: bool = False,
+) -> str:
+    """Get the hash that identifies a data bundle without building it.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    parameters : Dict[str, Any]
+        The report parameters. They must be JSON serializable.
+    tables : Sequence[Tuple[str, pd.DataFrame]]
+        The name and data of every table.
+    include_csv : bool, optional
+        Whether the bundle also holds CSV files, by default False.
+
+    Returns
+    -------
+    str
+        The SHA-256 hex digest of the bundle's inputs.
+    """
+    bundle_hash = hashlib.sha256()
+    bundle_hash.update(
+        json.dumps(
+            [dataset_name, parameters, include_csv], sort_keys=True, default=str
+        ).encode("utf-8")
+    )
+    for name, df in tables:
+        bundle_hash.update(name.encode("utf-8"))
+        bundle_hash.update(dataframe_content_hash(df=df).encode("utf-8"))
+    return bundle_hash.hexdigest()
+
+
+def write_data_bundle(
+    path: Path,
+    dataset_name: str,
+    parameters: Dict[str, Any],
+    tables: Sequence[Tuple[str, pd.DataFrame]],
+    include_csv: bool = False,
+) -> None:
+    """Write a zip archive with one Parquet file per table and a manifest.
+    The tables are written into the archive one at a time.
+
+    Parameters
+    ----------
+    path : Path
+        The path of the archive.
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    parameters : Dict[str, Any]
+        The report parameters. They must be JSON serializable.
+    tables : Sequence[Tuple[str, pd.DataFrame]]
+        The name and data of every table. The names must be unique.
+    include_csv : bool, optional
+        Whether to add a CSV file per table as well, by default False.
+    """
+    manifest = {
+        "dataset": dataset_name,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "parameters": parameters,
+        "tables": [],
+    }
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, df in tables:
+            files = {"parquet": f"{name}.parquet"}
+            # Parquet is compressed already, so it is stored as it is
+            with archive.open(files["parquet"], "w") as parquet_file:
+                write_parquet(df=df, parquet_file=parquet_file)
+            if include_csv:
+                files["csv"] = f"csv/{name}.csv"
+                info = zipfile.ZipInfo(
+                    files["csv"], date_time=datetime.now().timetuple()[:6]
+                )
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with archive.open(info, "w") as csv_file, io.TextIOWrapper(
+                    csv_file, encoding="utf-8", newline=""
+                ) as csv_text:
+                    df.to_csv(csv_text)
+            manifest["tables"].append(
+                {
+                    "name": name,
+                    "files": files,
+                    "rows": int(df.shape[0]),
+                    "columns": [str(column) for column in df.columns],
+                }
+            )
+        archive.writestr(
+            "manifest.json",
+            json.dumps(manifest, indent=2, default=str),
+            compress_type=zipfile.ZIP_DEFLATED,
+        )
@@ -0,0 +1,372 @@
+"""src/talus_standard_report/engines/detection_counts.py module."""
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from talus_standard_report.engines.ranking import condition_of_sample
+
+
+def _reduce_groups(
+    values: np.ndarray, codes: np.ndarray, axis: int, ufunc: np.ufunc
+) -> np.ndarray:
+    """Reduce the rows or columns of a matrix that share a group code.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The input matrix.
+    codes : np.ndarray
+        The group code of every row (axis=0) or column (axis=1), from 0 to n - 1.
+    axis : int
+        The axis to group.
+    ufunc : np.ufunc
+        The reduction. E.g. np.logical_or or np.add.
+
+    Returns
+    -------
+    np.ndarray
+        The reduced matrix with one row or column per group code.
+    """
+    order = np.argsort(codes, kind="stable")
+    if order.shape[0] == 0:
+        shape = list(values.shape)
+        shape[axis] = 0
+        return np.zeros(shape, dtype=values.dtype)
+    starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0])
+    return ufunc.reduceat(np.take(values, order, axis=axis), starts, axis=axis)
+
+
+def detection_matrix(data: pd.DataFrame, id_columns: Sequence[str]) -> pd.DataFrame:
+    """Get whether each row was detected in each sample, i.e. has an intensity above 0.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The quant matrix with the id columns followed by one column per sample.
+    id_columns : Sequence[str]
+        The non-sample columns.
+
+    Returns
+    -------
+    pd.DataFrame
+        A boolean matrix (rows x samples).
+    """
+    intensities = data.drop(columns=list(id_columns))
+    values = intensities.to_numpy(dtype=np.float32, na_value=np.nan)
+    with np.errstate(invalid="ignore"):
+        return pd.DataFrame(values > 0, index=data.index, columns=intensities.columns)
+
+
+def count_unique(
+    detected: pd.DataFrame,
+    ids: Sequence,
+    column_groups: Optional[Sequence] = None,
+) -> pd.Series:
+    """Count the unique ids detected in every sample or group of samples.
+
+    Parameters
+    ----------
+    detected : pd.DataFrame
+        A boolean matrix of detections (rows x samples).
+    ids : Sequence
+        The id of every row. Rows sharing an id are counted once.
+    column_groups : Optional[Sequence], optional
+        The group of every sample, by default every sample is counted on its own.
+        An id counts for a group if it was detected in any of its samples.
+
+    Returns
+    -------
+    pd.Series
+        The number of unique ids per sample or group.
+    """
+    id_codes, _ = pd.factorize(np.asarray(ids, dtype=object))
+    grouped = _reduce_groups(
+        detected.to_numpy(dtype=bool), codes=id_codes, axis=0, ufunc=np.logical_or
+    )
+    columns = detected.columns
+    if column_groups is not None:
+        column_codes, columns = pd.factorize(np.asarray(column_groups, dtype=object))
+        grouped = _reduce_groups(grouped, codes=column_codes, axis=1, ufunc=np.logical_or)
+    return pd.Series(grouped.sum(axis=0), index=columns)
+
+
+def count_unique_by_group(
+    detected: pd.DataFrame, ids: Sequence, row_groups: Sequence
+) -> pd.DataFrame:
+    """Count the unique ids detected per row group and sample.
+    E.g. the number of peptides detected for every protein group.
+
+    Parameters
+    ----------
+    detected : pd.DataFrame
+        A boolean matrix of detections (rows x samples).
+    ids : Sequence
+        The id of every row. Rows sharing an id within a group are counted once.
+    row_groups : Sequence
+        The group of every row.
+
+    Returns
+    -------
+    pd.DataFrame
+        The number of unique ids (groups x samples).
+    """
+    group_codes, groups = pd.factorize(np.asarray(row_groups, dtype=object))
+    id_codes, id_uniques = pd.factorize(np.asarray(ids, dtype=object))
+    pair_codes, unique_pairs = pd.factorize(
+        group_codes.astype(np.int64) * len(id_uniques) + id_codes
+    )
+    grouped = _reduce_groups(
+        detected.to_numpy(dtype=bool), codes=pair_codes, axis=0, ufunc=np.logical_or
+    )
+    counts = _reduce_groups(
+        grouped.astype(np.int64),
+        codes=unique_pairs // max(len(id_uniques), 1),
+        axis=0,
+        ufunc=np.add,
+    )
+    return pd.DataFrame(counts, index=groups, columns=detected.columns)
+
+
+def unique_peptides_proteins(
+    quant_peptides: pd.DataFrame, quant_proteins: pd.DataFrame, by: str = "Sample"
+) -> pd.DataFrame:
+    """Count the unique peptides and proteins detected in every sample or condition.
+
+    Parameters
+    ----------
+    quant_peptides : pd.DataFrame
+        The peptide quant matrix ('Peptide', 'Protein', 'numFragments', samples).
+    quant_proteins : pd.DataFrame
+        The protein quant matrix ('Protein', 'NumPeptides', 'PeptideSequences', samples).
+    by : str, optional
+        Either 'Sample' or 'Condition', by default 'Sample'.
+        The condition of a sample named 'Compound:Cell Line:Sample No.' is its name
+        without the sample number.
+
+    Returns
+    -------
+    pd.DataFrame
+        The 'Sample Name', 'Unique Proteins' and 'Unique Peptides'.
+
+    Raises
+    ------
+    ValueError
+        If by is not one of {'Sample', 'Condition'}.
+    """
+    if by not in ("Sample", "Condition"):
+        raise ValueError(
+            "Invalid input value for 'by'. Needs to be one of {'Sample', 'Condition'}."
+        )
+
+    counts = []
+    for data, id_column, id_columns in (
+        (quant_proteins, "Protein", ["Protein", "NumPeptides", "PeptideSequences"]),
+        (quant_peptides, "Peptide", ["Peptide", "Protein", "numFragments"]),
+    ):
+        detected = detection_matrix(data=data, id_columns=id_columns)
+        column_groups = None
+        if by == "Condition":
+            column_groups = [condition_of_sample(column) for column in detected.columns]
+        counts.append(
+            count_unique(
+                detected=detected, ids=data[id_column], column_groups=column_groups
+            )
+        )
+
+    unique_counts = pd.concat(
+        counts, axis=1, keys=["Unique Proteins", "Unique Peptides"]
+    )
+    unique_counts = unique_counts.fillna(0).astype(int)
+    return unique_counts.rename_axis("Sample Name").reset_index()
+
+
+def binned_counts(values: np.ndarray, max_value: int) -> np.ndarray:
+    """Count the occurrences of every value from 1 to max_value in every column.
+    Values above max_value are counted in the last bin and zeros are not counted.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        A matrix of non-negative integers (rows x columns).
+    max_value : int
+        The last bin.
+
+    Returns
+    -------
+    np.ndarray
+        The counts (max_value x columns).
+    """
+    n_bins = max_value + 1
+    n_columns = values.shape[1]
+    # Offset every column into its own range of bins so one bincount covers all columns
+    offsets = np.minimum(values, max_value) + np.arange(n_columns) * n_bins
+    counts = np.bincount(offsets.ravel(), minlength=n_bins * n_columns)
+    return counts.reshape(n_columns, n_bins).T[1:]
+
+
+def peptides_per_protein_histogram(
+    quant_peptides: pd.DataFrame, max_num_peptides: int, by: str = "Sample"
+) -> pd.DataFrame:
+    """Get the distribution of the number of peptides detected per protein.
+    It is binned in every sample or condition.
+
+    Parameters
+    ----------
+    quant_peptides : pd.DataFrame
+        The peptide quant matrix ('Peptide', 'Protein', 'numFragments', samples).
+    max_num_peptides : int
+        The last bin. It includes all proteins with more peptides.
+    by : str, optional
+        Either 'Sample' or 'Condition', by default 'Sample'.
+
+    Returns
+    -------
+    pd.DataFrame
+        The number of proteins (number of peptides x samples or conditions).
+
+    Raises
+    ------
+    ValueError
+        If by is not one of {'Sample', 'Condition'}.
+    """
+    if by not in ("Sample", "Condition"):
+        raise ValueError(
+            "Invalid input value for 'by'. Needs to be one of {'Sample', 'Condition'}."
+        )
+
+    detected = detection_matrix(
+        data=quant_peptides, id_columns=["Peptide", "Protein", "numFragments"]
+    )
+    if by == "Condition":
+        column_codes, conditions = pd.factorize(
+            np.asarray(
+                [condition_of_sample(column) for column in detected.columns],
+                dtype=object,
+            )
+        )
+        detected = pd.DataFrame(
+            _reduce_groups(
+                detected.to_numpy(dtype=bool),
+                codes=column_codes,
+                axis=1,
+                ufunc=np.logical_or,
+            ),
+            index=detected.index,
+            columns=conditions,
+        )
+
+    peptides_per_protein = count_unique_by_group(
+        detected=detected,
+        ids=quant_peptides["Peptide"],
+        row_groups=quant_peptides["Protein"],
+    )
+    return pd.DataFrame(
+        binned_counts(peptides_per_protein.to_numpy(), max_value=max_num_peptides),
+        index=pd.RangeIndex(1, max_num_peptides + 1, name="# of Peptides"),
+        columns=peptides_per_protein.columns,
+    )
+
+
+def describe_histogram(histogram: pd.DataFrame) -> pd.DataFrame:
+    """Get the descriptive statistics of binned data.
+    They are the same as pd.DataFrame.describe gives for the unbinned values.
+
+    Parameters
+    ----------
+    histogram : pd.DataFrame
+        The counts of every value (values x columns). The index holds the values.
+
+    Returns
+    -------
+    pd.DataFrame
+        The count, mean, std, min, quartiles and max of every column.
+    """
+    values = histogram.index.to_numpy(dtype=np.float64)
+    stats = {}
+    for column in histogram.columns:
+        counts = histogram[column].to_numpy(dtype=np.int64)
+        n = counts.sum()
+        if n == 0:
+            stats[column] = [0.0] + [np.nan] * 7
+            continue
+        mean = (values * counts).sum() / n
+        std = (
+            np.sqrt((counts * (values - mean) ** 2).sum() / (n - 1)) if n > 1 else np.nan
+        )
+        # The value at every position of the sorted data, interpolated as in np.quantile
+        cumulative = counts.cumsum()
+        positions = np.array([0.0, 0.25, 0.5, 0.75, 1.0]) * (n - 1)
+        lower = values[np.searchsorted(cumulative, np.floor(positions), side="right")]
+        upper = values[np.searchsorted(cumulative, np.ceil(positions), side="right")]
+        quantiles = lower + (positions - np.floor(positions)) * (upper - lower)
+        stats[column] = [n, mean, std, *quantiles]
+    return pd.DataFrame(
+        stats, index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+    )
+
+
+@st.cache(allow_output_mutation=True, hash_funcs={pd.DataFrame: lambda _: None})
+def get_unique_peptides_proteins(
+    dataset_name: str,
+    quant_peptides: pd.DataFrame,
+    quant_proteins: pd.DataFrame,
+    by: str = "Sample",
+) -> pd.DataFrame:
+    """Get the unique peptide and protein counts, computing them once per dataset.
+    The data itself is not hashed. It is identified by the dataset name.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    quant_peptides : pd.DataFrame
+        The peptide quant matrix.
+    quant_proteins : pd.DataFrame
+        The protein quant matrix.
+    by : str, optional
+        Either 'Sample' or 'Condition', by default 'Sample'.
+
+    Returns
+    -------
+    pd.DataFrame
+        The 'Sample Name', 'Unique Proteins' and 'Unique Peptides'.
+        It is shared between figures and must not be mutated.
+    """
+    return unique_peptides_proteins(
+        quant_peptides=quant_peptides, quant_proteins=quant_proteins, by=by
+    )
+
+
+@st.cache(allow_output_mutation=True, hash_funcs={pd.DataFrame: lambda _: None})
+def get_peptides_per_protein_histogram(
+    dataset_name: str,
+    quant_peptides: pd.DataFrame,
+    max_num_peptides: int,
+    by: str = "Sample",
+) -> pd.DataFrame:
+    """Get the distribution of the number of peptides per protein, once per dataset.
+    It is binned in every sample or condition.
+    The data itself is not hashed. It is identified by the dataset name.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    quant_peptides : pd.DataFrame
+        The peptide quant matrix.
+    max_num_peptides : int
+        The last bin. It includes all proteins with more peptides.
+    by : str, optional
+        Either 'Sample' or 'Condition', by default 'Sample'.
+
+    Returns
+    -------
+    pd.DataFrame
+        The number of proteins (number of peptides x samples or conditions).
+        It is shared between figures and must not be mutated.
+    """
+    return peptides_per_protein_histogram(
+        quant_peptides=quant_peptides, max_num_peptides=max_num_peptides, by=by
+    )
@@ -0,0 +1,186 @@
+"""src/talus_standard_report/engines/download_store.py module."""
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+from pathlib import Path
+from typing import Callable, Dict
+
+import pandas as pd
+import streamlit as st
+
+
+MAX_ARTIFACT_AGE_SECONDS = 24 * 60 * 60
+MAX_STORE_BYTES = 2 * 1024 ** 3
+# Eviction scans the directory, so it runs at most this often
+EVICTION_INTERVAL_SECONDS = 5 * 60
+
+
+class DownloadStore:
+    """A content-addressed store of download artifacts shared by all sessions.
+    Every artifact is named after the hash of its content and written once.
+    Artifacts that weren't requested for MAX_ARTIFACT_AGE_SECONDS are evicted,
+    then the least recently requested ones until the store fits MAX_STORE_BYTES.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_age_seconds: float = MAX_ARTIFACT_AGE_SECONDS,
+        max_bytes: int = MAX_STORE_BYTES,
+    ):
+        """Open the store, keeping the artifacts that are already in it.
+
+        Parameters
+        ----------
+        path : Path
+            The store directory.
+        max_age_seconds : float, optional
+            The time after its last request an artifact is evicted,
+            by default MAX_ARTIFACT_AGE_SECONDS.
+        max_bytes : int, optional
+            The maximum total size of the artifacts, by default MAX_STORE_BYTES.
+        """
+        self._path = Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._max_age_seconds = max_age_seconds
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # The last request time of every artifact, the file is only touched
+        # when it is requested again after a fraction of the maximum age
+        self._requested: Dict[str, float] = {
+            artifact.name: artifact.stat().st_mtime
+            for artifact in self._path.iterdir()
+            if artifact.is_file() and ".tmp" not in artifact.suffixes
+        }
+        self._last_eviction = 0.0
+
+    def __contains__(self, name: str) -> bool:
+        """Whether the store holds an artifact, without touching the disk."""
+        return name in self._requested
+
+    def get(self, name: str) -> Path:
+        """Get the path of an artifact and mark it as requested.
+
+        Parameters
+        ----------
+        name : str
+            The artifact name.
+
+        Returns
+        -------
+        Path
+            The path of the artifact.
+        """
+        now = time.time()
+        with self._lock:
+            if now - self._requested.get(name, now) > self._max_age_seconds / 10:
+                self._requested[name] = now
+                os.utime(self._path / name, (now, now))
+        return self._path / name
+
+    def put(self, name: str, write: Callable[[Path], None]) -> Path:
+        """Get the path of an artifact, writing it first if the store doesn't hold it.
+        It is written to a temporary file and moved into place, so concurrent
+        sessions never see a partial artifact.
+
+        Parameters
+        ----------
+        name : str
+            The artifact name. It should be derived from the artifact's content.
+        write : Callable[[Path], None]
+            Writes the artifact to the given path.
+
+        Returns
+        -------
+        Path
+            The path of the artifact.
+        """
+        if name in self:
+            return self.get(name=name)
+
+        temporary_path = self._path / f"{uuid.uuid4()}.tmp"
+        write(temporary_path)
+        os.replace(temporary_path, self._path / name)
+        with self._lock:
+            self._requested[name] = time.time()
+        self.evict()
+        return self._path / name
+
+    def evict(self, force: bool = False) -> None:
+        """Evict the expired and the least recently requested artifacts.
+        Expired ones go first, then the oldest until the store fits its maximum size.
+
+        Parameters
+        ----------
+        force : bool, optional
+            Whether to evict even if the last eviction was recent, by default False.
+        """
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_eviction < EVICTION_INTERVAL_SECONDS:
+                return
+            self._last_eviction = now
+
+            sizes = {}
+            for name in list(self._requested):
+                try:
+                    sizes[name] = (self._path / name).stat().st_size
+                except FileNotFoundError:
+                    del self._requested[name]
+            total_bytes = sum(sizes.values())
+            for name in sorted(sizes, key=self._requested.get):
+                if (
+                    now - self._requested[name] <= self._max_age_seconds
+                    and total_bytes <= self._max_bytes
+                ):
+                    break
+                try:
+                    (self._path / name).unlink()
+                except FileNotFoundError:
+                    pass
+                del self._requested[name]
+                total_bytes -= sizes[name]
+
+
+def dataframe_content_hash(df: pd.DataFrame) -> str:
+    """Get the hash of a dataframe's content, including its index and columns.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The dataframe.
+
+    Returns
+    -------
+    str
+        The SHA-256 hex digest of the dataframe.
+    """
+    content_hash = hashlib.sha256()
+    content_hash.update(repr(list(df.columns)).encode("utf-8"))
+    try:
+        row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+        content_hash.update(row_hashes.tobytes())
+    except TypeError:
+        # Cells holding unhashable objects like lists are hashed by their text
+        content_hash.update(df.to_csv().encode("utf-8"))
+    return content_hash.hexdigest()
+
+
+@st.cache(allow_output_mutation=True)
+def get_download_store(path: str) -> DownloadStore:
+    """Open the download store once per process.
+
+    Parameters
+    ----------
+    path : str
+        The store directory.
+
+    Returns
+    -------
+    DownloadStore
+        The store. It is shared between sessions.
+    """
+    return DownloadStore(path=Path(path))
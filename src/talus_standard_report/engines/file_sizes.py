@@ -0,0 +1,208 @@
+"""src/talus_standard_report/engines/file_sizes.py module."""
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import boto3
+import streamlit as st
+
+from botocore.exceptions import ClientError
+
+
+# A prefix is listed instead of sending HEAD requests once it holds this many keys
+MIN_KEYS_PER_LISTING = 8
+MAX_HEAD_WORKERS = 16
+# The binary size units, largest first
+SIZE_UNITS = (
+    (1024 ** 5, "P"),
+    (1024 ** 4, "T"),
+    (1024 ** 3, "G"),
+    (1024 ** 2, "M"),
+    (1024, "K"),
+    (1, "B"),
+)
+
+
+def format_size(num_bytes: int) -> str:
+    """Format a file size in the largest binary unit it fills, rounded down.
+
+    Parameters
+    ----------
+    num_bytes : int
+        The file size in bytes.
+
+    Returns
+    -------
+    str
+        The formatted size. E.g. '3M' for 3.5 MiB.
+    """
+    for factor, unit in SIZE_UNITS:
+        if num_bytes >= factor:
+            break
+    return f"{int(num_bytes / factor)}{unit}"
+
+
+@st.cache(allow_output_mutation=True)
+def get_object_metadata_cache() -> Dict[Tuple[str, str], Tuple[str, int]]:
+    """Get the process-wide cache of the ETag and size of every S3 object seen so far.
+
+    Returns
+    -------
+    Dict[Tuple[str, str], Tuple[str, int]]
+        The (ETag, size) of every (bucket, key).
+    """
+    return {}
+
+
+def _list_sizes(
+    s3_client: Any, bucket: str, prefix: str, keys: Sequence[str]
+) -> Dict[str, Tuple[str, int]]:
+    """List a prefix and get the ETag and size of the requested keys under it.
+
+    Parameters
+    ----------
+    s3_client : Any
+        The boto3 S3 client.
+    bucket : str
+        The S3 bucket.
+    prefix : str
+        The common prefix of the keys.
+    keys : Sequence[str]
+        The keys to get.
+
+    Returns
+    -------
+    Dict[str, Tuple[str, int]]
+        The (ETag, size) of every requested key that exists.
+    """
+    keys = set(keys)
+    metadata = {}
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for s3_object in page.get("Contents", []):
+            if s3_object["Key"] in keys:
+                metadata[s3_object["Key"]] = (s3_object["ETag"], s3_object["Size"])
+    return metadata
+
+
+def _head_size(
+    s3_client: Any, bucket: str, key: str, cached: Optional[Tuple[str, int]] = None
+) -> Optional[Tuple[str, int]]:
+    """Get the ETag and size of a single object.
+
+    Parameters
+    ----------
+    s3_client : Any
+        The boto3 S3 client.
+    bucket : str
+        The S3 bucket.
+    key : str
+        The object key.
+    cached : Optional[Tuple[str, int]], optional
+        The cached (ETag, size) of the object, by default None.
+        The request is conditional on the ETag, so S3 answers an unchanged
+        object with 304 and no body.
+
+    Returns
+    -------
+    Optional[Tuple[str, int]]
+        The (ETag, size) of the object, or None if it doesn't exist.
+    """
+    try:
+        if cached:
+            response = s3_client.head_object(
+                Bucket=bucket, Key=key, IfNoneMatch=cached[0]
+            )
+        else:
+            response = s3_client.head_object(Bucket=bucket, Key=key)
+        return response["ETag"], response["ContentLength"]
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "304":
+            return cached
+        if e.response["Error"]["Code"] == "404":
+            return None
+        raise
+
+
+def file_sizes(bucket: str, keys: Sequence[str]) -> Dict[str, int]:
+    """Get the size of many S3 objects in as few round trips as possible.
+    Keys that share a prefix with other keys are resolved by listing the prefix.
+    The others are resolved with concurrent HEAD requests, which are conditional
+    on the cached ETag so that unchanged objects are not fetched again.
+
+    Parameters
+    ----------
+    bucket : str
+        The S3 bucket.
+    keys : Sequence[str]
+        The object keys.
+
+    Returns
+    -------
+    Dict[str, int]
+        The size in bytes of every key that exists.
+    """
+    cache = get_object_metadata_cache()
+    s3_client = boto3.Session().client("s3")
+
+    keys_by_prefix = defaultdict(list)
+    for key in set(keys):
+        keys_by_prefix[str(PurePosixPath(key).parent)].append(key)
+
+    listings = [
+        (f"{prefix}/", prefix_keys)
+        for prefix, prefix_keys in keys_by_prefix.items()
+        if prefix != "." and len(prefix_keys) >= MIN_KEYS_PER_LISTING
+    ]
+    head_keys = [
+        key
+        for prefix, prefix_keys in keys_by_prefix.items()
+        if prefix == "." or len(prefix_keys) < MIN_KEYS_PER_LISTING
+        for key in prefix_keys
+    ]
+
+    with ThreadPoolExecutor(max_workers=MAX_HEAD_WORKERS) as executor:
+        listed = executor.map(
+            lambda listing: _list_sizes(s3_client, bucket, *listing), listings
+        )
+        headed = executor.map(
+            lambda key: _head_size(s3_client, bucket, key, cache.get((bucket, key))),
+            head_keys,
+        )
+        resolved = {}
+        for metadata in listed:
+            resolved.update(metadata)
+        resolved.update(zip(head_keys, headed))
+
+    for key in set(keys):
+        if resolved.get(key) is None:
+            cache.pop((bucket, key), None)
+        else:
+            cache[(bucket, key)] = resolved[key]
+
+    return {key: cache[(bucket, key)][1] for key in keys if (bucket, key) in cache}
+
+
+@st.cache(allow_output_mutation=True)
+def get_file_sizes(
+    dataset_name: str, bucket: str, keys: Tuple[str, ...]
+) -> Dict[str, int]:
+    """Get the size of the raw files of a dataset, resolving them once per dataset.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    bucket : str
+        The S3 bucket.
+    keys : Tuple[str, ...]
+        The object keys.
+
+    Returns
+    -------
+    Dict[str, int]
+        The size in bytes of every key that exists.
+        It is shared between figures and must not be mutated.
+    """
+    return file_sizes(bucket=bucket, keys=keys)
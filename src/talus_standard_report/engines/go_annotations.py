@@ -0,0 +1,477 @@
+"""src/talus_standard_report/engines/go_annotations.py module."""
+import argparse
+import json
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Union
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from scipy import sparse, stats
+
+from talus_standard_report.constants import GO_SNAPSHOT_PATH
+
+
+# The shipped list of common contaminants, e.g. keratins and trypsin
+CONTAMINANTS_PATH = Path(__file__).with_name("contaminants.txt")
+GO_NAMESPACES = {
+    "cellular_component": "c",
+    "molecular_function": "f",
+    "biological_process": "p",
+}
+GO_SNAPSHOT_ARRAYS = (
+    "accessions",
+    "term_ids",
+    "term_names",
+    "term_aspects",
+    "indptr",
+    "indices",
+    "contaminants",
+)
+
+
+class GOAnnotationSnapshot:
+    """A versioned, read-only snapshot of the GO annotations of every protein.
+    The protein -> term incidence is stored as a CSR matrix with the accessions
+    sorted, so proteins are found by binary search without building a lookup.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """Open a snapshot. The arrays are memory-mapped and only read when used.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            The snapshot directory.
+        """
+        self._path = Path(path)
+        with open(self._path / "manifest.json") as manifest_file:
+            self._manifest = json.load(manifest_file)
+        self._arrays = {
+            name: np.load(self._path / f"{name}.npy", mmap_mode="r")
+            for name in GO_SNAPSHOT_ARRAYS
+        }
+
+    def positions(self, accessions: Iterable[str]) -> np.ndarray:
+        """Get the snapshot row of every accession.
+
+        Parameters
+        ----------
+        accessions : Iterable[str]
+            The UniProt accessions to look up.
+
+        Returns
+        -------
+        np.ndarray
+            The row of every accession, or -1 if it has no annotations.
+        """
+        snapshot_accessions = self._arrays["accessions"]
+        accessions = np.asarray(list(accessions), dtype=snapshot_accessions.dtype)
+        positions = np.searchsorted(snapshot_accessions, accessions)
+        positions = np.minimum(positions, snapshot_accessions.shape[0] - 1)
+        return np.where(snapshot_accessions[positions] == accessions, positions, -1)
+
+    def incidence(self, accessions: Iterable[str]) -> sparse.csr_matrix:
+        """Get the term incidence of a list of proteins.
+
+        Parameters
+        ----------
+        accessions : Iterable[str]
+            The UniProt accessions of the proteins.
+
+        Returns
+        -------
+        sparse.csr_matrix
+            A boolean matrix (proteins x terms). Unannotated proteins have empty rows.
+        """
+        positions = self.positions(accessions=accessions)
+        indptr = self._arrays["indptr"]
+        matrix = sparse.csr_matrix(
+            (
+                np.ones(self._arrays["indices"].shape[0], dtype=bool),
+                self._arrays["indices"],
+                indptr,
+            ),
+            shape=(indptr.shape[0] - 1, self._arrays["term_ids"].shape[0]),
+            copy=False,
+        )
+        # Select the snapshot rows of the proteins, unannotated proteins stay empty
+        found = positions >= 0
+        rows = sparse.csr_matrix(
+            (np.ones(found.sum(), dtype=bool), (np.flatnonzero(found), positions[found])),
+            shape=(positions.shape[0], matrix.shape[0]),
+        )
+        return (rows @ matrix).tocsr()
+
+    @property
+    def terms(self) -> pd.DataFrame:
+        """Getter for the GO ID, GO Name and GO Aspect of every term."""
+        return pd.DataFrame(
+            {
+                "GO ID": self._arrays["term_ids"],
+                "GO Name": self._arrays["term_names"],
+                "GO Aspect": self._arrays["term_aspects"],
+            }
+        )
+
+    @property
+    def contaminants(self) -> Set[str]:
+        """Getter for the accessions of the contaminant proteins."""
+        return set(self._arrays["contaminants"].tolist())
+
+    @property
+    def version(self) -> str:
+        """Getter for the snapshot version."""
+        return self._manifest["version"]
+
+
+def _parse_obo(obo_path: Union[str, Path]) -> pd.DataFrame:
+    """Parse the terms and their parents from a GO ontology in OBO format.
+
+    Parameters
+    ----------
+    obo_path : Union[str, Path]
+        The path of the ontology. E.g. 'go-basic.obo'.
+
+    Returns
+    -------
+    pd.DataFrame
+        The GO ID, GO Name, GO Aspect and parent GO IDs of every current term.
+    """
+    terms = []
+    term = None
+    with open(obo_path) as obo_file:
+        for line in obo_file:
+            line = line.strip()
+            if line.startswith("["):
+                term = {"parents": []} if line == "[Term]" else None
+                if term is not None:
+                    terms.append(term)
+            elif term is not None and ": " in line:
+                key, value = line.split(": ", 1)
+                if key == "id":
+                    term["GO ID"] = value
+                elif key == "name":
+                    term["GO Name"] = value
+                elif key == "namespace":
+                    term["GO Aspect"] = GO_NAMESPACES.get(value, value)
+                elif key == "is_a":
+                    term["parents"].append(value.split(" ")[0])
+                elif key == "relationship" and value.startswith("part_of "):
+                    term["parents"].append(value.split(" ")[1])
+                elif key == "is_obsolete" and value == "true":
+                    term["obsolete"] = True
+    terms = pd.DataFrame(terms)
+    if "obsolete" in terms:
+        terms = terms[terms["obsolete"].isna()]
+    return terms[["GO ID", "GO Name", "GO Aspect", "parents"]].reset_index(drop=True)
+
+
+def _parse_gaf(gaf_path: Union[str, Path]) -> Dict[str, Set[str]]:
+    """Parse the direct GO terms of every protein from a GO annotation file (GAF).
+
+    Parameters
+    ----------
+    gaf_path : Union[str, Path]
+        The path of the annotation file. E.g. 'goa_human.gaf'.
+
+    Returns
+    -------
+    Dict[str, Set[str]]
+        The GO IDs of every accession. Annotations qualified with NOT are skipped.
+    """
+    annotations: Dict[str, Set[str]] = {}
+    with open(gaf_path) as gaf_file:
+        for line in gaf_file:
+            if line.startswith("!"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 5 or "NOT" in fields[3].split("|"):
+                continue
+            annotations.setdefault(fields[1], set()).add(fields[4])
+    return annotations
+
+
+def read_contaminants(path: Union[str, Path] = CONTAMINANTS_PATH) -> List[str]:
+    """Read a contaminant list with one accession per line.
+    Blank lines and lines starting with '#' are skipped.
+
+    Parameters
+    ----------
+    path : Union[str, Path], optional
+        The path of the list, by default CONTAMINANTS_PATH.
+
+    Returns
+    -------
+    List[str]
+        The accessions of the contaminant proteins.
+    """
+    with open(path) as contaminants_file:
+        lines = [line.strip() for line in contaminants_file]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def build_go_snapshot(
+    gaf_path: Union[str, Path],
+    obo_path: Union[str, Path],
+    output_path: Union[str, Path],
+    version: str,
+    contaminants: Optional[Sequence[str]] = None,
+) -> GOAnnotationSnapshot:
+    """Build a snapshot from a GO annotation file and ontology.
+    Every protein is also annotated with all ancestors of its terms.
+
+    Parameters
+    ----------
+    gaf_path : Union[str, Path]
+        The path of the GO annotation file (GAF).
+    obo_path : Union[str, Path]
+        The path of the GO ontology (OBO).
+    output_path : Union[str, Path]
+        The snapshot directory to write.
+    version : str
+        The snapshot version. E.g. '2021-09-01'.
+    contaminants : Optional[Sequence[str]], optional
+        The accessions of contaminant proteins, by default the shipped list
+        at CONTAMINANTS_PATH.
+
+    Returns
+    -------
+    GOAnnotationSnapshot
+        The new snapshot.
+    """
+    terms = _parse_obo(obo_path=obo_path)
+    term_positions = {term_id: i for i, term_id in enumerate(terms["GO ID"])}
+    parents = [
+        [term_positions[parent] for parent in term_parents if parent in term_positions]
+        for term_parents in terms["parents"]
+    ]
+
+    ancestors: Dict[int, Set[int]] = {}
+
+    def get_ancestors(term: int) -> Set[int]:
+        if term not in ancestors:
+            ancestors[term] = {term}
+            for parent in parents[term]:
+                ancestors[term] = ancestors[term] | get_ancestors(parent)
+        return ancestors[term]
+
+    annotations = _parse_gaf(gaf_path=gaf_path)
+    accessions = sorted(annotations)
+    indptr = [0]
+    indices: List[int] = []
+    for accession in accessions:
+        protein_terms: Set[int] = set()
+        for term_id in annotations[accession]:
+            if term_id in term_positions:
+                protein_terms |= get_ancestors(term_positions[term_id])
+        indices.extend(sorted(protein_terms))
+        indptr.append(len(indices))
+
+    if contaminants is None:
+        contaminants = read_contaminants()
+    output_path = Path(output_path)
+    output_path.mkdir(parents=True, exist_ok=True)
+    arrays = {
+        "accessions": np.array(accessions, dtype=str),
+        "term_ids": terms["GO ID"].to_numpy(dtype=str),
+        "term_names": terms["GO Name"].to_numpy(dtype=str),
+        "term_aspects": terms["GO Aspect"].to_numpy(dtype=str),
+        "indptr": np.array(indptr, dtype=np.int64),
+        "indices": np.array(indices, dtype=np.int32),
+        "contaminants": np.array(sorted(contaminants), dtype=str),
+    }
+    for name, array in arrays.items():
+        np.save(output_path / f"{name}.npy", array)
+    with open(output_path / "manifest.json", "w") as manifest_file:
+        json.dump(
+            {
+                "version": version,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "gaf": Path(gaf_path).name,
+                "obo": Path(obo_path).name,
+                "n_proteins": len(accessions),
+                "n_terms": terms.shape[0],
+            },
+            manifest_file,
+            indent=2,
+        )
+    return GOAnnotationSnapshot(path=output_path)
+
+
+def main(args: Optional[Sequence[str]] = None) -> None:
+    """Build a GO annotation snapshot from the command line.
+
+    Parameters
+    ----------
+    args : Optional[Sequence[str]], optional
+        The command line arguments, by default sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(
+        description="Build an offline GO annotation snapshot."
+    )
+    parser.add_argument("gaf_path", help="The GO annotation file (GAF).")
+    parser.add_argument("obo_path", help="The GO ontology (OBO).")
+    parser.add_argument(
+        "--snapshot-version",
+        required=True,
+        help="The snapshot version. E.g. the GO release date 2021-09-01.",
+    )
+    parser.add_argument(
+        "--output-path",
+        default=GO_SNAPSHOT_PATH,
+        help="The snapshot directory to write, by default GO_SNAPSHOT_PATH.",
+    )
+    parser.add_argument(
+        "--contaminants",
+        default=str(CONTAMINANTS_PATH),
+        help="A file with one contaminant accession per line.",
+    )
+    options = parser.parse_args(args)
+
+    snapshot = build_go_snapshot(
+        gaf_path=options.gaf_path,
+        obo_path=options.obo_path,
+        output_path=options.output_path,
+        version=options.snapshot_version,
+        contaminants=read_contaminants(path=options.contaminants),
+    )
+    print(f"Built GO annotation snapshot {snapshot.version} at {options.output_path}")
+
+
+def adjust_pvalues(pvalues: np.ndarray) -> np.ndarray:
+    """Adjust the p-values of every column with the Benjamini-Hochberg procedure.
+
+    Parameters
+    ----------
+    pvalues : np.ndarray
+        The p-values (tests x samples).
+
+    Returns
+    -------
+    np.ndarray
+        The FDR adjusted p-values, as statsmodels' fdrcorrection computes them.
+    """
+    n_tests = pvalues.shape[0]
+    if n_tests == 0:
+        return pvalues
+    order = np.argsort(pvalues, axis=0, kind="mergesort")
+    sorted_pvalues = np.take_along_axis(pvalues, order, axis=0)
+    scaled = sorted_pvalues * n_tests / np.arange(1, n_tests + 1)[:, np.newaxis]
+    # Every adjusted p-value is the smallest scaled p-value at or above its rank
+    adjusted = np.minimum.accumulate(scaled[::-1], axis=0)[::-1]
+    result = np.empty_like(adjusted)
+    np.put_along_axis(result, order, np.minimum(adjusted, 1), axis=0)
+    return result
+
+
+def run_snapshot_enrichment(
+    data: pd.DataFrame,
+    snapshot: GOAnnotationSnapshot,
+    aspect: str = "c",
+    go_filters: Optional[Sequence[str]] = None,
+    filter_contaminants: bool = True,
+) -> pd.DataFrame:
+    """Test the GO enrichment of every sample against a snapshot, as gopher does.
+    Only the proteins annotated with a tested term are ranked. Each term is tested
+    with a one-sided Mann-Whitney U test of the intensities of its proteins against
+    the other annotated proteins, with missing values counted as 0. The p-values of
+    every sample are then adjusted with the Benjamini-Hochberg procedure.
+    All samples and terms are tested at once with sparse rank sums.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The protein intensities (accessions x samples).
+    snapshot : GOAnnotationSnapshot
+        The GO annotation snapshot.
+    aspect : str, optional
+        The GO aspect to test, by default 'c'. Use 'all' to test every aspect.
+    go_filters : Optional[Sequence[str]], optional
+        The GO names or IDs to test, by default all terms.
+    filter_contaminants : bool, optional
+        Whether to remove contaminant proteins before testing, by default True.
+
+    Returns
+    -------
+    pd.DataFrame
+        The GO annotation columns followed by one adjusted p-value column per sample.
+    """
+    if filter_contaminants:
+        data = data[~data.index.isin(snapshot.contaminants)]
+    terms = snapshot.terms
+    is_tested = np.ones(terms.shape[0], dtype=bool)
+    if aspect != "all":
+        is_tested &= (terms["GO Aspect"] == aspect).to_numpy()
+    if go_filters is not None:
+        is_tested &= (
+            terms["GO Name"].isin(go_filters) | terms["GO ID"].isin(go_filters)
+        ).to_numpy()
+
+    incidence = snapshot.incidence(accessions=data.index)[:, np.flatnonzero(is_tested)]
+    is_annotated = np.diff(incidence.indptr) > 0
+    incidence = incidence[is_annotated]
+    values = data[is_annotated].to_numpy(dtype=np.float64, na_value=np.nan)
+    values = np.where(np.isnan(values), 0, values)
+    ranks = np.apply_along_axis(stats.rankdata, 0, values)
+
+    n = values.shape[0]
+    n_in = np.asarray(incidence.sum(axis=0), dtype=np.float64).ravel()[:, np.newaxis]
+    n_out = n - n_in
+    rank_sums = incidence.T.astype(np.float64) @ ranks
+    u_statistic = rank_sums - n_in * (n_in + 1) / 2
+
+    # Normal approximation with tie and continuity correction, as in scipy
+    ties = np.array(
+        [
+            np.sum(counts ** 3 - counts)
+            for counts in (
+                np.unique(column, return_counts=True)[1].astype(np.float64)
+                for column in values.T
+            )
+        ]
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = np.sqrt(n_in * n_out / 12 * ((n + 1) - ties / (n * (n - 1))))
+        z = (u_statistic - n_in * n_out / 2 - 0.5) / sigma
+    # Terms that hold every annotated protein can't be enriched
+    pvalues = np.where(n_out > 0, stats.norm.sf(z), 1.0)
+
+    # Like gopher, only the terms of the measured proteins are tested
+    is_measured = n_in.ravel() > 0
+    enrichment = terms[is_tested][is_measured].reset_index(drop=True)
+    return pd.concat(
+        [
+            enrichment,
+            pd.DataFrame(
+                adjust_pvalues(pvalues=pvalues[is_measured]), columns=data.columns
+            ),
+        ],
+        axis=1,
+    )
+
+
+@st.cache(allow_output_mutation=True)
+def get_go_snapshot(path: str) -> Optional[GOAnnotationSnapshot]:
+    """Open the GO annotation snapshot once per process.
+
+    Parameters
+    ----------
+    path : str
+        The snapshot directory.
+
+    Returns
+    -------
+    Optional[GOAnnotationSnapshot]
+        The snapshot, or None if there is no snapshot at the path.
+    """
+    if not (Path(path) / "manifest.json").exists():
+        return None
+    return GOAnnotationSnapshot(path=path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""src/talus_standard_report/engines/go_enrichment.py module."""
+import os
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import reduce
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import gopher
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from talus_standard_report.engines.go_annotations import (
+    get_go_snapshot,
+    run_snapshot_enrichment,
+)
+
+
+# gopher.test_enrichment returns these columns before one p-value column per sample
+GO_ANNOTATION_COLUMNS = ("GO ID", "GO Name", "GO Aspect")
+
+
+def select_samples(enrichment: pd.DataFrame, samples: Iterable[str]) -> pd.DataFrame:
+    """Select the p-values of a subset of samples from the enrichment results.
+    Every sample is tested on its own, so this is the same as testing only the subset.
+
+    Parameters
+    ----------
+    enrichment : pd.DataFrame
+        The enrichment results of all samples.
+    samples : Iterable[str]
+        The samples to select.
+
+    Returns
+    -------
+    pd.DataFrame
+        The GO annotation columns followed by the p-values of the selected samples.
+    """
+    annotation_columns = list(enrichment.columns[: len(GO_ANNOTATION_COLUMNS)])
+    sample_columns = enrichment.columns[len(GO_ANNOTATION_COLUMNS) :]
+    return enrichment[
+        annotation_columns + list(sample_columns[sample_columns.isin(list(samples))])
+    ]
+
+
+def load_go_annotations(aspect: str = "c") -> Tuple[pd.DataFrame, Any]:
+    """Load gopher's GO annotations and term mapping once.
+
+    Parameters
+    ----------
+    aspect : str, optional
+        The GO aspect to load, by default 'c'.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, Any]
+        The annotations and the mapping of GO terms to the annotated proteins.
+    """
+    return gopher.load_annotations(species="human", aspect=aspect)
+
+
+# The annotations of a worker process, set once by _init_worker
+_WORKER_ANNOTATIONS: Dict[str, Any] = {}
+
+
+def _init_worker(annotations: pd.DataFrame, mapping: Any) -> None:
+    """Keep the annotations sent to a worker process for all of its shards."""
+    _WORKER_ANNOTATIONS["annotations"] = annotations
+    _WORKER_ANNOTATIONS["mapping"] = mapping
+
+
+def _test_enrichment_shard(data: pd.DataFrame, options: Dict[str, Any]) -> pd.DataFrame:
+    """Test the enrichment of a shard of samples against the worker's annotations.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The protein intensities of the shard (accessions x samples).
+    options : Dict[str, Any]
+        The keyword arguments of gopher.test_enrichment.
+
+    Returns
+    -------
+    pd.DataFrame
+        The enrichment results of the shard.
+    """
+    return gopher.test_enrichment(
+        data,
+        annotations=_WORKER_ANNOTATIONS["annotations"],
+        mapping=_WORKER_ANNOTATIONS["mapping"],
+        progress=False,
+        **options,
+    )
+
+
+def merge_shards(results: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Merge the enrichment results of sample shards on their GO terms.
+
+    Parameters
+    ----------
+    results : Sequence[pd.DataFrame]
+        The enrichment results of every shard, in sample order.
+
+    Returns
+    -------
+    pd.DataFrame
+        The GO annotation columns followed by the p-values of every shard.
+        The terms are in the order of the first shard.
+    """
+    return reduce(
+        lambda merged, result: merged.merge(
+            result, on=list(GO_ANNOTATION_COLUMNS), how="outer", sort=False
+        ),
+        results,
+    )
+
+
+def run_enrichment(
+    data: pd.DataFrame,
+    aspect: str = "c",
+    go_filters: Optional[Sequence[str]] = None,
+    filter_contaminants: bool = True,
+    n_workers: Optional[int] = None,
+    shards_per_worker: int = 4,
+    progress_callback: Optional[Callable[[float], None]] = None,
+) -> pd.DataFrame:
+    """Test the GO enrichment of every sample, sharding the samples across processes.
+    The annotations are loaded once and sent to every worker process when it
+    starts. The merged results are identical to a single gopher.test_enrichment call.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The protein intensities (accessions x samples).
+    aspect : str, optional
+        The GO aspect to test, by default 'c'.
+    go_filters : Optional[Sequence[str]], optional
+        The GO terms to test, by default all terms.
+    filter_contaminants : bool, optional
+        Whether to remove contaminant proteins before testing, by default True.
+    n_workers : Optional[int], optional
+        The number of worker processes, by default the number of CPUs.
+        With a single worker the samples are tested in this process.
+    shards_per_worker : int, optional
+        The number of shards per worker, by default 4.
+        More shards give finer progress updates at a small overhead.
+    progress_callback : Optional[Callable[[float], None]], optional
+        Called with the fraction of samples done after every shard, by default None.
+
+    Returns
+    -------
+    pd.DataFrame
+        The GO annotation columns followed by one p-value column per sample.
+    """
+    options = {
+        "aspect": aspect,
+        "go_filters": list(go_filters) if go_filters is not None else None,
+        "filter_contaminants": filter_contaminants,
+    }
+    annotations, mapping = load_go_annotations(aspect=aspect)
+    n_workers = min(n_workers or os.cpu_count() or 1, data.shape[1])
+    if n_workers <= 1:
+        _init_worker(annotations=annotations, mapping=mapping)
+        enrichment = _test_enrichment_shard(data=data, options=options)
+        if progress_callback:
+            progress_callback(1.0)
+        return enrichment
+
+    shards = [
+        data.iloc[:, columns]
+        for columns in np.array_split(
+            np.arange(data.shape[1]),
+            min(n_workers * shards_per_worker, data.shape[1]),
+        )
+    ]
+    results = [None] * len(shards)
+    n_done = 0
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(annotations, mapping),
+    ) as executor:
+        futures = {
+            executor.submit(_test_enrichment_shard, shard, options): i
+            for i, shard in enumerate(shards)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            n_done += shards[i].shape[1]
+            if progress_callback:
+                progress_callback(n_done / data.shape[1])
+
+    return merge_shards(results=results)
+
+
+@st.cache(
+    allow_output_mutation=True,
+    hash_funcs={pd.DataFrame: lambda _: None},
+    suppress_st_warning=True,
+)
+def get_go_enrichment(
+    dataset_name: str,
+    data_name: str,
+    data: pd.DataFrame,
+    aspect: str = "c",
+    go_filters: Optional[Sequence[str]] = None,
+    filter_contaminants: bool = True,
+    snapshot_path: Optional[str] = None,
+) -> pd.DataFrame:
+    """Get the GO enrichment p-values of every sample, testing them once per dataset.
+    The data itself is not hashed. It is identified by the dataset and data name.
+    If a GO annotation snapshot exists at snapshot_path it is tested offline.
+    Otherwise the samples are tested with gopher in parallel and a progress bar is
+    shown while they run. Sample filters should be applied afterwards with select_samples.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    data_name : str
+        The name of the data within the dataset. E.g. 'quant_proteins'.
+    data : pd.DataFrame
+        The protein intensities (accessions x samples).
+    aspect : str, optional
+        The GO aspect to test, by default 'c'.
+    go_filters : Optional[Sequence[str]], optional
+        The GO terms to test, by default all terms. Pass them in a fixed order
+        so that the same selection shares the cached results.
+    filter_contaminants : bool, optional
+        Whether to remove contaminant proteins before testing, by default True.
+    snapshot_path : Optional[str], optional
+        The directory of a GO annotation snapshot, by default None.
+
+    Returns
+    -------
+    pd.DataFrame
+        The GO annotation columns followed by one p-value column per sample.
+        It is shared between figures and must not be mutated.
+    """
+    snapshot = get_go_snapshot(path=snapshot_path) if snapshot_path else None
+    if snapshot is not None:
+        return run_snapshot_enrichment(
+            data=data,
+            snapshot=snapshot,
+            aspect=aspect,
+            go_filters=go_filters,
+            filter_contaminants=filter_contaminants,
+        )
+
+    progress_bar = st.progress(0.0)
+    enrichment = run_enrichment(
+        data=data,
+        aspect=aspect,
+        go_filters=go_filters,
+        filter_contaminants=filter_contaminants,
+        progress_callback=progress_bar.progress,
+    )
+    progress_bar.empty()
+    return enrichment
@@ -0,0 +1,234 @@
+"""src/talus_standard_report/engines/html_report.py module."""
+import base64
+import html
+import io
+import json
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from plotly.offline import get_plotlyjs
+from plotly.utils import PlotlyJSONEncoder
+
+from talus_standard_report.engines.data_bundle import write_parquet
+
+
+# Shorter numeric arrays stay JSON lists
+MIN_TYPED_ARRAY_LENGTH = 64
+MAX_PREVIEW_ROWS = 50
+# The little-endian dtypes that map to a JavaScript typed array
+TYPED_ARRAY_DTYPES = {
+    "i1": "Int8Array",
+    "u1": "Uint8Array",
+    "i2": "Int16Array",
+    "u2": "Uint16Array",
+    "i4": "Int32Array",
+    "u4": "Uint32Array",
+    "f4": "Float32Array",
+    "f8": "Float64Array",
+}
+
+# Replaces the encoded arrays of a figure with typed arrays before plotting it
+DECODE_TYPED_ARRAYS_JS = """
+const TYPED_ARRAYS = %s;
+function decodeTypedArrays(value) {
+  if (Array.isArray(value)) {
+    return value.map(decodeTypedArrays);
+  }
+  if (value === null || typeof value !== "object") {
+    return value;
+  }
+  if ("bdata" in value && "dtype" in value) {
+    const bytes = Uint8Array.from(atob(value.bdata), (c) => c.charCodeAt(0));
+    const array = new window[TYPED_ARRAYS[value.dtype]](bytes.buffer);
+    if (value.shape.length === 2) {
+      const columns = value.shape[1];
+      return Array.from({ length: value.shape[0] }, (_, i) =>
+        array.subarray(i * columns, (i + 1) * columns)
+      );
+    }
+    return array;
+  }
+  for (const key of Object.keys(value)) {
+    value[key] = decodeTypedArrays(value[key]);
+  }
+  return value;
+}
+document.querySelectorAll("script.figure-data").forEach((script) => {
+  const figure = JSON.parse(script.textContent);
+  Plotly.newPlot(
+    script.dataset.target,
+    decodeTypedArrays(figure.data),
+    figure.layout,
+    { responsive: true }
+  );
+});
+""" % json.dumps(
+    TYPED_ARRAY_DTYPES
+)
+
+
+def encode_typed_array(value: Any) -> Any:
+    """Encode a long numeric array as base64 of its bytes, as a typed array spec.
+    Other values are returned as they are.
+
+    Parameters
+    ----------
+    value : Any
+        The value of a trace attribute.
+
+    Returns
+    -------
+    Any
+        The 'dtype', 'bdata' and 'shape' of a numeric array, or the value.
+    """
+    array = value
+    if isinstance(value, (list, tuple)):
+        if len(value) < MIN_TYPED_ARRAY_LENGTH:
+            return value
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            # Ragged nested lists
+            return value
+    if not isinstance(array, np.ndarray) or array.size < MIN_TYPED_ARRAY_LENGTH:
+        return value
+    if array.ndim not in (1, 2) or array.dtype.kind not in "iuf":
+        return value
+
+    if array.dtype.kind == "f" or array.dtype.itemsize > 4:
+        # 64 bit integers have no typed array that every plotly.js accepts
+        array = array.astype("<f4" if array.dtype == np.float32 else "<f8")
+    else:
+        array = array.astype(array.dtype.newbyteorder("<"))
+    return {
+        "dtype": array.dtype.str[1:],
+        "bdata": base64.b64encode(np.ascontiguousarray(array).tobytes()).decode(),
+        "shape": list(array.shape),
+    }
+
+
+def _encode_arrays(value: Any) -> Any:
+    """Encode the numeric arrays of a trace and of its nested attributes."""
+    if isinstance(value, dict):
+        return {key: _encode_arrays(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and any(isinstance(item, dict) for item in value):
+        # E.g. the dimensions of a scatter matrix
+        return [_encode_arrays(item) for item in value]
+    return encode_typed_array(value)
+
+
+def figure_json(fig: go.Figure) -> str:
+    """Serialize a figure with its long numeric arrays as typed array specs.
+
+    Parameters
+    ----------
+    fig : go.Figure
+        The figure.
+
+    Returns
+    -------
+    str
+        The figure JSON.
+    """
+    fig_dict = fig.to_plotly_json()
+    fig_dict["data"] = [_encode_arrays(trace) for trace in fig_dict["data"]]
+    return json.dumps(fig_dict, cls=PlotlyJSONEncoder)
+
+
+def parquet_attachment(df: pd.DataFrame, file_name: str) -> str:
+    """Create a link that downloads a dataframe as a compressed Parquet file.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The dataframe.
+    file_name : str
+        The name of the downloaded file.
+
+    Returns
+    -------
+    str
+        The HTML anchor holding the Parquet file.
+    """
+    buffer = io.BytesIO()
+    write_parquet(df=df, parquet_file=buffer)
+    data = base64.b64encode(buffer.getvalue()).decode()
+    return (
+        f'<a download="{html.escape(file_name)}" '
+        f'href="data:application/vnd.apache.parquet;base64,{data}">'
+        "Download as .parquet file</a>"
+    )
+
+
+def build_html_report(
+    title: str, chapters: Sequence[Tuple[str, Sequence[Dict]]]
+) -> str:
+    """Build a single file interactive report.
+    plotly.js is included once and every table is attached as a Parquet file.
+
+    Parameters
+    ----------
+    title : str
+        The report title.
+    chapters : Sequence[Tuple[str, Sequence[Dict]]]
+        The title and the plots of every chapter. Every plot has a 'figure',
+        'data' and 'description'. Plots without a figure are shown as tables.
+
+    Returns
+    -------
+    str
+        The HTML report.
+    """
+    body = [f"<h1>{html.escape(title)}</h1>"]
+    for i, (chapter_title, plots_data) in enumerate(chapters, start=1):
+        body.append(f"<h2>{i}: {html.escape(str(chapter_title))}</h2>")
+        for j, plot_data in enumerate(plots_data):
+            description: Optional[str] = plot_data["description"]
+            if description:
+                body.append(f"<p>{html.escape(description)}</p>")
+            if plot_data["figure"]:
+                target = f"figure-{i}-{j}"
+                # '</' can't appear within a script element
+                fig_json = figure_json(fig=plot_data["figure"]).replace("</", "<\\/")
+                body.append(f'<div id="{target}"></div>')
+                body.append(
+                    f'<script type="application/json" class="figure-data" '
+                    f'data-target="{target}">{fig_json}</script>'
+                )
+            elif isinstance(plot_data["data"], pd.DataFrame):
+                body.append(
+                    plot_data["data"].to_html(
+                        max_rows=MAX_PREVIEW_ROWS, classes="table", border=0
+                    )
+                )
+            if isinstance(plot_data["data"], pd.DataFrame):
+                body.append(
+                    parquet_attachment(
+                        df=plot_data["data"], file_name=f"table_{i}_{j}.parquet"
+                    )
+                )
+
+    return "\n".join(
+        [
+            "<!DOCTYPE html>",
+            "<html>",
+            "<head>",
+            '<meta charset="utf-8">',
+            f"<title>{html.escape(title)}</title>",
+            "<style>body { font-family: Helvetica, sans-serif; margin: 2em; }"
+            " .table { border-collapse: collapse; font-size: 0.8em; }"
+            " .table td, .table th { border: 1px solid #ddd; padding: 2px 6px; }"
+            "</style>",
+            f"<script>{get_plotlyjs()}</script>",
+            "</head>",
+            "<body>",
+            *body,
+            f"<script>{DECODE_TYPED_ARRAYS_JS}</script>",
+            "</body>",
+            "</html>",
+        ]
+    )
@@ -0,0 +1,173 @@
+"""src/talus_standard_report/engines/image_export.py module."""
+import hashlib
+import queue
+import threading
+import weakref
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from kaleido.scopes.plotly import PlotlyScope
+
+from talus_standard_report.constants import MAX_PDF_RENDER_WORKERS
+
+
+# A PDF export renders its figures with one renderer per worker
+KALEIDO_POOL_SIZE = MAX_PDF_RENDER_WORKERS
+MAX_CACHED_IMAGES = 256
+_IMAGE_CACHE_LOCK = threading.Lock()
+# The content hash of every live figure object, by object id
+_FIGURE_HASHES: Dict[int, str] = {}
+
+
+class KaleidoPool:
+    """A pool of long-lived kaleido renderer processes.
+    Every renderer handles one figure at a time, so the pool renders up to
+    size figures at once without paying the start-up cost of a renderer again.
+    """
+
+    def __init__(self, size: int = KALEIDO_POOL_SIZE):
+        """Create the pool. The renderers are started when they are first needed.
+
+        Parameters
+        ----------
+        size : int, optional
+            The maximum number of renderers, by default KALEIDO_POOL_SIZE.
+        """
+        self._size = size
+        self._n_started = 0
+        self._lock = threading.Lock()
+        self._idle: "queue.Queue[PlotlyScope]" = queue.Queue()
+
+    def _acquire(self) -> PlotlyScope:
+        """Get an idle renderer, starting a new one while the pool isn't full."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._n_started < self._size:
+                    self._n_started += 1
+                    return PlotlyScope()
+            return self._idle.get()
+
+    def render(self, fig: go.Figure, image_format: str) -> bytes:
+        """Render a figure to a static image.
+
+        Parameters
+        ----------
+        fig : go.Figure
+            The figure to render.
+        image_format : str
+            The image format. E.g. 'svg' or 'png'.
+
+        Returns
+        -------
+        bytes
+            The image.
+        """
+        scope = self._acquire()
+        try:
+            return scope.transform(fig.to_dict(), format=image_format)
+        finally:
+            self._idle.put(scope)
+
+
+@st.cache(allow_output_mutation=True)
+def get_kaleido_pool() -> KaleidoPool:
+    """Get the process-wide pool of kaleido renderers.
+
+    Returns
+    -------
+    KaleidoPool
+        The pool. It is shared between sessions.
+    """
+    return KaleidoPool()
+
+
+@st.cache(allow_output_mutation=True)
+def get_image_cache() -> "OrderedDict[Tuple[str, str], bytes]":
+    """Get the process-wide cache of rendered images, least recently used first.
+
+    Returns
+    -------
+    OrderedDict[Tuple[str, str], bytes]
+        The image of every (figure content hash, image format).
+    """
+    return OrderedDict()
+
+
+def figure_content_hash(fig: go.Figure) -> str:
+    """Get the hash of a figure's content. Equal figures have equal hashes.
+    It is computed once per figure object, so figures must not be changed
+    after they are hashed.
+
+    Parameters
+    ----------
+    fig : go.Figure
+        The figure.
+
+    Returns
+    -------
+    str
+        The SHA-256 hex digest of the figure's JSON.
+    """
+    figure_hash = _FIGURE_HASHES.get(id(fig))
+    if figure_hash is None:
+        figure_hash = hashlib.sha256(fig.to_json().encode("utf-8")).hexdigest()
+        _FIGURE_HASHES[id(fig)] = figure_hash
+        # Forget the hash with the figure, before its id can be reused
+        weakref.finalize(fig, _FIGURE_HASHES.pop, id(fig), None)
+    return figure_hash
+
+
+def get_cached_image(figure_hash: str, image_format: str) -> Optional[bytes]:
+    """Get an image that was already rendered.
+
+    Parameters
+    ----------
+    figure_hash : str
+        The content hash of the figure.
+    image_format : str
+        The image format. E.g. 'svg' or 'png'.
+
+    Returns
+    -------
+    Optional[bytes]
+        The image, or None if it wasn't rendered yet.
+    """
+    cache = get_image_cache()
+    with _IMAGE_CACHE_LOCK:
+        image = cache.get((figure_hash, image_format))
+        if image is not None:
+            cache.move_to_end((figure_hash, image_format))
+    return image
+
+
+def render_image(fig: go.Figure, image_format: str = "png") -> bytes:
+    """Render a figure to a static image, at most once per figure content and format.
+
+    Parameters
+    ----------
+    fig : go.Figure
+        The figure to render.
+    image_format : str, optional
+        The image format, by default 'png'.
+
+    Returns
+    -------
+    bytes
+        The image.
+    """
+    figure_hash = figure_content_hash(fig=fig)
+    image = get_cached_image(figure_hash=figure_hash, image_format=image_format)
+    if image is None:
+        image = get_kaleido_pool().render(fig=fig, image_format=image_format)
+        cache = get_image_cache()
+        with _IMAGE_CACHE_LOCK:
+            cache[(figure_hash, image_format)] = image
+            while len(cache) > MAX_CACHED_IMAGES:
+                cache.popitem(last=False)
+    return image
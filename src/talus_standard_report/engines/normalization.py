@@ -0,0 +1,197 @@
+"""src/talus_standard_report/engines/normalization.py module."""
+import warnings
+
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def median_normalize(values: np.ndarray) -> np.ndarray:
+    """Divide each column by its median, ignoring missing values.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        A 2D array of intensities (rows x samples).
+
+    Returns
+    -------
+    np.ndarray
+        The median normalized values.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return values / np.nanmedian(values, axis=0)
+
+
+def quantile_normalize(values: np.ndarray) -> np.ndarray:
+    """Apply quantile normalization to each column, ignoring missing values.
+    The reference distribution at rank k is the mean of the k-th smallest value of
+    every column that has at least k values. Ties share the value of their lowest rank.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        A 2D array of intensities (rows x samples).
+
+    Returns
+    -------
+    np.ndarray
+        The quantile normalized values.
+    """
+    sorted_values = np.sort(values, axis=0)
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        reference = np.nanmean(sorted_values, axis=1)
+
+    normalized = np.full_like(values, np.nan)
+    for i in range(values.shape[1]):
+        column = values[:, i]
+        is_present = ~np.isnan(column)
+        n_present = is_present.sum()
+        ranks = np.searchsorted(
+            sorted_values[:n_present, i], column[is_present], side="left"
+        )
+        normalized[is_present, i] = reference[ranks]
+    return normalized
+
+
+def row_normalize(values: np.ndarray) -> np.ndarray:
+    """Divide each row by its sum, ignoring missing values.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        A 2D array of intensities (rows x samples).
+
+    Returns
+    -------
+    np.ndarray
+        The row normalized values.
+    """
+    sums = np.nansum(values, axis=1, dtype=np.float64)
+    sums[sums == 0] = np.nan
+    return values / sums[:, np.newaxis].astype(values.dtype)
+
+
+def column_normalize(values: np.ndarray) -> np.ndarray:
+    """Divide each column by its sum, ignoring missing values.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        A 2D array of intensities (rows x samples).
+
+    Returns
+    -------
+    np.ndarray
+        The column normalized values.
+    """
+    sums = np.nansum(values, axis=0, dtype=np.float64)
+    sums[sums == 0] = np.nan
+    return values / sums[np.newaxis, :].astype(values.dtype)
+
+
+def min_max_normalize(values: np.ndarray) -> np.ndarray:
+    """Scale each column to the range [0, 1], ignoring missing values.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        A 2D array of intensities (rows x samples).
+
+    Returns
+    -------
+    np.ndarray
+        The min-max normalized values.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        column_min = np.nanmin(values, axis=0)
+        column_range = np.nanmax(values, axis=0) - column_min
+        column_range[column_range == 0] = np.nan
+        return (values - column_min) / column_range
+
+
+NORMALIZATION_FUNCTIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "median": median_normalize,
+    "quantile": quantile_normalize,
+    "row": row_normalize,
+    "column": column_normalize,
+    "minmax": min_max_normalize,
+}
+
+
+def get_normalization_function(how: str) -> Callable[[np.ndarray], np.ndarray]:
+    """Get the normalization function for a given name.
+
+    Parameters
+    ----------
+    how : str
+        The normalization method. Can be one of {'median', 'quantile', 'row', 'column', 'minmax'}.
+
+    Returns
+    -------
+    Callable[[np.ndarray], np.ndarray]
+        The normalization function.
+
+    Raises
+    ------
+    ValueError
+        If the normalization method is unknown.
+    """
+    key = how.lower().replace("-", "").replace("_", "")
+    if key not in NORMALIZATION_FUNCTIONS:
+        raise ValueError(
+            f"Invalid input value for 'how'. Needs to be one of {set(NORMALIZATION_FUNCTIONS)}."
+        )
+    return NORMALIZATION_FUNCTIONS[key]
+
+
+def normalize(df: pd.DataFrame, how: Optional[str]) -> pd.DataFrame:
+    """Normalize a numeric dataframe as float32.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input dataframe (rows x samples).
+    how : Optional[str]
+        The normalization method. If None, the values are returned unchanged.
+
+    Returns
+    -------
+    pd.DataFrame
+        The normalized dataframe.
+    """
+    if not how or how.lower() == "none":
+        return df
+    values = df.to_numpy(dtype=np.float32, na_value=np.nan)
+    normalized = get_normalization_function(how=how)(values)
+    return pd.DataFrame(normalized, index=df.index, columns=df.columns)
+
+
+@st.cache(allow_output_mutation=True, hash_funcs={pd.DataFrame: lambda _: None})
+def get_normalized_data(
+    dataset_name: str, data_name: str, data: pd.DataFrame, how: Optional[str]
+) -> pd.DataFrame:
+    """Get the normalized data, computing it only once per dataset and method.
+    The data itself is not hashed. It is identified by the dataset and data name.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    data_name : str
+        The name of the data within the dataset. E.g. 'quant_peptides'.
+    data : pd.DataFrame
+        The input dataframe (rows x samples).
+    how : Optional[str]
+        The normalization method. If None, the values are returned unchanged.
+
+    Returns
+    -------
+    pd.DataFrame
+        The normalized dataframe. It is shared between figures and must not be mutated.
+    """
+    return normalize(df=data, how=how)
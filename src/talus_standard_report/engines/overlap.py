@@ -0,0 +1,225 @@
+"""src/talus_standard_report/engines/overlap.py module."""
+from typing import Dict, FrozenSet, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from talus_standard_report.engines.protein_index import ProteinIndex
+
+
+# The number of set bits of every byte value
+POPCOUNT_TABLE = np.unpackbits(
+    np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1
+).sum(axis=1)
+
+
+def popcount(packed: np.ndarray) -> np.ndarray:
+    """Count the set bits of packed bitsets.
+
+    Parameters
+    ----------
+    packed : np.ndarray
+        The bitsets packed into uint8 along the last axis.
+
+    Returns
+    -------
+    np.ndarray
+        The number of set bits of every bitset.
+    """
+    return POPCOUNT_TABLE[packed].sum(axis=-1)
+
+
+class ProteinBitsets:
+    """Protein sets encoded as bitsets over a shared dictionary of proteins."""
+
+    def __init__(self, sets: Dict[str, Iterable[str]]):
+        """Encode the sets. Every set becomes one row of packed bits.
+
+        Parameters
+        ----------
+        sets : Dict[str, Iterable[str]]
+            The proteins of every set by set name.
+        """
+        members = {
+            name: pd.Index(pd.unique(pd.Series(list(proteins), dtype=object).dropna()))
+            for name, proteins in sets.items()
+        }
+        self._proteins = pd.Index(
+            pd.unique(
+                np.concatenate(
+                    [index.to_numpy() for index in members.values()]
+                    + [np.empty(0, dtype=object)]
+                )
+            )
+        )
+        self._names = pd.Index(list(members))
+
+        bits = np.zeros((len(self._names), len(self._proteins)), dtype=bool)
+        for i, index in enumerate(members.values()):
+            bits[i, self._proteins.get_indexer(index)] = True
+        self._bitsets = np.packbits(bits, axis=1)
+
+    def _rows(self, names: Optional[Sequence[str]]) -> np.ndarray:
+        """Get the bitset rows of the given set names, by default all sets."""
+        if names is None:
+            return np.arange(len(self._names))
+        rows = self._names.get_indexer(list(names))
+        if (rows < 0).any():
+            raise ValueError(
+                f"Invalid input value for 'names'. Needs to be one of {set(self._names)}."
+            )
+        return rows
+
+    def intersection_size(self, names: Sequence[str]) -> int:
+        """Get the number of proteins that are in all of the given sets.
+
+        Parameters
+        ----------
+        names : Sequence[str]
+            The set names.
+
+        Returns
+        -------
+        int
+            The size of the intersection.
+        """
+        rows = self._rows(names=names)
+        return int(popcount(np.bitwise_and.reduce(self._bitsets[rows], axis=0)))
+
+    def intersections(
+        self,
+        names: Optional[Sequence[str]] = None,
+        max_intersections: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Get the exclusive intersection sizes of the given sets, as in an UpSet plot.
+        Every protein is counted once, in the combination of sets it belongs to.
+
+        Parameters
+        ----------
+        names : Optional[Sequence[str]], optional
+            The set names, by default all sets.
+        max_intersections : Optional[int], optional
+            The maximum number of intersections to return, by default all.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per non-empty intersection, largest first, with a boolean
+            membership column per set and the intersection 'Size'.
+        """
+        rows = self._rows(names=names)
+        bits = np.unpackbits(self._bitsets[rows], axis=1, count=len(self._proteins))
+        # The membership signature of every protein, packed to one byte per 8 sets
+        signatures = np.ascontiguousarray(np.packbits(bits.T, axis=1))
+        signatures = signatures[signatures.any(axis=1)]
+        unique_signatures, sizes = np.unique(signatures, axis=0, return_counts=True)
+
+        order = np.lexsort((np.arange(sizes.shape[0]), -sizes))[:max_intersections]
+        memberships = np.unpackbits(
+            unique_signatures[order], axis=1, count=len(rows)
+        ).astype(bool)
+        intersections = pd.DataFrame(memberships, columns=self._names[rows])
+        intersections["Size"] = sizes[order]
+        return intersections
+
+    @property
+    def names(self) -> pd.Index:
+        """Getter for the set names."""
+        return self._names
+
+    @property
+    def proteins(self) -> pd.Index:
+        """Getter for the shared protein dictionary."""
+        return self._proteins
+
+    @property
+    def set_sizes(self) -> pd.Series:
+        """Getter for the number of proteins in every set."""
+        return pd.Series(popcount(self._bitsets), index=self._names)
+
+
+def protein_sets(
+    data: pd.DataFrame,
+    collections: pd.DataFrame,
+    protein_index: ProteinIndex,
+    custom_proteins: FrozenSet[str] = frozenset(),
+) -> Dict[str, Iterable[str]]:
+    """Get the measured proteins, every collection and every sample as protein sets.
+    The collections and custom proteins are mapped to the names of the rows they
+    match, by any member of a protein group and by accession or name.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Whether each protein was detected in each sample (protein names x samples).
+    collections : pd.DataFrame
+        One reference collection of proteins per column. E.g. the nuclear proteins.
+    protein_index : ProteinIndex
+        The protein index of the rows the protein names of data were taken from.
+    custom_proteins : FrozenSet[str], optional
+        The uploaded custom proteins, by default none.
+
+    Returns
+    -------
+    Dict[str, Iterable[str]]
+        The proteins of every set by set name.
+    """
+    sets = {"Measured Proteins": data.index}
+    sets.update(
+        {
+            column: protein_index.names(proteins=collections[column].dropna())
+            for column in collections.columns
+        }
+    )
+    if custom_proteins:
+        sets["Custom Proteins"] = protein_index.names(proteins=custom_proteins)
+    sets.update({column: data.index[data[column]] for column in data.columns})
+    return sets
+
+
+@st.cache(
+    allow_output_mutation=True,
+    hash_funcs={pd.DataFrame: lambda _: None, ProteinIndex: lambda _: None},
+)
+def get_protein_bitsets(
+    dataset_name: str,
+    data_name: str,
+    data: pd.DataFrame,
+    collections: pd.DataFrame,
+    protein_index: ProteinIndex,
+    custom_proteins: FrozenSet[str] = frozenset(),
+) -> ProteinBitsets:
+    """Get the bitsets of the measured proteins, every sample and every collection.
+    They are encoded once per dataset and custom protein list.
+    The data and protein index are not hashed. They are identified by the dataset
+    and data name.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    data_name : str
+        The name of the data within the dataset. E.g. 'quant_proteins'.
+    data : pd.DataFrame
+        Whether each protein was detected in each sample (protein names x samples).
+    collections : pd.DataFrame
+        One reference collection of proteins per column. E.g. the nuclear proteins.
+    protein_index : ProteinIndex
+        The protein index of the rows the protein names of data were taken from.
+    custom_proteins : FrozenSet[str], optional
+        The uploaded custom proteins, by default none.
+
+    Returns
+    -------
+    ProteinBitsets
+        The bitsets. They are shared between figures and must not be mutated.
+    """
+    return ProteinBitsets(
+        sets=protein_sets(
+            data=data,
+            collections=collections,
+            protein_index=protein_index,
+            custom_proteins=custom_proteins,
+        )
+    )
@@ -0,0 +1,337 @@
+"""src/talus_standard_report/engines/pca.py module."""
+import warnings
+
+from typing import Iterator, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sklearn.decomposition import PCA, IncrementalPCA, TruncatedSVD
+
+from talus_standard_report.constants import PCA_NUM_COMPONENTS
+from talus_standard_report.engines.ranking import top_k_indices
+
+
+IMPUTATION_METHODS = ("zero", "min", "mean", "median")
+PCA_SOLVERS = ("auto", "full", "randomized", "incremental")
+
+
+class PCAResult(NamedTuple):
+    """The fitted PCA model with its sample scores and feature loadings."""
+
+    model: Union[PCA, IncrementalPCA, TruncatedSVD]
+    scores: pd.DataFrame
+    loadings: pd.DataFrame
+
+    @property
+    def explained_variance_ratio(self) -> np.ndarray:
+        """Getter for the explained variance ratio of each component."""
+        return self.model.explained_variance_ratio_
+
+
+def _sample_batches(
+    data: pd.DataFrame, n_batches: int, log_transform: bool
+) -> Iterator[np.ndarray]:
+    """Yield batches of samples as float32 arrays (samples x features).
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The input intensities (features x samples).
+    n_batches : int
+        The number of sample batches.
+    log_transform : bool
+        If True, apply a log2 transform. Values <= 0 become missing values.
+
+    Yields
+    ------
+    np.ndarray
+        A batch of samples.
+    """
+    for columns in np.array_split(np.arange(data.shape[1]), n_batches):
+        values = data.iloc[:, columns].to_numpy(dtype=np.float32, na_value=np.nan).T
+        if log_transform:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = np.log2(np.where(values > 0, values, np.nan))
+        yield values
+
+
+def _fill_values(
+    data: pd.DataFrame, n_batches: int, imputation: str, log_transform: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute the per feature imputation values in a single pass over the samples.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The input intensities (features x samples).
+    n_batches : int
+        The number of sample batches.
+    imputation : str
+        The imputation method. Can be one of {'zero', 'min', 'mean', 'median'}.
+    log_transform : bool
+        If True, apply a log2 transform. Values <= 0 become missing values.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The value to impute for each feature and a mask of the features with at
+        least one observed value.
+
+    Raises
+    ------
+    ValueError
+        If the imputation method is unknown or can't be computed in batches.
+    """
+    if imputation not in IMPUTATION_METHODS:
+        raise ValueError(
+            f"Invalid input value for 'imputation'. Needs to be one of {set(IMPUTATION_METHODS)}."
+        )
+    if imputation == "median" and n_batches > 1:
+        raise ValueError("Median imputation can't be computed incrementally.")
+
+    n_features = data.shape[0]
+    counts = np.zeros(n_features, dtype=np.int64)
+    sums = np.zeros(n_features, dtype=np.float64)
+    mins = np.full(n_features, np.nan, dtype=np.float32)
+    medians = None
+    for values in _sample_batches(
+        data=data, n_batches=n_batches, log_transform=log_transform
+    ):
+        counts += (~np.isnan(values)).sum(axis=0)
+        sums += np.nansum(values, axis=0, dtype=np.float64)
+        mins = np.fmin(mins, np.fmin.reduce(values, axis=0))
+        if imputation == "median":
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                medians = np.nanmedian(values, axis=0)
+
+    is_observed = counts > 0
+    if imputation == "zero":
+        fill_values = np.zeros(n_features, dtype=np.float32)
+    elif imputation == "min":
+        fill_values = mins
+    elif imputation == "mean":
+        fill_values = (sums / np.maximum(counts, 1)).astype(np.float32)
+    else:
+        fill_values = medians.astype(np.float32)
+    return fill_values[is_observed], is_observed
+
+
+def _impute(values: np.ndarray, fill_values: np.ndarray) -> np.ndarray:
+    """Replace the missing values of each feature in place.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        A batch of samples (samples x features).
+    fill_values : np.ndarray
+        The value to impute for each feature.
+
+    Returns
+    -------
+    np.ndarray
+        The imputed batch.
+    """
+    rows, columns = np.nonzero(np.isnan(values))
+    values[rows, columns] = fill_values[columns]
+    return values
+
+
+def fit_pca(
+    data: pd.DataFrame,
+    n_components: int = PCA_NUM_COMPONENTS,
+    imputation: str = "zero",
+    log_transform: bool = False,
+    center: bool = True,
+    solver: str = "auto",
+    batch_size: Optional[int] = None,
+    random_state: int = 42,
+) -> PCAResult:
+    """Fit a PCA on the samples (columns) of an intensity matrix.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The input intensities (features x samples).
+    n_components : int, optional
+        The number of components, by default PCA_NUM_COMPONENTS.
+    imputation : str, optional
+        How to impute missing values of a feature. Can be one of
+        {'zero', 'min', 'mean', 'median'}, by default 'zero'.
+    log_transform : bool, optional
+        If True, apply a log2 transform before imputation, by default False.
+    center : bool, optional
+        If False, fit a truncated SVD on the uncentered data, by default True.
+    solver : str, optional
+        The solver to use. Can be one of {'auto', 'full', 'randomized', 'incremental'}.
+        'auto' uses the randomized solver for wide matrices. 'incremental' fits the
+        samples in batches of batch_size, by default 'auto'.
+    batch_size : Optional[int], optional
+        The number of samples per batch for the incremental solver, by default None.
+    random_state : int, optional
+        The random state of the randomized solvers, by default 42.
+
+    Returns
+    -------
+    PCAResult
+        The fitted model, the sample scores and the feature loadings.
+
+    Raises
+    ------
+    ValueError
+        If the solver is unknown or doesn't support the given options.
+    """
+    if solver not in PCA_SOLVERS:
+        raise ValueError(
+            f"Invalid input value for 'solver'. Needs to be one of {set(PCA_SOLVERS)}."
+        )
+    n_samples = data.shape[1]
+    n_components = min(n_components, n_samples, data.shape[0])
+
+    if solver == "incremental":
+        if not center:
+            raise ValueError("The incremental solver always centers the data.")
+        batch_size = max(batch_size or 2 * n_components, n_components)
+        n_batches = max(n_samples // batch_size, 1)
+    else:
+        n_batches = 1
+
+    fill_values, is_observed = _fill_values(
+        data=data, n_batches=n_batches, imputation=imputation, log_transform=log_transform
+    )
+    batches = lambda: (
+        _impute(values=values[:, is_observed], fill_values=fill_values)
+        for values in _sample_batches(
+            data=data, n_batches=n_batches, log_transform=log_transform
+        )
+    )
+
+    if solver == "incremental":
+        model = IncrementalPCA(n_components=n_components)
+        for values in batches():
+            model.partial_fit(values)
+        scores = np.concatenate([model.transform(values) for values in batches()])
+    else:
+        (values,) = batches()
+        if center:
+            model = PCA(
+                n_components=n_components, svd_solver=solver, random_state=random_state
+            )
+        else:
+            model = TruncatedSVD(
+                n_components=min(n_components, values.shape[1] - 1),
+                algorithm="arpack" if solver == "full" else "randomized",
+                random_state=random_state,
+            )
+        scores = model.fit_transform(values)
+
+    columns = [f"pc{n}" for n in range(1, scores.shape[1] + 1)]
+    return PCAResult(
+        model=model,
+        scores=pd.DataFrame(scores, index=data.columns, columns=columns),
+        loadings=pd.DataFrame(
+            model.components_.T, index=data.index[is_observed], columns=columns
+        ),
+    )
+
+
+@st.cache(allow_output_mutation=True, hash_funcs={pd.DataFrame: lambda _: None})
+def get_pca(
+    dataset_name: str,
+    data_name: str,
+    data: pd.DataFrame,
+    n_components: int = PCA_NUM_COMPONENTS,
+    imputation: str = "zero",
+    log_transform: bool = False,
+    center: bool = True,
+    solver: str = "auto",
+) -> PCAResult:
+    """Get the PCA of a dataset, fitting it only once per dataset and options.
+    The data itself is not hashed. It is identified by the dataset and data name.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    data_name : str
+        The name of the data within the dataset. E.g. 'quant_peptides'.
+    data : pd.DataFrame
+        The input intensities (features x samples).
+    n_components : int, optional
+        The number of components, by default PCA_NUM_COMPONENTS.
+    imputation : str, optional
+        How to impute missing values of a feature, by default 'zero'.
+    log_transform : bool, optional
+        If True, apply a log2 transform before imputation, by default False.
+    center : bool, optional
+        If False, fit a truncated SVD on the uncentered data, by default True.
+    solver : str, optional
+        The solver to use, by default 'auto'.
+
+    Returns
+    -------
+    PCAResult
+        The fitted model, the sample scores and the feature loadings.
+        It is shared between figures and must not be mutated.
+    """
+    return fit_pca(
+        data=data,
+        n_components=n_components,
+        imputation=imputation,
+        log_transform=log_transform,
+        center=center,
+        solver=solver,
+    )
+
+
+@st.cache(allow_output_mutation=True, hash_funcs={pd.DataFrame: lambda _: None})
+def get_top_loadings(
+    dataset_name: str,
+    data_name: str,
+    data: pd.DataFrame,
+    k: int,
+    imputation: str = "zero",
+    log_transform: bool = False,
+    center: bool = True,
+    solver: str = "auto",
+) -> pd.DataFrame:
+    """Get the k features with the largest absolute loading for each component.
+    The selection is computed once per dataset, PCA options and k.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    data_name : str
+        The name of the data within the dataset. E.g. 'quant_peptides'.
+    data : pd.DataFrame
+        The input intensities (features x samples).
+    k : int
+        The number of features to select per component.
+    imputation : str, optional
+        How to impute missing values of a feature, by default 'zero'.
+    log_transform : bool, optional
+        If True, apply a log2 transform before imputation, by default False.
+    center : bool, optional
+        If False, fit a truncated SVD on the uncentered data, by default True.
+    solver : str, optional
+        The solver to use, by default 'auto'.
+
+    Returns
+    -------
+    pd.DataFrame
+        The feature labels (k x components), most influential first.
+    """
+    loadings = get_pca(
+        dataset_name=dataset_name,
+        data_name=data_name,
+        data=data,
+        imputation=imputation,
+        log_transform=log_transform,
+        center=center,
+        solver=solver,
+    ).loadings
+    indices = top_k_indices(values=np.abs(loadings.to_numpy()), k=k)
+    return pd.DataFrame(loadings.index.to_numpy()[indices], columns=loadings.columns)
@@ -0,0 +1,297 @@
+"""src/talus_standard_report/engines/protein_collections.py module."""
+import copy
+import fcntl
+import json
+import os
+import shutil
+import threading
+import uuid
+
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+import streamlit as st
+
+
+class LibraryGeneration(NamedTuple):
+    """One published state of a protein collection library."""
+
+    name: str
+    manifest: Dict
+    proteins: np.ndarray
+    bitsets: np.ndarray
+
+
+class ProteinCollectionLibrary:
+    """A local library of named, versioned protein collections.
+    All collections are encoded as packed bitsets over one sorted dictionary of
+    proteins, so a collection is decoded without parsing anything.
+    Every saved version is kept as its own bitset row.
+    Every save writes a new generation directory with the manifest, dictionary and
+    bitsets, then publishes it by atomically replacing the CURRENT pointer file.
+    Readers in any process therefore always see a matching set of files.
+    Saves hold an exclusive lock on the library directory, so saves of all
+    processes are serialized.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """Open a library, creating it if it doesn't exist yet.
+        The arrays are memory-mapped and only read when used.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            The library directory.
+        """
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        # Saves of this process wait here before taking the directory lock
+        self._save_lock = threading.Lock()
+        self._pointer_mtime: Optional[int] = None
+        self._generation = LibraryGeneration(
+            name="",
+            manifest={"collections": {}},
+            proteins=np.empty(0, dtype=str),
+            bitsets=np.empty((0, 0), dtype=np.uint8),
+        )
+        self._decoded: Dict[Tuple[str, int], FrozenSet[str]] = {}
+
+    def _current(self) -> LibraryGeneration:
+        """Get the published generation, reloading it if another save replaced it.
+        The pointer file is only read when its modification time changes.
+        """
+        try:
+            pointer_mtime = (self._path / "CURRENT").stat().st_mtime_ns
+        except FileNotFoundError:
+            pointer_mtime = None
+        with self._lock:
+            if pointer_mtime != self._pointer_mtime:
+                self._pointer_mtime = pointer_mtime
+                name = ""
+                if pointer_mtime is not None:
+                    name = (self._path / "CURRENT").read_text().strip()
+                if name and name != self._generation.name:
+                    self._generation = self._load(name=name)
+                    self._decoded = {}
+            return self._generation
+
+    def _load(self, name: str) -> LibraryGeneration:
+        """Read the manifest of a generation and memory-map its arrays."""
+        generation_path = self._path / name
+        with open(generation_path / "manifest.json") as manifest_file:
+            manifest = json.load(manifest_file)
+        return LibraryGeneration(
+            name=name,
+            manifest=manifest,
+            proteins=np.load(generation_path / "proteins.npy", mmap_mode="r"),
+            bitsets=np.load(generation_path / "bitsets.npy", mmap_mode="r"),
+        )
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the exclusive lock on the library directory, creating it if needed."""
+        self._path.mkdir(parents=True, exist_ok=True)
+        with self._save_lock:
+            directory_fd = os.open(self._path, os.O_RDONLY)
+            try:
+                fcntl.flock(directory_fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(directory_fd)
+
+    def _publish(
+        self, manifest: Dict, proteins: np.ndarray, bitsets: np.ndarray, previous: str
+    ) -> None:
+        """Write a new generation and point CURRENT to it with one atomic replace.
+        Older generations are removed, except the previous one for readers that are
+        still loading it. Must be called while holding the directory lock.
+        """
+        name = f"generation-{uuid.uuid4().hex}"
+        generation_path = self._path / name
+        generation_path.mkdir(parents=True)
+        np.save(generation_path / "proteins.npy", proteins)
+        np.save(generation_path / "bitsets.npy", bitsets)
+        with open(generation_path / "manifest.json", "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        pointer_path = self._path / f"CURRENT.{uuid.uuid4().hex}.tmp"
+        pointer_path.write_text(name)
+        os.replace(pointer_path, self._path / "CURRENT")
+
+        # Whatever CURRENT names is never removed
+        keep = {name, previous, (self._path / "CURRENT").read_text().strip()}
+        for old_path in self._path.glob("generation-*"):
+            if old_path.name not in keep:
+                shutil.rmtree(old_path, ignore_errors=True)
+
+    @staticmethod
+    def _unpack(generation: LibraryGeneration, rows: np.ndarray) -> np.ndarray:
+        """Unpack the bitset rows to one boolean per dictionary protein."""
+        return np.unpackbits(
+            np.asarray(generation.bitsets[rows]),
+            axis=1,
+            count=generation.proteins.shape[0],
+        ).astype(bool)
+
+    def save(self, name: str, proteins: Iterable[str]) -> int:
+        """Save a collection. Saving an existing name adds a new version.
+
+        Parameters
+        ----------
+        name : str
+            The collection name. E.g. 'Kinases'.
+        proteins : Iterable[str]
+            The normalized proteins of the collection.
+
+        Returns
+        -------
+        int
+            The version of the saved collection.
+
+        Raises
+        ------
+        ValueError
+            If the name is empty.
+        """
+        name = name.strip()
+        if not name:
+            raise ValueError("Invalid input value for 'name'. Needs to be non-empty.")
+        members = np.unique(np.asarray(list(proteins), dtype=str))
+
+        with self._locked():
+            # The published generation is read after locking, so it can't be stale
+            generation = self._current()
+            # Re-encode the existing collections over the grown dictionary
+            proteins_dictionary = np.union1d(np.asarray(generation.proteins), members)
+            n_rows = generation.bitsets.shape[0]
+            bits = np.zeros((n_rows + 1, proteins_dictionary.shape[0]), dtype=bool)
+            if n_rows > 0:
+                old_bits = self._unpack(generation=generation, rows=np.arange(n_rows))
+                remapped = np.searchsorted(proteins_dictionary, generation.proteins)
+                bits[:-1, remapped] = old_bits
+            bits[-1, np.searchsorted(proteins_dictionary, members)] = True
+
+            manifest = copy.deepcopy(generation.manifest)
+            versions = manifest["collections"].setdefault(name, [])
+            version = len(versions) + 1
+            versions.append(
+                {
+                    "version": version,
+                    "row": n_rows,
+                    "created": datetime.now().isoformat(timespec="seconds"),
+                    "n_proteins": int(members.shape[0]),
+                }
+            )
+
+            self._publish(
+                manifest=manifest,
+                proteins=proteins_dictionary,
+                bitsets=np.packbits(bits, axis=1),
+                previous=generation.name,
+            )
+            self._current()
+        return version
+
+    def proteins(self, name: str, version: Optional[int] = None) -> FrozenSet[str]:
+        """Get the proteins of a collection. They are decoded once per version.
+
+        Parameters
+        ----------
+        name : str
+            The collection name.
+        version : Optional[int], optional
+            The version, by default the latest.
+
+        Returns
+        -------
+        FrozenSet[str]
+            The proteins of the collection.
+
+        Raises
+        ------
+        ValueError
+            If the collection or version doesn't exist.
+        """
+        generation = self._current()
+        versions = self._versions(generation=generation, name=name)
+        if version is None:
+            version = versions[-1]
+        if version not in versions:
+            raise ValueError(
+                f"Invalid input value for 'version'. Needs to be one of {set(versions)}."
+            )
+        with self._lock:
+            members = self._decoded.get((name, version))
+        if members is None:
+            row = generation.manifest["collections"][name][version - 1]["row"]
+            decoded = self._unpack(generation=generation, rows=np.array([row]))[0]
+            members = frozenset(generation.proteins[decoded].tolist())
+            with self._lock:
+                # A save may have published a new generation in the meantime
+                if generation is self._generation:
+                    self._decoded[(name, version)] = members
+        return members
+
+    @staticmethod
+    def _versions(generation: LibraryGeneration, name: str) -> List[int]:
+        """Get the versions of a collection in a generation."""
+        if name not in generation.manifest["collections"]:
+            raise ValueError(
+                "Invalid input value for 'name'. Needs to be one of "
+                f"{set(generation.manifest['collections'])}."
+            )
+        return [entry["version"] for entry in generation.manifest["collections"][name]]
+
+    def versions(self, name: str) -> List[int]:
+        """Get the versions of a collection.
+
+        Parameters
+        ----------
+        name : str
+            The collection name.
+
+        Returns
+        -------
+        List[int]
+            The versions, oldest first.
+
+        Raises
+        ------
+        ValueError
+            If the collection doesn't exist.
+        """
+        return self._versions(generation=self._current(), name=name)
+
+    @property
+    def names(self) -> List[str]:
+        """Getter for the collection names."""
+        return sorted(self._current().manifest["collections"])
+
+
+@st.cache(allow_output_mutation=True)
+def get_protein_collection_library(path: str) -> ProteinCollectionLibrary:
+    """Open the protein collection library once per process.
+
+    Parameters
+    ----------
+    path : str
+        The library directory.
+
+    Returns
+    -------
+    ProteinCollectionLibrary
+        The library. It is shared between sessions.
+    """
+    return ProteinCollectionLibrary(path=path)
@@ -0,0 +1,201 @@
+"""src/talus_standard_report/engines/protein_index.py module."""
+from collections import Counter
+from typing import Dict, Iterable, List, Set
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def protein_keys(protein: str) -> List[str]:
+    """Get all the names a protein or protein group can be looked up by.
+    Every member of a group like 'sp|P1|A_HUMAN;sp|P2|B_HUMAN' contributes its
+    accession (P1), entry name (A_HUMAN) and protein name (A).
+    Names that are not fasta headers are used as they are.
+
+    Parameters
+    ----------
+    protein : str
+        The protein or protein group.
+
+    Returns
+    -------
+    List[str]
+        The lookup keys of the protein.
+    """
+    keys = []
+    for member in str(protein).split(";"):
+        member = member.strip()
+        if not member:
+            continue
+        fields = member.split("|")
+        if len(fields) == 3:
+            _, accession, entry_name = fields
+            keys.extend([accession, entry_name, entry_name.split("_")[0]])
+        else:
+            keys.append(member)
+    return keys
+
+
+def protein_names(proteins: pd.Series) -> pd.Series:
+    """Get the protein name of every protein or protein group.
+    A group like 'sp|P1|A_HUMAN;sp|P2|B_HUMAN' is named after its first protein (A).
+
+    Parameters
+    ----------
+    proteins : pd.Series
+        The proteins or protein groups.
+
+    Returns
+    -------
+    pd.Series
+        The protein names.
+    """
+    return (
+        proteins.str.split(";")
+        .str[0]
+        .str.split("|")
+        .str[-1]
+        .str.split("_")
+        .str[0]
+    )
+
+
+class ProteinIndex:
+    """A hash index from protein names to the row positions they appear in."""
+
+    def __init__(self, proteins: Iterable[str]):
+        """Build the index. This is the only step that visits every row.
+
+        Parameters
+        ----------
+        proteins : Iterable[str]
+            The protein or protein group of every row.
+        """
+        proteins = pd.Series(list(proteins), dtype=object)
+        lookup: Dict[str, List[int]] = {}
+        for position, protein in enumerate(proteins):
+            for key in set(protein_keys(protein)):
+                lookup.setdefault(key, []).append(position)
+        self._lookup = {
+            key: np.array(positions, dtype=np.intp) for key, positions in lookup.items()
+        }
+        self._n_rows = proteins.shape[0]
+        # The names of the rows are kept to replace the matched ones without a scan
+        self._row_names = protein_names(
+            proteins=proteins.fillna("").astype(str)
+        ).to_numpy()
+        self._name_counts = Counter(self._row_names.tolist())
+        self._names = frozenset(name for name in self._name_counts if name)
+
+    def positions(self, proteins: Iterable[str]) -> np.ndarray:
+        """Get the row positions of the given proteins.
+        The cost grows with the number of proteins, not with the number of rows.
+
+        Parameters
+        ----------
+        proteins : Iterable[str]
+            The proteins to look up, by accession, entry name or protein name.
+
+        Returns
+        -------
+        np.ndarray
+            The sorted, unique row positions of the proteins that were found.
+        """
+        hits = [self._lookup[protein] for protein in proteins if protein in self._lookup]
+        if not hits:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(hits))
+
+    def matches(self, proteins: Iterable[str]) -> Set[str]:
+        """Get the proteins that are found in the index.
+
+        Parameters
+        ----------
+        proteins : Iterable[str]
+            The proteins to look up, by accession, entry name or protein name.
+
+        Returns
+        -------
+        Set[str]
+            The subset of the proteins that were found.
+        """
+        return {protein for protein in proteins if protein in self._lookup}
+
+    def names(self, proteins: Iterable[str]) -> Set[str]:
+        """Get the protein names of the rows that the given proteins match.
+        Proteins that match no row are kept as they are.
+
+        Parameters
+        ----------
+        proteins : Iterable[str]
+            The proteins to look up, by accession, entry name or protein name.
+
+        Returns
+        -------
+        Set[str]
+            The names of the matched rows and the proteins that were not found.
+        """
+        proteins = set(proteins)
+        matched = self.matches(proteins=proteins)
+        names = set(self._row_names[self.positions(proteins=matched)].tolist())
+        return (names - {""}) | (proteins - matched)
+
+    def measured_names(self, proteins: Iterable[str]) -> Set[str]:
+        """Get the row protein names, naming rows that match a protein after it.
+        A protein group counts as a match if any of its members is one of the proteins.
+        Only the matched rows are visited, but the result is a new set of all the
+        distinct row names, so its cost grows with the number of distinct names.
+
+        Parameters
+        ----------
+        proteins : Iterable[str]
+            The proteins to look up, by accession, entry name or protein name.
+
+        Returns
+        -------
+        Set[str]
+            The names of the unmatched rows and the proteins that were found.
+        """
+        proteins = set(proteins)
+        matched_counts = Counter(
+            self._row_names[self.positions(proteins=proteins)].tolist()
+        )
+        # A name is only replaced once every row with that name matched
+        replaced = {
+            name
+            for name, count in matched_counts.items()
+            if count == self._name_counts[name]
+        }
+        return (self._names - replaced) | self.matches(proteins=proteins)
+
+    @property
+    def n_rows(self) -> int:
+        """Getter for the number of indexed rows."""
+        return self._n_rows
+
+
+@st.cache(allow_output_mutation=True, hash_funcs={pd.DataFrame: lambda _: None})
+def get_protein_index(
+    dataset_name: str, data_name: str, data: pd.DataFrame, column: str = "Protein"
+) -> ProteinIndex:
+    """Get the protein index of a dataset, building it once per dataset.
+    The data itself is not hashed. It is identified by the dataset and data name.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    data_name : str
+        The name of the data within the dataset. E.g. 'quant_proteins'.
+    data : pd.DataFrame
+        The input data with one protein or protein group per row.
+    column : str, optional
+        The column holding the proteins, by default 'Protein'.
+
+    Returns
+    -------
+    ProteinIndex
+        The protein index. It is shared between figures and must not be mutated.
+    """
+    return ProteinIndex(proteins=data[column])
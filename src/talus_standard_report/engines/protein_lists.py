@@ -0,0 +1,253 @@
+"""src/talus_standard_report/engines/protein_lists.py module."""
+import csv
+import hashlib
+import io
+
+from itertools import islice
+from typing import FrozenSet, Iterator, NamedTuple, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+
+# The number of bytes that are inspected to detect the format of an upload
+FORMAT_DETECTION_BYTES = 64 * 1024
+# The number of lines or rows that are normalized at once
+CHUNK_SIZE = 100_000
+DELIMITERS = ("\t", ",", ";")
+
+
+class ProteinListFormat(NamedTuple):
+    """The format of an uploaded protein list."""
+
+    kind: str
+    delimiter: Optional[str]
+    columns: Tuple[str, ...]
+
+
+def content_hash(content: bytes) -> str:
+    """Get the hash of an upload's content.
+
+    Parameters
+    ----------
+    content : bytes
+        The content of the upload.
+
+    Returns
+    -------
+    str
+        The SHA-256 hex digest of the content.
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def normalize_proteins(proteins: pd.Series) -> pd.Series:
+    """Get the protein name of every fasta header, entry name or protein id.
+    E.g. '>sp|P62807|H2B1C_HUMAN Histone H2B' and 'H2B1C_HUMAN' become 'H2B1C'.
+    Protein groups separated by ';' are split and ids without any of these
+    decorations (e.g. accessions) are kept as they are.
+
+    Parameters
+    ----------
+    proteins : pd.Series
+        The proteins.
+
+    Returns
+    -------
+    pd.Series
+        The non-empty protein names.
+    """
+    proteins = proteins.dropna().astype(str).str.split(";").explode()
+    proteins = (
+        proteins.str.strip()
+        .str.lstrip(">")
+        .str.split(n=1)
+        .str[0]
+        .str.split("|")
+        .str[-1]
+        .str.split("_")
+        .str[0]
+    )
+    return proteins[proteins.str.len() > 0]
+
+
+def detect_format(head: bytes, file_name: str = "") -> ProteinListFormat:
+    """Detect the format of an upload from its first bytes.
+    It is a fasta file, a plain list with one id per line or a delimited table.
+    The delimiter of a table is the candidate that occurs the same, non-zero
+    number of times in every complete line of the head. Otherwise, quoted fields
+    may hold a delimiter, so the delimiter is sniffed and kept if every line
+    parses to the same number of fields. A .csv or .tsv file without any
+    delimiter is a table with a single column.
+
+    Parameters
+    ----------
+    head : bytes
+        The first bytes of the upload.
+    file_name : str, optional
+        The name of the uploaded file, by default ''.
+
+    Returns
+    -------
+    ProteinListFormat
+        The format and, for tables, the delimiter and column names.
+    """
+    text = head.decode("utf-8-sig", errors="replace")
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(head) == FORMAT_DETECTION_BYTES and len(lines) > 1:
+        # The last line may be cut off
+        lines = lines[:-1]
+    if not lines:
+        return ProteinListFormat(kind="list", delimiter=None, columns=())
+    if lines[0].startswith(">"):
+        return ProteinListFormat(kind="fasta", delimiter=None, columns=())
+
+    for delimiter in DELIMITERS:
+        counts = {line.count(delimiter) for line in lines}
+        if len(counts) == 1 and counts != {0}:
+            header = next(csv.reader([lines[0]], delimiter=delimiter))
+            return ProteinListFormat(
+                kind="table", delimiter=delimiter, columns=tuple(header)
+            )
+    try:
+        delimiter = csv.Sniffer().sniff(
+            "\n".join(lines), delimiters="".join(DELIMITERS)
+        ).delimiter
+    except csv.Error:
+        delimiter = None
+    if delimiter is not None:
+        rows = list(csv.reader(lines, delimiter=delimiter))
+        if len({len(row) for row in rows}) == 1 and len(rows[0]) > 1:
+            return ProteinListFormat(
+                kind="table", delimiter=delimiter, columns=tuple(rows[0])
+            )
+    if file_name.lower().endswith((".csv", ".tsv")):
+        return ProteinListFormat(
+            kind="table", delimiter=",", columns=(lines[0].strip(),)
+        )
+    return ProteinListFormat(kind="list", delimiter=None, columns=())
+
+
+def _chunks(lines: Iterator[str], kind: str) -> Iterator[pd.Series]:
+    """Read the ids of a fasta file or a plain list in chunks of CHUNK_SIZE lines."""
+    while True:
+        chunk = list(islice(lines, CHUNK_SIZE))
+        if not chunk:
+            return
+        if kind == "fasta":
+            chunk = [line for line in chunk if line.startswith(">")]
+        yield pd.Series(chunk, dtype=object)
+
+
+def parse_protein_list(
+    content: bytes,
+    list_format: ProteinListFormat,
+    protein_column: Optional[str] = None,
+) -> FrozenSet[str]:
+    """Parse the proteins of an uploaded fasta file, plain list or table.
+    The upload is streamed in chunks so very large lists are never held
+    as a whole in a dataframe.
+
+    Parameters
+    ----------
+    content : bytes
+        The content of the upload.
+    list_format : ProteinListFormat
+        The format of the upload.
+    protein_column : Optional[str], optional
+        The column of a table that holds the proteins, by default the first column.
+
+    Returns
+    -------
+    FrozenSet[str]
+        The protein names.
+
+    Raises
+    ------
+    ValueError
+        If the protein column is not one of the table's columns.
+    """
+    buffer = io.BytesIO(content)
+    if list_format.kind == "table":
+        if protein_column is None:
+            protein_column = list_format.columns[0]
+        if protein_column not in list_format.columns:
+            raise ValueError(
+                "Invalid input value for 'protein_column'. "
+                f"Needs to be one of {set(list_format.columns)}."
+            )
+        chunks = (
+            chunk[protein_column]
+            for chunk in pd.read_csv(
+                buffer,
+                sep=list_format.delimiter,
+                engine="c",
+                usecols=[protein_column],
+                dtype=str,
+                encoding="utf-8-sig",
+                chunksize=CHUNK_SIZE,
+            )
+        )
+    else:
+        lines = io.TextIOWrapper(buffer, encoding="utf-8-sig", errors="replace")
+        chunks = _chunks(lines=iter(lines), kind=list_format.kind)
+
+    proteins = set()
+    for chunk in chunks:
+        proteins.update(normalize_proteins(proteins=chunk))
+    return frozenset(proteins)
+
+
+@st.cache(allow_output_mutation=True, hash_funcs={bytes: lambda _: None})
+def get_protein_list_format(
+    content_hash: str, content: bytes, file_name: str = ""
+) -> ProteinListFormat:
+    """Get the format of an upload, detecting it once per content.
+    The content itself is not hashed. It is identified by its content hash.
+
+    Parameters
+    ----------
+    content_hash : str
+        The hash of the content.
+    content : bytes
+        The content of the upload.
+    file_name : str, optional
+        The name of the uploaded file, by default ''.
+
+    Returns
+    -------
+    ProteinListFormat
+        The format of the upload.
+    """
+    return detect_format(head=content[:FORMAT_DETECTION_BYTES], file_name=file_name)
+
+
+@st.cache(allow_output_mutation=True, hash_funcs={bytes: lambda _: None})
+def get_protein_list(
+    content_hash: str,
+    content: bytes,
+    list_format: ProteinListFormat,
+    protein_column: Optional[str] = None,
+) -> FrozenSet[str]:
+    """Get the proteins of an upload, parsing them once per content and column.
+    The content itself is not hashed. It is identified by its content hash.
+
+    Parameters
+    ----------
+    content_hash : str
+        The hash of the content.
+    content : bytes
+        The content of the upload.
+    list_format : ProteinListFormat
+        The format of the upload.
+    protein_column : Optional[str], optional
+        The column of a table that holds the proteins, by default the first column.
+
+    Returns
+    -------
+    FrozenSet[str]
+        The protein names.
+    """
+    return parse_protein_list(
+        content=content, list_format=list_format, protein_column=protein_column
+    )
@@ -0,0 +1,198 @@
+"""src/talus_standard_report/engines/ranking.py module."""
+import threading
+import warnings
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from talus_standard_report.engines.normalization import get_normalized_data
+
+
+RANKINGS = ("Max Intensity", "Variance", "Coefficient of Variation", "Missingness")
+
+
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """Get the indices of the k largest values along the first axis.
+    Uses a partial sort so only the k selected values are fully sorted.
+    Missing values are ranked last and ties are ordered by index.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        A 1D array or a 2D array whose columns are ranked independently.
+    k : int
+        The number of indices to select.
+
+    Returns
+    -------
+    np.ndarray
+        The indices of the k largest values in descending order.
+        For a 2D input each column holds the indices for that column.
+    """
+    k = min(k, values.shape[0])
+    if k <= 0:
+        return np.empty((0,) + values.shape[1:], dtype=np.intp)
+    values = np.where(np.isnan(values), -np.inf, values)
+    top_indices = np.argpartition(-values, k - 1, axis=0)[:k]
+    top_values = np.take_along_axis(values, top_indices, axis=0)
+    order = np.lexsort((top_indices, -top_values), axis=0)
+    return np.take_along_axis(top_indices, order, axis=0)
+
+
+def ranking_scores(
+    values: np.ndarray, groups: Optional[Sequence[str]] = None
+) -> Dict[str, np.ndarray]:
+    """Compute the score of every row for each ranking. Higher scores rank first.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        A 2D array of intensities (rows x samples).
+    groups : Optional[Sequence[str]], optional
+        The condition of each sample, by default every sample is its own condition.
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        The scores of each ranking in RANKINGS.
+    """
+    is_missing = np.isnan(values)
+    if groups is None:
+        groups = np.arange(values.shape[1])
+    _, group_codes = np.unique(np.asarray(groups), return_inverse=True)
+    one_hot = np.eye(group_codes.max() + 1, dtype=np.float32)[group_codes]
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        condition_means = (np.where(is_missing, 0, values) @ one_hot) / (
+            (~is_missing).astype(np.float32) @ one_hot
+        )
+        return {
+            "Max Intensity": np.fmax.reduce(values, axis=1),
+            "Variance": np.nanvar(values, axis=1),
+            "Coefficient of Variation": np.nanstd(condition_means, axis=1)
+            / np.nanmean(condition_means, axis=1),
+            "Missingness": -is_missing.mean(axis=1),
+        }
+
+
+class RankIndex:
+    """A lazily sorted index of rows ranked by a score.
+    It is safe to share between threads.
+    """
+
+    def __init__(self, scores: np.ndarray):
+        """Create a rank index. Nothing is sorted until a window is requested.
+
+        Parameters
+        ----------
+        scores : np.ndarray
+            The score of every row. Higher scores rank first.
+        """
+        self._scores = scores
+        self._order = np.empty(0, dtype=np.intp)
+        self._lock = threading.Lock()
+
+    def window(self, start: int, size: int) -> np.ndarray:
+        """Get the row positions of a window of ranks.
+        Only the top ranks up to the end of the window are sorted. The sorted prefix
+        at least doubles whenever it needs to grow and earlier ranks never change.
+
+        Parameters
+        ----------
+        start : int
+            The first rank of the window.
+        size : int
+            The number of ranks in the window.
+
+        Returns
+        -------
+        np.ndarray
+            The row positions in rank order.
+        """
+        n_rows = self._scores.shape[0]
+        stop = min(start + size, n_rows)
+        order = self._order
+        if stop > order.shape[0]:
+            with self._lock:
+                # Another thread may have sorted the window while this one waited
+                order = self._order
+                n_sorted = order.shape[0]
+                if stop > n_sorted:
+                    k = min(max(stop, 2 * n_sorted), n_rows)
+                    is_unsorted = np.ones(n_rows, dtype=bool)
+                    is_unsorted[order] = False
+                    unsorted = np.flatnonzero(is_unsorted)
+                    next_ranks = unsorted[
+                        top_k_indices(values=self._scores[unsorted], k=k - n_sorted)
+                    ]
+                    order = np.concatenate([order, next_ranks])
+                    self._order = order
+        return order[start:stop]
+
+    def rank(self, positions: np.ndarray) -> np.ndarray:
+        """Sort a subset of row positions by rank.
+
+        Parameters
+        ----------
+        positions : np.ndarray
+            The row positions to sort.
+
+        Returns
+        -------
+        np.ndarray
+            The row positions in rank order.
+        """
+        return positions[top_k_indices(values=self._scores[positions], k=len(positions))]
+
+
+def condition_of_sample(sample_name: str) -> str:
+    """Get the condition of a sample named 'Compound:Cell Line:Sample No.'.
+
+    Parameters
+    ----------
+    sample_name : str
+        The sample name.
+
+    Returns
+    -------
+    str
+        The sample name without the sample number.
+    """
+    return str(sample_name).rsplit(":", 1)[0]
+
+
+@st.cache(allow_output_mutation=True, hash_funcs={pd.DataFrame: lambda _: None})
+def get_rank_indexes(
+    dataset_name: str, data_name: str, data: pd.DataFrame, how: Optional[str]
+) -> Dict[str, RankIndex]:
+    """Get the rank indexes of the normalized data, computing them once per dataset.
+    The data itself is not hashed. It is identified by the dataset and data name.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    data_name : str
+        The name of the data within the dataset. E.g. 'quant_proteins'.
+    data : pd.DataFrame
+        The input matrix (rows x samples).
+    how : Optional[str]
+        The normalization method. If None, the values are ranked unchanged.
+
+    Returns
+    -------
+    Dict[str, RankIndex]
+        The rank index of each ranking in RANKINGS.
+        It is shared between figures and must not be mutated.
+    """
+    normalized_data = get_normalized_data(
+        dataset_name=dataset_name, data_name=data_name, data=data, how=how
+    )
+    scores = ranking_scores(
+        values=normalized_data.to_numpy(dtype=np.float32, na_value=np.nan),
+        groups=[condition_of_sample(column) for column in normalized_data.columns],
+    )
+    return {ranking: RankIndex(scores=scores[ranking]) for ranking in RANKINGS}
@@ -0,0 +1,125 @@
+"""src/talus_standard_report/engines/subcellular_enrichment.py module."""
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from scipy import sparse
+
+
+def location_incidence(
+    proteins: pd.Index, protein_locations: pd.DataFrame
+) -> Tuple[sparse.csr_matrix, pd.Index]:
+    """Encode the locations of a list of proteins as a sparse incidence matrix.
+
+    Parameters
+    ----------
+    proteins : pd.Index
+        The protein names.
+    protein_locations : pd.DataFrame
+        A data frame containing 'Entry name' and 'Main location'.
+        A protein with several rows has several locations.
+
+    Returns
+    -------
+    Tuple[sparse.csr_matrix, pd.Index]
+        The incidence matrix (proteins x locations) and the location names.
+        Proteins without a known location have empty rows.
+    """
+    protein_locations = protein_locations[["Entry name", "Main location"]].dropna()
+    protein_positions = proteins.get_indexer(protein_locations["Entry name"])
+    is_measured = protein_positions >= 0
+    locations = pd.Categorical(protein_locations["Main location"][is_measured])
+    incidence = sparse.csr_matrix(
+        (
+            np.ones(locations.codes.shape[0], dtype=np.float32),
+            (protein_positions[is_measured], locations.codes),
+        ),
+        shape=(len(proteins), len(locations.categories)),
+    )
+    # Duplicate rows in protein_locations must not count a protein twice
+    incidence.data[:] = 1
+    return incidence, pd.Index(locations.categories)
+
+
+def subcellular_enrichment_scores(
+    detected: pd.DataFrame,
+    protein_locations: pd.DataFrame,
+    expected_fractions_of_locations: pd.DataFrame,
+) -> pd.DataFrame:
+    """Calculate the enrichment score of every location in every sample.
+    The score is the fraction of the proteins detected in a sample that are found
+    in a location, divided by the expected fraction of that location.
+    All samples are scored with a single sparse matrix product.
+
+    Parameters
+    ----------
+    detected : pd.DataFrame
+        Whether each protein was detected in each sample (proteins x samples).
+        The index must hold unique protein names.
+    protein_locations : pd.DataFrame
+        A data frame containing 'Entry name' and 'Main location'.
+    expected_fractions_of_locations : pd.DataFrame
+        A data frame containing 'Main location' and 'Expected Fraction'.
+
+    Returns
+    -------
+    pd.DataFrame
+        The enrichment scores (locations x samples), in the order of
+        expected_fractions_of_locations. Locations without any detected protein
+        in a sample are missing.
+    """
+    incidence, locations = location_incidence(
+        proteins=detected.index, protein_locations=protein_locations
+    )
+    detections = detected.to_numpy(dtype=np.float32)
+    counts = incidence.T @ detections
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fractions = counts / detections.sum(axis=0)
+    fractions[counts == 0] = np.nan
+
+    fractions = pd.DataFrame(fractions, index=locations, columns=detected.columns)
+    expected = expected_fractions_of_locations.set_index("Main location")[
+        "Expected Fraction"
+    ]
+    scores = fractions.reindex(expected.index).div(expected, axis=0)
+    scores.index.name = "Main location"
+    return scores
+
+
+@st.cache(allow_output_mutation=True, hash_funcs={pd.DataFrame: lambda _: None})
+def get_subcellular_enrichment_scores(
+    dataset_name: str,
+    data_name: str,
+    detected: pd.DataFrame,
+    protein_locations: pd.DataFrame,
+    expected_fractions_of_locations: pd.DataFrame,
+) -> pd.DataFrame:
+    """Get the subcellular location enrichment scores, computing them once per dataset.
+    The data itself is not hashed. It is identified by the dataset and data name.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    data_name : str
+        The name of the data within the dataset. E.g. 'quant_proteins'.
+    detected : pd.DataFrame
+        Whether each protein was detected in each sample (proteins x samples).
+    protein_locations : pd.DataFrame
+        A data frame containing 'Entry name' and 'Main location'.
+    expected_fractions_of_locations : pd.DataFrame
+        A data frame containing 'Main location' and 'Expected Fraction'.
+
+    Returns
+    -------
+    pd.DataFrame
+        The enrichment scores (locations x samples).
+        It is shared between figures and must not be mutated.
+    """
+    return subcellular_enrichment_scores(
+        detected=detected,
+        protein_locations=protein_locations,
+        expected_fractions_of_locations=expected_fractions_of_locations,
+    )
@@ -0,0 +1,176 @@
+"""src/talus_standard_report/engines/tile_pyramid.py module."""
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from talus_standard_report.engines.normalization import get_normalized_data
+from talus_standard_report.engines.ranking import get_rank_indexes
+
+
+class TilePyramid:
+    """A multi-resolution pyramid of a matrix that averages rows by powers of two."""
+
+    def __init__(self, data: pd.DataFrame, tile_size: int):
+        """Build all the levels of the pyramid.
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            The input matrix (rows x samples).
+        tile_size : int
+            The number of rows in a tile. The coarsest level fits in a single tile.
+        """
+        self._index = data.index
+        self._columns = data.columns
+        self._tile_size = tile_size
+
+        values = data.to_numpy(dtype=np.float32, na_value=np.nan)
+        is_missing = np.isnan(values)
+        sums = np.where(is_missing, 0, values)
+        counts = (~is_missing).astype(np.int32)
+        # An empty selection has no value range
+        self._value_range = (
+            float(np.fmin.reduce(values, axis=None, initial=np.nan)),
+            float(np.fmax.reduce(values, axis=None, initial=np.nan)),
+        )
+
+        # Level 0 is the full resolution, every next level halves the number of rows
+        self._levels = [values]
+        while sums.shape[0] > tile_size:
+            if sums.shape[0] % 2:
+                sums = np.concatenate([sums, np.zeros((1, sums.shape[1]), sums.dtype)])
+                counts = np.concatenate(
+                    [counts, np.zeros((1, counts.shape[1]), counts.dtype)]
+                )
+            sums = sums.reshape(-1, 2, sums.shape[1]).sum(axis=1)
+            counts = counts.reshape(-1, 2, counts.shape[1]).sum(axis=1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self._levels.append((sums / counts).astype(np.float32))
+
+    def _level(self, zoom: int) -> int:
+        """Get the pyramid level of a zoom level.
+
+        Parameters
+        ----------
+        zoom : int
+            The zoom level. Zoom 0 is the coarsest level.
+
+        Returns
+        -------
+        int
+            The index of the level in the pyramid.
+        """
+        return len(self._levels) - 1 - zoom
+
+    def n_tiles(self, zoom: int) -> int:
+        """Get the number of tiles at a given zoom level.
+
+        Parameters
+        ----------
+        zoom : int
+            The zoom level. Zoom 0 shows the whole matrix in a single tile.
+
+        Returns
+        -------
+        int
+            The number of tiles.
+        """
+        n_rows = self._levels[self._level(zoom)].shape[0]
+        return max(-(-n_rows // self._tile_size), 1)
+
+    def get_tile(self, zoom: int, tile: int) -> pd.DataFrame:
+        """Get a single tile of the pyramid.
+
+        Parameters
+        ----------
+        zoom : int
+            The zoom level. Zoom 0 shows the whole matrix in a single tile.
+        tile : int
+            The tile number at this zoom level.
+
+        Returns
+        -------
+        pd.DataFrame
+            The averaged rows of the tile, labeled by the rows they cover.
+        """
+        level = self._level(zoom)
+        rows_per_bin = 2 ** level
+        start = tile * self._tile_size
+        values = self._levels[level][start : start + self._tile_size]
+
+        labels = []
+        for i in range(start, start + values.shape[0]):
+            first = i * rows_per_bin
+            last = min(first + rows_per_bin, len(self._index)) - 1
+            if first == last:
+                labels.append(str(self._index[first]))
+            else:
+                labels.append(
+                    f"{self._index[first]} - {self._index[last]} ({last - first + 1})"
+                )
+        return pd.DataFrame(values, index=labels, columns=self._columns)
+
+    @property
+    def n_zoom_levels(self) -> int:
+        """Getter for the number of zoom levels."""
+        return len(self._levels)
+
+    @property
+    def value_range(self) -> Tuple[float, float]:
+        """Getter for the minimum and maximum value of the matrix."""
+        return self._value_range
+
+
+@st.cache(allow_output_mutation=True, hash_funcs={pd.DataFrame: lambda _: None})
+def get_tile_pyramid(
+    dataset_name: str,
+    data_name: str,
+    data: pd.DataFrame,
+    how: Optional[str],
+    tile_size: int,
+    sort_by: Optional[str] = None,
+    positions: Optional[Sequence[int]] = None,
+) -> TilePyramid:
+    """Get the tile pyramid of the normalized data, building it once per dataset.
+    The data itself is not hashed. It is identified by the dataset and data name.
+    A selection of rows gets its own pyramid, so pass the same positions as a
+    tuple in a fixed order to share it.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    data_name : str
+        The name of the data within the dataset. E.g. 'quant_proteins'.
+    data : pd.DataFrame
+        The input matrix (rows x samples).
+    how : Optional[str]
+        The normalization method. If None, the values are used unchanged.
+    tile_size : int
+        The number of rows in a tile.
+    sort_by : Optional[str], optional
+        The ranking to order the rows by, by default the original order.
+    positions : Optional[Sequence[int]], optional
+        The row positions to include, by default all rows.
+
+    Returns
+    -------
+    TilePyramid
+        The tile pyramid. It is shared between figures and must not be mutated.
+    """
+    normalized_data = get_normalized_data(
+        dataset_name=dataset_name, data_name=data_name, data=data, how=how
+    )
+    if sort_by:
+        rank_index = get_rank_indexes(
+            dataset_name=dataset_name, data_name=data_name, data=data, how=how
+        )[sort_by]
+        if positions is None:
+            positions = rank_index.window(start=0, size=normalized_data.shape[0])
+        else:
+            positions = rank_index.rank(positions=np.asarray(positions, dtype=np.intp))
+    if positions is not None:
+        normalized_data = normalized_data.iloc[positions]
+    return TilePyramid(data=normalized_data, tile_size=tile_size)
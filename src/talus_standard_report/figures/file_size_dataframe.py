@@ -4,9 +4,8 @@ from pathlib import Path
 import pandas as pd
 import streamlit as st
 
-from talus_aws_utils.s3 import file_size
-
 from talus_standard_report.constants import RAW_BUCKET
+from talus_standard_report.engines.file_sizes import format_size, get_file_sizes
 from talus_standard_report.utils import get_table_download_link
 
 from .report_figure_abstract_class import ReportFigureAbstractClass
@@ -41,17 +40,22 @@ class FileSizeDataFrame(ReportFigureAbstractClass):
         pd.DataFrame
             The data to plot.
         """
-        size_dicts = []
+        file_keys = tuple(
+            file_key for file_key in self._data["RAW S3 Path"] if isinstance(file_key, str)
+        )
+        sizes = get_file_sizes(
+            dataset_name=self._dataset_name, bucket=RAW_BUCKET, keys=file_keys
+        )
 
+        size_dicts = []
         for file_key, file_type in zip(self._data["RAW S3 Path"], self._data["Acquisition Type"]):
             if not isinstance(file_key, str):
                 continue
-            size = file_size(bucket=RAW_BUCKET, key=file_key)
             size_dicts.append(
                 {
                     "File": Path(file_key).parts[-1],
                     "Type": file_type,
-                    "Size": size,
+                    "Size": format_size(sizes[file_key]) if file_key in sizes else None,
                 }
             )
         return pd.DataFrame(size_dicts).sort_values(by="File").reset_index(drop=True)
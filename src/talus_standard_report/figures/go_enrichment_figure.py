@@ -1,7 +1,6 @@
 """src/talus_standard_report/figures/subcellular_location_enrichment_figure.py module."""
 from typing import Optional, Tuple
 
-import gopher
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -11,7 +10,11 @@ import talus_utils.dataframe as df_utils
 
 from toolz.functoolz import thread_first
 
-from talus_standard_report.constants import PRIMARY_COLOR
+from talus_standard_report.constants import GO_SNAPSHOT_PATH, PRIMARY_COLOR
+from talus_standard_report.engines.go_enrichment import (
+    get_go_enrichment,
+    select_samples,
+)
 from talus_standard_report.utils import get_svg_download_link, get_table_download_link
 
 from .report_figure_abstract_class import ReportFigureAbstractClass
@@ -128,17 +131,21 @@ class GOEnrichmentFigure(ReportFigureAbstractClass):
             )
 
             if "Extraction Fraction" in self._metadata and "Working Compound" in self._metadata:
-                subset_df = self._data[self._data.columns.intersection(list(self._metadata[(self._metadata["Extraction Fraction"].isin(extraction_fractions)) & (self._metadata["Working Compound"].isin(working_compounds))]["Condition"].unique()))]
+                samples = self._data.columns.intersection(list(self._metadata[(self._metadata["Extraction Fraction"].isin(extraction_fractions)) & (self._metadata["Working Compound"].isin(working_compounds))]["Condition"].unique()))
             else:
-                subset_df = self._data
-            if not subset_df.empty:
-                go_enrichment = gopher.test_enrichment(
-                    subset_df,
+                samples = self._data.columns
+            if not samples.empty:
+                # Enrichment is tested once for all samples, filters only select columns
+                go_enrichment = get_go_enrichment(
+                    dataset_name=self._dataset_name,
+                    data_name="quant_proteins",
+                    data=self._data,
                     aspect="c",
-                    go_filters=go_filters, 
+                    go_filters=tuple(sorted(go_filters)),
                     filter_contaminants=True,
-                    progress=False
+                    snapshot_path=GO_SNAPSHOT_PATH,
                 )
+                go_enrichment = select_samples(enrichment=go_enrichment, samples=samples)
                 results_df = go_enrichment.melt(id_vars="GO Name", value_vars=go_enrichment.columns[3:], value_name="pvalue", var_name="Sample Name")
                 results_df["pvalue (-log10)"] = -np.log10(results_df["pvalue"])
 
@@ -149,7 +156,9 @@ class GOEnrichmentFigure(ReportFigureAbstractClass):
                 st.write(self._figure)
                 st.markdown(
                     get_svg_download_link(
-                        fig=self._figure, downloads_path=self._downloads_path
+                        fig=self._figure,
+                        downloads_path=self._downloads_path,
+                        key=self._session_key,
                     ),
                     unsafe_allow_html=True,
                 )
@@ -4,15 +4,14 @@ from typing import Set, Tuple
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
-import talus_utils.dataframe as df_utils
 
-from talus_utils.fasta import parse_fasta_header_uniprot_protein
 from talus_utils.plot import venn
 
 from talus_standard_report.components.custom_protein_uploader import (
     CustomProteinUploader,
 )
 from talus_standard_report.constants import PRIMARY_COLOR, SECONDARY_COLOR
+from talus_standard_report.engines.protein_index import get_protein_index
 
 from .report_figure_abstract_class import ReportFigureAbstractClass
 
@@ -34,7 +33,7 @@ class NuclearProteinOverlapFigure(ReportFigureAbstractClass):
         self._nuclear_proteins = nuclear_proteins
         self._custom_protein_uploader = custom_protein_uploader
 
-    def preprocess_data(self, data: pd.DataFrame) -> Set:
+    def preprocess_data(self, data: pd.DataFrame) -> pd.Series:
         """Preprocess the data to be used in this figure.
 
         Parameters
@@ -42,12 +41,31 @@ class NuclearProteinOverlapFigure(ReportFigureAbstractClass):
         data : pd.DataFrame
             The data to be used in this figure.
 
+        Returns
+        -------
+        pd.Series
+            The protein or protein group of every row to be used in this figure.
+        """
+        self._protein_index = get_protein_index(
+            dataset_name=self._dataset_name, data_name="quant_proteins", data=data
+        )
+        return data["Protein"]
+
+    def get_measured_proteins(self, custom_proteins: Set) -> Set:
+        """Get the measured proteins, naming rows that match a custom protein after it.
+        A protein group counts as an overlap if any of its members is a custom protein.
+
+        Parameters
+        ----------
+        custom_proteins : Set
+            Custom Proteins to compare to.
+
         Returns
         -------
         Set
-            The set of proteins to be used in this figure.
+            The measured proteins.
         """
-        return set(data["Protein"].str.extract("\|.[^;]*\|(?P<Protein>.+?)_*", expand=False))
+        return self._protein_index.measured_names(proteins=custom_proteins)
 
     def get_figure(
         self,
@@ -94,14 +112,17 @@ class NuclearProteinOverlapFigure(ReportFigureAbstractClass):
             st.sidebar.header(self._short_title)
 
             self._custom_protein_uploader.display_choice(session_key=self._session_key)
-            custom_proteins = self._custom_protein_uploader.data
+            custom_proteins = self._custom_protein_uploader.selected_proteins
             use_custom_proteins = self._custom_protein_uploader.use_custom_proteins
+            protein_column = "Custom Proteins"
             if not use_custom_proteins:
                 protein_column = self._nuclear_proteins.columns[-1]
                 custom_proteins = set(self._nuclear_proteins[protein_column].unique())
 
             self._figure = self.get_figure(
-                measured_proteins=self._data,
+                measured_proteins=self.get_measured_proteins(
+                    custom_proteins=custom_proteins
+                ),
                 custom_proteins=custom_proteins,
                 labels=[protein_column, "Measured Proteins"],
             )
@@ -1,7 +1,8 @@
 """src/talus_standard_report/figures/num_peptides_per_protein.py module."""
+from typing import Optional
+
 import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 import talus_utils.dataframe as df_utils
@@ -10,6 +11,11 @@ import talus_utils.plot as plot_utils
 from toolz.functoolz import curry, thread_first
 
 from talus_standard_report.constants import MAX_NUM_PEPTIDES_PER_PROTEIN, PRIMARY_COLOR
+from talus_standard_report.engines.detection_counts import (
+    binned_counts,
+    describe_histogram,
+    get_peptides_per_protein_histogram,
+)
 from talus_standard_report.utils import get_svg_download_link, get_table_download_link
 
 from .report_figure_abstract_class import ReportFigureAbstractClass
@@ -21,12 +27,14 @@ class NumPeptidesPerProteinFigure(ReportFigureAbstractClass):
     def __init__(
         self,
         *args,
+        quant_peptides: Optional[pd.DataFrame] = None,
         **kwargs,
     ):
         super().__init__(
             *args,
             **kwargs,
         )
+        self._quant_peptides = quant_peptides
 
     def preprocess_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """Preprocess the data for plotting.
@@ -39,11 +47,15 @@ class NumPeptidesPerProteinFigure(ReportFigureAbstractClass):
         Returns
         -------
         pd.DataFrame
-            The preprocessed data.
+            The number of proteins per number of peptides across all runs.
         """
-        data = data[["NumPeptides"]]
-        return data.mask(
-            data > MAX_NUM_PEPTIDES_PER_PROTEIN, MAX_NUM_PEPTIDES_PER_PROTEIN
+        num_peptides = data[["NumPeptides"]].fillna(0).to_numpy(dtype=np.int64)
+        return pd.DataFrame(
+            binned_counts(num_peptides, max_value=MAX_NUM_PEPTIDES_PER_PROTEIN),
+            index=pd.RangeIndex(
+                1, MAX_NUM_PEPTIDES_PER_PROTEIN + 1, name="# of Peptides"
+            ),
+            columns=["All Runs"],
         )
 
     def get_figure(
@@ -52,12 +64,13 @@ class NumPeptidesPerProteinFigure(ReportFigureAbstractClass):
         title: str = None,
         color: str = PRIMARY_COLOR,
     ) -> go.Figure:
-        """Create a Histogram Plot using Plotly.
+        """Create a Histogram Plot of pre-binned counts using Plotly.
+        A single distribution is drawn as bars, several are drawn as lines.
 
         Parameters
         ----------
         df : pd.DataFrame
-            The data to plot.
+            The number of proteins (number of peptides x distributions).
         title : str, optional
             The figure title, by default None
         color : str, optional
@@ -68,15 +81,23 @@ class NumPeptidesPerProteinFigure(ReportFigureAbstractClass):
         go.Figure
             The figure object.
         """
-        color_array = np.full(df.shape[0], color)
-        return px.histogram(
-            df,
-            color=color_array,
-            color_discrete_map="identity",
-            title=title,
-            nbins=MAX_NUM_PEPTIDES_PER_PROTEIN,
-            width=self._width,
-            height=self._height,
+        if df.shape[1] == 1:
+            return go.Figure(
+                data=go.Bar(
+                    x=df.index,
+                    y=df.iloc[:, 0],
+                    marker_color=color,
+                    name=str(df.columns[0]),
+                ),
+                layout={"title": title, "width": self._width, "height": self._height},
+            )
+
+        return go.Figure(
+            data=[
+                go.Scatter(x=df.index, y=df[column], mode="lines+markers", name=column)
+                for column in df.columns
+            ],
+            layout={"title": title, "width": self._width, "height": self._height},
         )
 
     def display(self) -> None:
@@ -86,6 +107,22 @@ class NumPeptidesPerProteinFigure(ReportFigureAbstractClass):
             if self._subheader:
                 st.subheader(self._subheader)
 
+            distribution = self._data
+            if self._quant_peptides is not None:
+                st.sidebar.header(self._short_title)
+                count_by = st.sidebar.radio(
+                    "Distribution per",
+                    ["All Runs", "Sample", "Condition"],
+                    key=f"{self._session_key}_count_by",
+                )
+                if count_by != "All Runs":
+                    distribution = get_peptides_per_protein_histogram(
+                        dataset_name=self._dataset_name,
+                        quant_peptides=self._quant_peptides,
+                        max_num_peptides=MAX_NUM_PEPTIDES_PER_PROTEIN,
+                        by=count_by,
+                    )
+
             self._figure = thread_first(
                 self.get_figure,
                 curry(
@@ -97,12 +134,14 @@ class NumPeptidesPerProteinFigure(ReportFigureAbstractClass):
                     )
                 ),
                 df_utils.copy,
-            )(df=self._data, color=PRIMARY_COLOR)
+            )(df=distribution, color=PRIMARY_COLOR)
 
             st.write(self._figure)
             st.markdown(
                 get_svg_download_link(
-                    fig=self._figure, downloads_path=self._downloads_path
+                    fig=self._figure,
+                    downloads_path=self._downloads_path,
+                    key=self._session_key,
                 ),
                 unsafe_allow_html=True,
             )
@@ -113,12 +152,12 @@ class NumPeptidesPerProteinFigure(ReportFigureAbstractClass):
                 key=f"{self._session_key}_description",
             )
             with st.beta_expander("Show Descriptive Stats"):
-                st.dataframe(self._data.describe())
+                st.dataframe(describe_histogram(histogram=distribution))
             st.text("")
 
             st.markdown(
                 get_table_download_link(
-                    df=self._data, downloads_path=self._downloads_path
+                    df=distribution, downloads_path=self._downloads_path
                 ),
                 unsafe_allow_html=True,
             )
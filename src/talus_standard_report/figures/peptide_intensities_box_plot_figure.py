@@ -5,11 +5,11 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 import talus_utils.dataframe as df_utils
-from talus_utils.dataframe import median_normalize, quantile_normalize
 
 from toolz.functoolz import curry, thread_first
 
 from talus_standard_report.constants import PRIMARY_COLOR
+from talus_standard_report.engines.normalization import get_normalized_data
 from talus_standard_report.utils import get_svg_download_link, get_table_download_link
 
 from .report_figure_abstract_class import ReportFigureAbstractClass
@@ -94,11 +94,12 @@ class PeptideIntensitiesBoxPlotFigure(ReportFigureAbstractClass):
             normalization = st.sidebar.selectbox(
                 "Select Normalization", options=normalization_options, key=f"{self._session_key}_normalization"
             )
-            plot_data = self._data
-            if normalization and normalization.lower() == "median":
-                plot_data = median_normalize(self._data)
-            elif normalization and normalization.lower() == "quantile":
-                plot_data = quantile_normalize(self._data)
+            plot_data = get_normalized_data(
+                dataset_name=self._dataset_name,
+                data_name="quant_peptides",
+                data=self._data,
+                how=normalization,
+            )
 
             self._figure = thread_first(
                     self.get_figure,
@@ -112,7 +113,9 @@ class PeptideIntensitiesBoxPlotFigure(ReportFigureAbstractClass):
             st.write(self._figure)
             st.markdown(
                 get_svg_download_link(
-                    fig=self._figure, downloads_path=self._downloads_path
+                    fig=self._figure,
+                    downloads_path=self._downloads_path,
+                    key=self._session_key,
                 ),
                 unsafe_allow_html=True,
             )
@@ -1,6 +1,6 @@
 """src/talus_standard_report/figures/peptide_intensities_clustergram.py module."""
 
-from typing import Dict, List
+from typing import Dict, Hashable, List
 
 import dash_bio as dashbio
 import numpy as np
@@ -9,10 +9,14 @@ import plotly.graph_objects as go
 import streamlit as st
 import talus_utils.dataframe as df_utils
 
-from sklearn.decomposition import PCA
 from toolz.functoolz import curry, thread_first
 
 from talus_standard_report.constants import MAX_NUM_PEPTIDES_HEATMAP, PRIMARY_COLOR
+from talus_standard_report.engines.clustering import (
+    get_clustergram_traces,
+    get_peptide_clusters,
+)
+from talus_standard_report.engines.pca import get_top_loadings
 from talus_standard_report.utils import get_svg_download_link, get_table_download_link
 
 from .report_figure_abstract_class import ReportFigureAbstractClass
@@ -23,7 +27,6 @@ class PeptideIntensitiesClustergram(ReportFigureAbstractClass):
 
     def __init__(
         self,
-        pca_model: PCA,
         file_to_condition: Dict[str, str],
         *args,
         **kwargs,
@@ -33,7 +36,6 @@ class PeptideIntensitiesClustergram(ReportFigureAbstractClass):
             *args,
             **kwargs,
         )
-        self._pca_model = pca_model
 
     @df_utils.copy
     def preprocess_data(self, data: pd.DataFrame) -> pd.DataFrame:
@@ -52,6 +54,13 @@ class PeptideIntensitiesClustergram(ReportFigureAbstractClass):
         data = data.drop(["Protein", "numFragments"], axis=1)
         data = data.drop_duplicates(subset="Peptide")
         data = data.set_index(["Peptide"])
+        # Share the PCA fit with the PCA plot, which uses the same peptide matrix
+        self._top_loadings = get_top_loadings(
+            dataset_name=self._dataset_name,
+            data_name="quant_peptides",
+            data=data,
+            k=MAX_NUM_PEPTIDES_HEATMAP,
+        )
         # Remove all the columns that are not present in the validation dataframe
         data = data[list(self._file_to_condition.values())]
         return data
@@ -59,7 +68,7 @@ class PeptideIntensitiesClustergram(ReportFigureAbstractClass):
     def get_figure(
         self,
         df: pd.DataFrame,
-        selected_indices: slice,
+        selection: Hashable,
         column_labels: List[str] = None,
         cluster: str = "all",
         hide_row_labels: bool = True,
@@ -70,9 +79,9 @@ class PeptideIntensitiesClustergram(ReportFigureAbstractClass):
         Parameters
         ----------
         df : pd.DataFrame
-            The dataframe to use for the figure.
-        selected_indices : slice
-            The dataframe indices to use for the figure.
+            The selected rows of the dataframe to use for the figure.
+        selection : Hashable
+            A key identifying the selected rows, used to cache the clustering.
         column_labels : List[str], optional
             A list of column labels to use for the figure, by default None
         cluster : str, optional
@@ -91,12 +100,24 @@ class PeptideIntensitiesClustergram(ReportFigureAbstractClass):
         if hide_row_labels:
             hidden_labels.append("row")
 
-        # filter by selected indices
-        df = df.iloc[selected_indices, :]
+        color_threshold = {"row": 150, "col": 700}
+        color_map = [
+            [0.0, "#FFFFFF"],
+            [1.0, color],
+        ]
+        computed_traces = get_clustergram_traces(
+            dataset_name=self._dataset_name,
+            selection=selection,
+            data=df,
+            cluster=cluster,
+            color_threshold=color_threshold,
+            color_map=color_map,
+        )
 
         fig = dashbio.Clustergram(
             data=df,
-            color_threshold={"row": 150, "col": 700},
+            computed_traces=computed_traces,
+            color_threshold=color_threshold,
             column_labels=column_labels,
             row_labels=list(df.index),
             hidden_labels=hidden_labels,
@@ -105,10 +126,7 @@ class PeptideIntensitiesClustergram(ReportFigureAbstractClass):
             height=self._height,
             plot_bg_color="#FFFFFF",
             paper_bg_color="#FFFFFF",
-            color_map=[
-                [0.0, "#FFFFFF"],
-                [1.0, color],
-            ],
+            color_map=color_map,
             line_width=2,
         )
 
@@ -131,29 +149,60 @@ class PeptideIntensitiesClustergram(ReportFigureAbstractClass):
             st.sidebar.header(self._short_title)
             cluster_selection_method = st.sidebar.selectbox(
                 "Sort By",
-                ["PCA Most Influential Peptides", "Chronological"],
+                ["PCA Most Influential Peptides", "Chronological", "All Peptides (Pre-Clustered)"],
                 key=f"{self._session_key}_sortby",
             )
-            if cluster_selection_method == "Chronological":
+            cluster = st.sidebar.selectbox(
+                "Cluster",
+                ["all", "row", "col"],
+                format_func=lambda c: {"all": "Rows and Columns", "row": "Rows", "col": "Columns"}[c],
+                key=f"{self._session_key}_cluster",
+            )
+            hide_row_labels = True
+            if cluster_selection_method == "All Peptides (Pre-Clustered)":
+                peptide_clusters = get_peptide_clusters(
+                    dataset_name=self._dataset_name,
+                    data_name="quant_peptides",
+                    data=self._data,
+                    n_clusters=MAX_NUM_PEPTIDES_HEATMAP,
+                )
+                drill_down_cluster = st.sidebar.selectbox(
+                    "Drill down into cluster",
+                    [None] + list(range(peptide_clusters.centroids.shape[0])),
+                    format_func=lambda c: "All clusters"
+                    if c is None
+                    else peptide_clusters.centroids.index[c],
+                    key=f"{self._session_key}_drill_down",
+                )
+                if drill_down_cluster is None:
+                    selection = ("clusters",)
+                    selected_data = peptide_clusters.centroids
+                    hide_row_labels = False
+                else:
+                    selection = ("cluster", drill_down_cluster)
+                    selected_data = self._data.iloc[
+                        peptide_clusters.members(
+                            cluster=drill_down_cluster, k=MAX_NUM_PEPTIDES_HEATMAP
+                        )
+                    ]
+            elif cluster_selection_method == "Chronological":
                 start_index = st.sidebar.slider(
                     f"Select start of range ({MAX_NUM_PEPTIDES_HEATMAP} peptides at a time)",
                     min_value=0,
                     max_value=self._data.shape[0] - MAX_NUM_PEPTIDES_HEATMAP,
                     key=f"{self._session_key}_start",
                 )
-                selected_indices = slice(
-                    start_index, start_index + MAX_NUM_PEPTIDES_HEATMAP
-                )
+                selection = ("chronological", start_index)
+                selected_data = self._data.iloc[
+                    start_index : start_index + MAX_NUM_PEPTIDES_HEATMAP
+                ]
             else:
                 pca_dim = st.sidebar.selectbox(
                     "PCA Dimension",
-                    [i for i in range(1, self._pca_model.components_.shape[0] + 1)],
+                    [i for i in range(1, self._top_loadings.shape[1] + 1)],
                 )
-                most_important_features = [
-                    (-np.abs(component)).argsort()[:MAX_NUM_PEPTIDES_HEATMAP]
-                    for component in self._pca_model.components_
-                ]
-                selected_indices = most_important_features[pca_dim - 1]
+                selection = ("pca", pca_dim)
+                selected_data = self._data.loc[self._top_loadings[f"pc{pca_dim}"]]
 
             self._figure = thread_first(
                 self.get_figure,
@@ -162,15 +211,19 @@ class PeptideIntensitiesClustergram(ReportFigureAbstractClass):
                 ),
                 df_utils.copy,
             )(
-                df=self._data,
-                selected_indices=selected_indices,
+                df=selected_data,
+                selection=selection,
                 column_labels=list(self._data.columns),
+                cluster=cluster,
+                hide_row_labels=hide_row_labels,
             )
 
             st.write(self._figure)
             st.markdown(
                 get_svg_download_link(
-                    fig=self._figure, downloads_path=self._downloads_path
+                    fig=self._figure,
+                    downloads_path=self._downloads_path,
+                    key=self._session_key,
                 ),
                 unsafe_allow_html=True,
             )
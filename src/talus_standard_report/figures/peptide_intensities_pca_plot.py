@@ -8,11 +8,10 @@ import streamlit as st
 import talus_utils.dataframe as df_utils
 import talus_utils.plot as plot_utils
 
-from sklearn.decomposition import PCA
 from toolz.functoolz import curry, thread_first
-from traitlets.traitlets import default
 
 from talus_standard_report.constants import PRIMARY_COLOR
+from talus_standard_report.engines.pca import IMPUTATION_METHODS, PCA_SOLVERS, get_pca
 from talus_standard_report.utils import get_svg_download_link, get_table_download_link
 
 from .report_figure_abstract_class import ReportFigureAbstractClass
@@ -48,17 +47,9 @@ class PeptideIntensitiesPCAPlot(ReportFigureAbstractClass):
             The preprocessed dataframe.
         """
         data = data.drop(["Protein", "numFragments"], axis=1)
+        data = data.drop_duplicates(subset="Peptide")
         data = data.set_index(["Peptide"])
-        pca_peptides = PCA(n_components=3, random_state=42)
-        data_reduced = pca_peptides.fit_transform(data.values.T)
-        self._pca_model = pca_peptides
-        n_components = data_reduced.shape[1]
-        data_reduced_df = pd.DataFrame(
-            data_reduced,
-            columns=[f"pc{n}" for n in range(1, n_components+1)],
-            index=data.columns,
-        ).reset_index()
-        return data_reduced_df
+        return data
 
     def get_figure(
         self,
@@ -111,6 +102,39 @@ class PeptideIntensitiesPCAPlot(ReportFigureAbstractClass):
                 st.subheader(self._subheader)
             st.sidebar.header(self._short_title)
 
+            imputation = st.sidebar.selectbox(
+                "Impute missing values with",
+                options=IMPUTATION_METHODS,
+                format_func=str.capitalize,
+                key=f"{self._session_key}_imputation",
+            )
+            log_transform = st.sidebar.checkbox(
+                "Log transform", value=False, key=f"{self._session_key}_log_transform"
+            )
+            center = st.sidebar.checkbox(
+                "Center", value=True, key=f"{self._session_key}_center"
+            )
+            solver = st.sidebar.selectbox(
+                "Solver",
+                options=PCA_SOLVERS,
+                format_func=str.capitalize,
+                key=f"{self._session_key}_solver",
+            )
+            try:
+                pca_result = get_pca(
+                    dataset_name=self._dataset_name,
+                    data_name="quant_peptides",
+                    data=self._data,
+                    imputation=imputation,
+                    log_transform=log_transform,
+                    center=center,
+                    solver=solver,
+                )
+            except ValueError as e:
+                st.error(e)
+                return
+            pca_scores = pca_result.scores.reset_index()
+
             color_choices = list(self._metadata.columns)
             color_choices.insert(0, None)
             color_by = st.sidebar.selectbox(
@@ -120,16 +144,16 @@ class PeptideIntensitiesPCAPlot(ReportFigureAbstractClass):
                 key=f"{self._session_key}_color_by"
             )
             if color_by:
-                enriched_data = self._data.merge(self._metadata[["Condition", color_by]], left_on="index", right_on="Condition")
+                enriched_data = pca_scores.merge(self._metadata[["Condition", color_by]], left_on="index", right_on="Condition")
             else:
-                enriched_data = self._data
+                enriched_data = pca_scores
 
             self._figure = thread_first(
                 self.get_figure,
                 curry(
                     plot_utils.update_layout(
-                        xaxis_title=f"Principal Component 1 ({self._pca_model.explained_variance_ratio_[0]*100:.2f}%)",
-                        yaxis_title=f"Principal Component 2 ({self._pca_model.explained_variance_ratio_[1]*100:.2f}%)",
+                        xaxis_title=f"Principal Component 1 ({pca_result.explained_variance_ratio[0]*100:.2f}%)",
+                        yaxis_title=f"Principal Component 2 ({pca_result.explained_variance_ratio[1]*100:.2f}%)",
                     )
                 ),
             )(
@@ -141,7 +165,9 @@ class PeptideIntensitiesPCAPlot(ReportFigureAbstractClass):
             st.write(self._figure)
             st.markdown(
                 get_svg_download_link(
-                    fig=self._figure, downloads_path=self._downloads_path
+                    fig=self._figure,
+                    downloads_path=self._downloads_path,
+                    key=self._session_key,
                 ),
                 unsafe_allow_html=True,
             )
@@ -153,7 +179,7 @@ class PeptideIntensitiesPCAPlot(ReportFigureAbstractClass):
             )
             st.markdown(
                 get_table_download_link(
-                    df=self._data, downloads_path=self._downloads_path
+                    df=pca_scores, downloads_path=self._downloads_path
                 ),
                 unsafe_allow_html=True,
             )
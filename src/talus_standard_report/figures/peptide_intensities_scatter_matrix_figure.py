@@ -110,7 +110,9 @@ class PeptideIntensitiesScatterMatrixFigure(ReportFigureAbstractClass):
             st.write(self._figure)
             st.markdown(
                 get_svg_download_link(
-                    fig=self._figure, downloads_path=self._downloads_path
+                    fig=self._figure,
+                    downloads_path=self._downloads_path,
+                    key=self._session_key,
                 ),
                 unsafe_allow_html=True,
             )
@@ -1,5 +1,5 @@
 """src/talus_standard_report/figures/protein_intensities_heatmap.py module."""
-from typing import Optional, Set, Tuple
+from typing import Optional, Tuple
 
 import pandas as pd
 import plotly.express as px
@@ -8,12 +8,15 @@ import streamlit as st
 import talus_utils.dataframe as df_utils
 
 from talus_utils.fasta import parse_fasta_header_uniprot_protein
-from toolz.functoolz import curry, thread_first
 
 from talus_standard_report.components.custom_protein_uploader import (
     CustomProteinUploader,
 )
 from talus_standard_report.constants import MAX_NUM_PROTEINS_HEATMAP, PRIMARY_COLOR
+from talus_standard_report.engines.normalization import get_normalized_data
+from talus_standard_report.engines.protein_index import get_protein_index
+from talus_standard_report.engines.ranking import RANKINGS, get_rank_indexes
+from talus_standard_report.engines.tile_pyramid import get_tile_pyramid
 from talus_standard_report.utils import get_svg_download_link, get_table_download_link
 
 from .report_figure_abstract_class import ReportFigureAbstractClass
@@ -50,6 +53,9 @@ class ProteinIntensitiesHeatmap(ReportFigureAbstractClass):
         """
         # This suddenly stopped working
         # protein = data["Protein"].str.extractall("\|.[^;]*\|(?P<Protein>.+?)_*").reset_index(level=[0,1]).groupby("level_0")["Protein"].apply(lambda p: ";".join(p.astype(str)))
+        self._protein_index = get_protein_index(
+            dataset_name=self._dataset_name, data_name="quant_proteins", data=data
+        )
         data["Protein"] = data["Protein"].apply(lambda p: p.split("|")[-1].split("_")[0])
         data = data.drop(columns=["NumPeptides", "PeptideSequences"], axis=1)
         data = data.set_index("Protein")
@@ -58,8 +64,6 @@ class ProteinIntensitiesHeatmap(ReportFigureAbstractClass):
     def get_figure(
         self,
         df: pd.DataFrame,
-        start_index: Optional[int] = 0,
-        custom_proteins: Optional[Set[str]] = None,
         title: Optional[str] = None,
         color: Optional[Tuple[str, str]] = ("#FFFFFF", PRIMARY_COLOR),
         zdim: Tuple[Optional[float], Optional[float]] = (None, None),
@@ -69,11 +73,7 @@ class ProteinIntensitiesHeatmap(ReportFigureAbstractClass):
         Parameters
         ----------
         df : pd.DataFrame
-            The dataframe to plot.
-        start_index : Optional[int], optional
-            The index to start plotting at, by default 0.
-        custom_proteins : Optional[Set[str]], optional
-            A set of custom proteins to plot, by default None.
+            The rows to plot. At most MAX_NUM_PROTEINS_HEATMAP rows are plotted.
         title : Optional[str], optional
             The title of the figure, by default None.
         color : Optional[Tuple[str, str]], optional
@@ -86,15 +86,8 @@ class ProteinIntensitiesHeatmap(ReportFigureAbstractClass):
         go.Figure
             The figure to plot.
         """
-        # filter for custom proteins if given
-        if len(custom_proteins) > 0:
-            df = df[df.index.isin(custom_proteins)]
-
-        # filter by start_index
-        df = df.iloc[start_index : start_index + MAX_NUM_PROTEINS_HEATMAP]
-
         return px.imshow(
-            df,
+            df.iloc[:MAX_NUM_PROTEINS_HEATMAP],
             title=title,
             zmin=zdim[0],
             zmax=zdim[1],
@@ -113,37 +106,108 @@ class ProteinIntensitiesHeatmap(ReportFigureAbstractClass):
             st.sidebar.header(self._short_title)
 
             self._custom_protein_uploader.display_choice(session_key=self._session_key)
-            custom_proteins = self._custom_protein_uploader.data
+            custom_proteins = self._custom_protein_uploader.selected_proteins
             use_custom_proteins = self._custom_protein_uploader.use_custom_proteins
             if not use_custom_proteins:
                 custom_proteins = set()
 
-            start_index = st.sidebar.slider(
-                f"Select start of range ({MAX_NUM_PROTEINS_HEATMAP} proteins)",
-                min_value=0,
-                max_value=self._data.shape[0] - MAX_NUM_PROTEINS_HEATMAP,
-                key=f"{self._session_key}_start",
-            )
             normalize_val = st.sidebar.radio(
                 "Select normalization",
                 ["Row", "Column", "None"],
                 key=f"{self._session_key}_normalize",
             )
-            normalize_func = lambda x: x
-            if normalize_val in set(["Row", "Column"]):
-                normalize_func = df_utils.normalize(how=normalize_val)
-
-            self._figure = thread_first(
-                self.get_figure,
-                # curry(df_utils.sort_row_values(how="max")),
-                curry(normalize_func),
-                df_utils.copy,
-            )(df=self._data, start_index=start_index, custom_proteins=custom_proteins)
+            sort_by = st.sidebar.selectbox(
+                "Sort by",
+                RANKINGS,
+                key=f"{self._session_key}_sort_by",
+            )
+            view = st.sidebar.radio(
+                "View",
+                ["Window", "Zoomable Overview"],
+                key=f"{self._session_key}_view",
+            )
+            if view == "Zoomable Overview":
+                positions = None
+                if len(custom_proteins) > 0:
+                    positions = tuple(
+                        self._protein_index.positions(proteins=custom_proteins).tolist()
+                    )
+                tile_pyramid = get_tile_pyramid(
+                    dataset_name=self._dataset_name,
+                    data_name="quant_proteins",
+                    data=self._data,
+                    how=normalize_val,
+                    tile_size=MAX_NUM_PROTEINS_HEATMAP,
+                    sort_by=sort_by,
+                    positions=positions,
+                )
+                zoom = 0
+                if tile_pyramid.n_zoom_levels > 1:
+                    zoom = st.sidebar.slider(
+                        "Zoom level",
+                        min_value=0,
+                        max_value=tile_pyramid.n_zoom_levels - 1,
+                        key=f"{self._session_key}_zoom",
+                    )
+                tile = 0
+                if tile_pyramid.n_tiles(zoom=zoom) > 1:
+                    tile = st.sidebar.slider(
+                        f"Select tile ({MAX_NUM_PROTEINS_HEATMAP} rows)",
+                        min_value=0,
+                        max_value=tile_pyramid.n_tiles(zoom=zoom) - 1,
+                        key=f"{self._session_key}_tile",
+                    )
+                # Only the visible tile is sent to the browser
+                self._figure = self.get_figure(
+                    df=tile_pyramid.get_tile(zoom=zoom, tile=tile),
+                    zdim=tile_pyramid.value_range,
+                )
+            else:
+                rank_index = get_rank_indexes(
+                    dataset_name=self._dataset_name,
+                    data_name="quant_proteins",
+                    data=self._data,
+                    how=normalize_val,
+                )[sort_by]
+                if len(custom_proteins) > 0:
+                    ranked_positions = rank_index.rank(
+                        positions=self._protein_index.positions(proteins=custom_proteins)
+                    )
+                    n_rows = len(ranked_positions)
+                else:
+                    n_rows = self._data.shape[0]
+
+                start_index = 0
+                if n_rows > MAX_NUM_PROTEINS_HEATMAP:
+                    start_index = st.sidebar.slider(
+                        f"Select start of range ({MAX_NUM_PROTEINS_HEATMAP} proteins)",
+                        min_value=0,
+                        max_value=n_rows - MAX_NUM_PROTEINS_HEATMAP,
+                        key=f"{self._session_key}_start",
+                    )
+                if len(custom_proteins) > 0:
+                    positions = ranked_positions[
+                        start_index : start_index + MAX_NUM_PROTEINS_HEATMAP
+                    ]
+                else:
+                    positions = rank_index.window(
+                        start=start_index, size=MAX_NUM_PROTEINS_HEATMAP
+                    )
+                normalized_data = get_normalized_data(
+                    dataset_name=self._dataset_name,
+                    data_name="quant_proteins",
+                    data=self._data,
+                    how=normalize_val,
+                )
+
+                self._figure = self.get_figure(df=normalized_data.iloc[positions])
 
             st.write(self._figure)
             st.markdown(
                 get_svg_download_link(
-                    fig=self._figure, downloads_path=self._downloads_path
+                    fig=self._figure,
+                    downloads_path=self._downloads_path,
+                    key=self._session_key,
                 ),
                 unsafe_allow_html=True,
             )
@@ -0,0 +1,252 @@
+"""src/talus_standard_report/figures/protein_overlap_upset_figure.py module."""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+import talus_utils.dataframe as df_utils
+
+from plotly.subplots import make_subplots
+
+from talus_standard_report.components.custom_protein_uploader import (
+    CustomProteinUploader,
+)
+from talus_standard_report.constants import (
+    MAX_NUM_INTERSECTIONS_UPSET,
+    PRIMARY_COLOR,
+    SECONDARY_COLOR,
+)
+from talus_standard_report.engines.overlap import get_protein_bitsets
+from talus_standard_report.engines.protein_index import (
+    get_protein_index,
+    protein_names,
+)
+from talus_standard_report.utils import get_svg_download_link, get_table_download_link
+
+from .report_figure_abstract_class import ReportFigureAbstractClass
+
+
+class ProteinOverlapUpSetFigure(ReportFigureAbstractClass):
+    """Create an UpSet plot of the overlap between protein collections and samples."""
+
+    def __init__(
+        self,
+        protein_collections: pd.DataFrame,
+        custom_protein_uploader: CustomProteinUploader,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(
+            *args,
+            **kwargs,
+        )
+        self._protein_collections = protein_collections
+        self._custom_protein_uploader = custom_protein_uploader
+
+    @df_utils.copy
+    def preprocess_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Preprocess the data to be used in this figure.
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            The data to be used in this figure.
+
+        Returns
+        -------
+        pd.DataFrame
+            Whether each protein was detected in each sample (proteins x samples).
+        """
+        self._protein_index = get_protein_index(
+            dataset_name=self._dataset_name, data_name="quant_proteins", data=data
+        )
+        proteins = protein_names(proteins=data["Protein"])
+        data = data.drop(columns=["Protein", "NumPeptides", "PeptideSequences"], axis=1)
+        return (data.fillna(0) > 0).groupby(proteins.values).any()
+
+    def get_figure(
+        self,
+        intersections: pd.DataFrame,
+        set_sizes: pd.Series,
+        title: str = None,
+        color: str = PRIMARY_COLOR,
+        inactive_color: str = "#E5E5E5",
+    ) -> go.Figure:
+        """Create an UpSet plot of the intersection sizes.
+
+        Parameters
+        ----------
+        intersections : pd.DataFrame
+            One row per intersection with a boolean column per set and its 'Size'.
+        set_sizes : pd.Series
+            The number of proteins in every set.
+        title : str, optional
+            The figure title, by default None
+        color : str, optional
+            The color of the bars and set memberships, by default PRIMARY_COLOR
+        inactive_color : str, optional
+            The color of the sets that are not part of an intersection,
+            by default "#E5E5E5"
+
+        Returns
+        -------
+        go.Figure
+            The figure object.
+        """
+        set_names = list(set_sizes.index)
+        x = np.arange(intersections.shape[0])
+        y = np.arange(len(set_names))
+        memberships = intersections[set_names].to_numpy()
+
+        fig = make_subplots(
+            rows=2,
+            cols=2,
+            shared_xaxes=True,
+            shared_yaxes=True,
+            column_widths=[0.2, 0.8],
+            row_heights=[0.6, 0.4],
+            horizontal_spacing=0.01,
+            vertical_spacing=0.01,
+        )
+        fig.add_trace(
+            go.Bar(
+                x=x,
+                y=intersections["Size"],
+                marker_color=color,
+                hovertemplate="%{y} proteins<extra></extra>",
+            ),
+            row=1,
+            col=2,
+        )
+        fig.add_trace(
+            go.Bar(
+                x=set_sizes.to_numpy(),
+                y=y,
+                orientation="h",
+                marker_color=SECONDARY_COLOR,
+                hovertemplate="%{x} proteins<extra></extra>",
+            ),
+            row=2,
+            col=1,
+        )
+        grid_x, grid_y = np.meshgrid(x, y, indexing="ij")
+        fig.add_trace(
+            go.Scatter(
+                x=grid_x.ravel(),
+                y=grid_y.ravel(),
+                mode="markers",
+                marker={
+                    "size": 10,
+                    "color": np.where(memberships.ravel(), color, inactive_color),
+                },
+                hoverinfo="skip",
+            ),
+            row=2,
+            col=2,
+        )
+        # Connect the sets of every intersection with a vertical line
+        for i, row in enumerate(memberships):
+            members = np.flatnonzero(row)
+            if members.shape[0] > 1:
+                fig.add_trace(
+                    go.Scatter(
+                        x=[i, i],
+                        y=[members.min(), members.max()],
+                        mode="lines",
+                        line={"color": color, "width": 2},
+                        hoverinfo="skip",
+                    ),
+                    row=2,
+                    col=2,
+                )
+
+        fig.update_layout(
+            title=title,
+            showlegend=False,
+            width=self._width,
+            height=self._height,
+            plot_bgcolor="#FFFFFF",
+        )
+        fig.update_xaxes(showticklabels=False, row=2, col=2)
+        fig.update_xaxes(title_text="Set Size", autorange="reversed", row=2, col=1)
+        fig.update_yaxes(title_text="Intersection Size", row=1, col=2)
+        fig.update_yaxes(
+            tickvals=y, ticktext=set_names, autorange="reversed", row=2, col=1
+        )
+        return fig
+
+    def display(self) -> None:
+        """Display the figure."""
+        if self._is_active:
+            st.header(self._title)
+            if self._subheader:
+                st.subheader(self._subheader)
+            st.sidebar.header(self._short_title)
+
+            self._custom_protein_uploader.display_choice(session_key=self._session_key)
+            custom_proteins = frozenset()
+            if self._custom_protein_uploader.use_custom_proteins:
+                custom_proteins = frozenset(
+                    self._custom_protein_uploader.selected_proteins
+                )
+
+            protein_bitsets = get_protein_bitsets(
+                dataset_name=self._dataset_name,
+                data_name="quant_proteins",
+                data=self._data,
+                collections=self._protein_collections,
+                protein_index=self._protein_index,
+                custom_proteins=custom_proteins,
+            )
+            default_sets = [
+                name for name in protein_bitsets.names if name not in self._data.columns
+            ]
+            set_names = st.sidebar.multiselect(
+                "Select protein sets",
+                options=list(protein_bitsets.names),
+                default=default_sets,
+                key=f"{self._session_key}_sets",
+            )
+            if not set_names:
+                st.warning("Please select at least one protein set.")
+                return
+            max_intersections = min(
+                MAX_NUM_INTERSECTIONS_UPSET, 2 ** len(set_names) - 1
+            )
+            if max_intersections > 1:
+                max_intersections = st.sidebar.slider(
+                    "Maximum number of intersections",
+                    min_value=1,
+                    max_value=max_intersections,
+                    value=max_intersections,
+                    key=f"{self._session_key}_max_intersections",
+                )
+
+            intersections = protein_bitsets.intersections(
+                names=set_names, max_intersections=max_intersections
+            )
+            self._figure = self.get_figure(
+                intersections=intersections,
+                set_sizes=protein_bitsets.set_sizes[set_names],
+            )
+
+            st.write(self._figure)
+            st.markdown(
+                get_svg_download_link(
+                    fig=self._figure,
+                    downloads_path=self._downloads_path,
+                    key=self._session_key,
+                ),
+                unsafe_allow_html=True,
+            )
+
+            self._description = st.text_area(
+                "Description",
+                value=self._description_placeholder,
+                key=f"{self._session_key}_description",
+            )
+            st.markdown(
+                get_table_download_link(
+                    df=intersections, downloads_path=self._downloads_path
+                ),
+                unsafe_allow_html=True,
+            )
@@ -1,7 +1,7 @@
 """src/talus_standard_report/figures/report_figure_abstract_class.py module."""
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional, Tuple, Union
+from typing import Any, Dict, Optional, Tuple, Union
 
 import inflection
 import pandas as pd
@@ -129,6 +129,19 @@ class ReportFigureAbstractClass(ABC):
         """Getter for description."""
         return self._description
 
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        """Getter for the state of the figure's widgets, e.g. its normalization."""
+        prefix = f"{self._session_key}_"
+        # The description and export buttons don't change the figure's data
+        return {
+            key[len(prefix) :]: value
+            for key, value in sorted(st.session_state.items())
+            if key.startswith(prefix)
+            and key != f"{prefix}description"
+            and not key.startswith(f"{prefix}export_")
+        }
+
     @property
     def width(self):
         """Getter for width."""
@@ -5,13 +5,14 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-import talus_utils.algorithms as algo_utils
 import talus_utils.dataframe as df_utils
 
-from talus_utils.fasta import parse_fasta_header_uniprot_protein
-from toolz.functoolz import curry, thread_first
-
 from talus_standard_report.constants import MAX_NUM_PROTEINS_HEATMAP, PRIMARY_COLOR
+from talus_standard_report.engines.normalization import normalize
+from talus_standard_report.engines.protein_index import protein_names
+from talus_standard_report.engines.subcellular_enrichment import (
+    get_subcellular_enrichment_scores,
+)
 from talus_standard_report.utils import get_svg_download_link, get_table_download_link
 
 from .report_figure_abstract_class import ReportFigureAbstractClass
@@ -28,15 +29,12 @@ class SubcellularLocationEnrichmentFigure(ReportFigureAbstractClass):
         **kwargs,
     ):
         self._protein_locations = protein_locations
+        self._expected_fractions_of_locations = expected_fractions_of_locations
         super().__init__(
             *args,
             **kwargs,
         )
-        self._expected_fractions_of_locations = expected_fractions_of_locations
 
-    @df_utils.update_column(
-        column="PROTEIN", update_func=parse_fasta_header_uniprot_protein
-    )
     @df_utils.copy
     def preprocess_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """Preprocess the data for plotting.
@@ -49,22 +47,12 @@ class SubcellularLocationEnrichmentFigure(ReportFigureAbstractClass):
         Returns
         -------
         pd.DataFrame
-            The preprocessed data.
+            Whether each protein was detected in each sample (proteins x samples).
+            Protein groups are named after their first protein.
         """
-        data = data[data["ABUNDANCE"] > 0.0]
-        data = data[["PROTEIN", "GROUP"]]
-        data.columns = ["Protein", "Sample"]
-        data = data.drop_duplicates()
-
-        data = pd.merge(
-            data,
-            self._protein_locations,
-            left_on="Protein",
-            right_on="Entry name",
-            how="left",
-        )
-        data = data.drop("Entry name", axis=1)
-        return data
+        proteins = protein_names(proteins=data["Protein"])
+        data = data.drop(columns=["Protein", "NumPeptides", "PeptideSequences"], axis=1)
+        return (data.fillna(0) > 0).groupby(proteins.values).any()
 
     def get_figure(
         self,
@@ -111,37 +99,41 @@ class SubcellularLocationEnrichmentFigure(ReportFigureAbstractClass):
                 st.subheader(self._subheader)
             st.sidebar.header(self._short_title)
 
-            start_index = st.sidebar.slider(
-                f"Select start of range ({MAX_NUM_PROTEINS_HEATMAP} proteins)",
-                min_value=0,
-                max_value=self._data.shape[0] - MAX_NUM_PROTEINS_HEATMAP,
-                key=f"{self._session_key}_start",
+            enrichment_scores = get_subcellular_enrichment_scores(
+                dataset_name=self._dataset_name,
+                data_name="quant_proteins",
+                detected=self._data,
+                protein_locations=self._protein_locations,
+                expected_fractions_of_locations=self._expected_fractions_of_locations,
             )
+
+            start_index = 0
+            if enrichment_scores.shape[0] > MAX_NUM_PROTEINS_HEATMAP:
+                start_index = st.sidebar.slider(
+                    f"Select start of range ({MAX_NUM_PROTEINS_HEATMAP} locations)",
+                    min_value=0,
+                    max_value=enrichment_scores.shape[0] - MAX_NUM_PROTEINS_HEATMAP,
+                    key=f"{self._session_key}_start",
+                )
             min_max_normalize = st.sidebar.checkbox(
                 "Use Min-Max Normalization",
                 key=f"{self._session_key}_min_max_norm",
                 value=True,
             )
 
-            enrichment_scores = algo_utils.subcellular_enrichment_scores(
-                proteins_with_locations=self._data,
-                expected_fractions_of_locations=self._expected_fractions_of_locations,
+            self._figure = self.get_figure(
+                df=normalize(
+                    df=enrichment_scores, how="minmax" if min_max_normalize else None
+                ),
+                start_index=start_index,
             )
 
-            normalize_func = lambda x: x
-            if min_max_normalize:
-                normalize_func = df_utils.normalize(how="minmax")
-
-            self._figure = thread_first(
-                self.get_figure,
-                curry(normalize_func),
-                df_utils.copy,
-            )(df=enrichment_scores, start_index=start_index)
-
             st.write(self._figure)
             st.markdown(
                 get_svg_download_link(
-                    fig=self._figure, downloads_path=self._downloads_path
+                    fig=self._figure,
+                    downloads_path=self._downloads_path,
+                    key=self._session_key,
                 ),
                 unsafe_allow_html=True,
             )
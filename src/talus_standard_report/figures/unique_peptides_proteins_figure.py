@@ -1,9 +1,12 @@
 """src/talus_standard_report/figures/unique_peptides_proteins_figure.py module."""
+from typing import Optional
+
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
 from talus_standard_report.constants import PRIMARY_COLOR, SECONDARY_COLOR
+from talus_standard_report.engines.detection_counts import get_unique_peptides_proteins
 from talus_standard_report.utils import get_svg_download_link, get_table_download_link
 
 from .report_figure_abstract_class import ReportFigureAbstractClass
@@ -15,12 +18,16 @@ class UniquePeptidesProteinsFigure(ReportFigureAbstractClass):
     def __init__(
         self,
         *args,
+        quant_peptides: Optional[pd.DataFrame] = None,
+        quant_proteins: Optional[pd.DataFrame] = None,
         **kwargs,
     ):
         super().__init__(
             *args,
             **kwargs,
         )
+        self._quant_peptides = quant_peptides
+        self._quant_proteins = quant_proteins
 
     def preprocess_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """Preprocess the data for the figure.
@@ -95,6 +102,19 @@ class UniquePeptidesProteinsFigure(ReportFigureAbstractClass):
                 st.subheader(self._subheader)
             st.sidebar.header(self._short_title)
 
+            if self._quant_peptides is not None and self._quant_proteins is not None:
+                count_by = st.sidebar.radio(
+                    "Count per",
+                    ["Sample", "Condition"],
+                    key=f"{self._session_key}_count_by",
+                )
+                self._data = get_unique_peptides_proteins(
+                    dataset_name=self._dataset_name,
+                    quant_peptides=self._quant_peptides,
+                    quant_proteins=self._quant_proteins,
+                    by=count_by,
+                )
+
             self._figure = self.get_figure(
                 df=self._data,
                 color_proteins=PRIMARY_COLOR,
@@ -104,7 +124,9 @@ class UniquePeptidesProteinsFigure(ReportFigureAbstractClass):
             st.write(self._figure)
             st.markdown(
                 get_svg_download_link(
-                    fig=self._figure, downloads_path=self._downloads_path
+                    fig=self._figure,
+                    downloads_path=self._downloads_path,
+                    key=self._session_key,
                 ),
                 unsafe_allow_html=True,
             )
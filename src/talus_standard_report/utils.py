@@ -1,27 +1,88 @@
 """src/talus_standard_report/utils.py module."""
-import base64
+import hashlib
 import os
-import uuid
+import threading
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from shutil import rmtree
-from typing import Dict, Optional, Tuple
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Optional, Sequence, Tuple
 
-import dataframe_image as df_image
 import inflection
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
 from fpdf import FPDF
+from streamlit.report_thread import add_report_ctx, get_report_ctx
 
+from talus_standard_report.constants import MAX_PDF_RENDER_WORKERS
+from talus_standard_report.engines.data_bundle import (
+    data_bundle_hash,
+    write_data_bundle,
+)
+from talus_standard_report.engines.download_store import (
+    dataframe_content_hash,
+    get_download_store,
+)
+from talus_standard_report.engines.html_report import build_html_report
+from talus_standard_report.engines.image_export import (
+    figure_content_hash,
+    get_cached_image,
+    get_kaleido_pool,
+    render_image,
+)
 from talus_standard_report.figures.report_figure_abstract_class import (
     ReportFigureAbstractClass,
 )
 
 
+# The number of characters of the PDF that are encoded at once
+PDF_CHUNK_SIZE = 1024 * 1024
+PDF_TABLE_FONT_SIZE = 8
+PDF_TABLE_ROW_HEIGHT = 5
+MAX_CACHED_PDF_IMAGES = 64
+_PDF_IMAGE_CACHE_LOCK = threading.Lock()
+
+
+@st.cache(allow_output_mutation=True)
+def get_pdf_image_cache() -> "OrderedDict[str, Dict]":
+    """Get the process-wide cache of the PDF images, least recently used first.
+    It is the only cache of the PDF images, their png files aren't kept.
+
+    Returns
+    -------
+    OrderedDict[str, Dict]
+        The image parsed by FPDF of every page asset hash, see page_asset_hash.
+    """
+    return OrderedDict()
+
+
+def page_asset_hash(fig: go.Figure, description: Optional[str]) -> str:
+    """Get the hash of a PDF page asset, which changes with the figure or description.
+
+    Parameters
+    ----------
+    fig : go.Figure
+        The plot of the page.
+    description : Optional[str]
+        The description of the plot.
+
+    Returns
+    -------
+    str
+        The SHA-256 hex digest of the figure content hash and the description.
+    """
+    asset_hash = hashlib.sha256(figure_content_hash(fig=fig).encode("utf-8"))
+    asset_hash.update(str(description).encode("utf-8"))
+    return asset_hash.hexdigest()
+
+
 def streamlit_static_downloads_folder() -> Path:
     """Create a downloads directory within the streamlit static asset directory.
+    It is kept across reruns and sessions, see get_download_store.
     HACK: This only works when we've installed streamlit with pipenv,
     so the permissions during install are the same as the running process.
 
@@ -32,14 +93,13 @@ def streamlit_static_downloads_folder() -> Path:
     """
     streamlit_static_path = Path(st.__path__[0]).joinpath("static")
     downloads_path = streamlit_static_path.joinpath("downloads")
-    if downloads_path.exists():
-        rmtree(downloads_path)
-    downloads_path.mkdir()
+    downloads_path.mkdir(exist_ok=True)
     return downloads_path
 
 
 def get_table_download_link(df: pd.DataFrame, downloads_path: Path) -> str:
     """Create a table download link for a dataframe.
+    The table is written once per content and shared by all sessions.
 
     Parameters
     ----------
@@ -53,13 +113,18 @@ def get_table_download_link(df: pd.DataFrame, downloads_path: Path) -> str:
     str
         The download link for the data.
     """
-    temp_file_path = downloads_path.joinpath(f"{str(uuid.uuid4())}.csv")
-    df.to_csv(temp_file_path)
-    return f"[Download as .csv file](downloads/{os.path.basename(temp_file_path)})"
+    file_path = get_download_store(path=str(downloads_path)).put(
+        name=f"{dataframe_content_hash(df=df)}.csv", write=df.to_csv
+    )
+    return f"[Download as .csv file](downloads/{os.path.basename(file_path)})"
 
 
-def get_svg_download_link(fig: go.Figure, downloads_path: Path) -> str:
-    """Create a svg download link for a plotly figure.
+def get_image_download_link(
+    fig: go.Figure, downloads_path: Path, key: str, image_format: str = "svg"
+) -> str:
+    """Create an image download link for a plotly figure.
+    The image is only rendered once the export button is clicked, and only once
+    per figure content. Until then, the button is shown instead of the link.
 
     Parameters
     ----------
@@ -67,15 +132,177 @@ def get_svg_download_link(fig: go.Figure, downloads_path: Path) -> str:
         The input figure to download.
     downloads_path : Path
         The path to the downloads directory.
+    key : str
+        The session key of the plot, which identifies its export button.
+    image_format : str, optional
+        The image format, by default 'svg'.
 
     Returns
     -------
     str
-        The download link for the data.
+        The download link for the data, or an empty string if it wasn't exported yet.
+    """
+    download_store = get_download_store(path=str(downloads_path))
+    figure_hash = figure_content_hash(fig=fig)
+    name = f"{figure_hash}.{image_format}"
+    if name not in download_store:
+        image = get_cached_image(figure_hash=figure_hash, image_format=image_format)
+        if image is None:
+            if not st.button(
+                f"Export as .{image_format} file",
+                key=f"{key}_export_{image_format}",
+            ):
+                return ""
+            image = render_image(fig=fig, image_format=image_format)
+        download_store.put(name=name, write=lambda path: path.write_bytes(image))
+    download_store.get(name=name)
+    return f"[Download as .{image_format} file](downloads/{name})"
+
+
+def get_svg_download_link(fig: go.Figure, downloads_path: Path, key: str) -> str:
+    """Create a svg download link for a plotly figure, rendered on demand.
+
+    Parameters
+    ----------
+    fig : go.Figure
+        The input figure to download.
+    downloads_path : Path
+        The path to the downloads directory.
+    key : str
+        The session key of the plot, which identifies its export button.
+
+    Returns
+    -------
+    str
+        The download link for the data, or an empty string if it wasn't exported yet.
+    """
+    return get_image_download_link(
+        fig=fig, downloads_path=downloads_path, key=key, image_format="svg"
+    )
+
+
+def get_plots_data(figure: ReportFigureAbstractClass) -> List[Dict]:
+    """Get the figure, data and description of every plot of a figure.
+
+    Parameters
+    ----------
+    figure : ReportFigureAbstractClass
+        The figure, or a tuple of figures that share a chapter.
+
+    Returns
+    -------
+    List[Dict]
+        The 'figure', 'data' and 'description' of every plot.
+    """
+    if isinstance(figure, Tuple):
+        return [
+            {
+                "figure": figure[i].figure,
+                "data": figure[i].data,
+                "description": figure[i].description,
+            }
+            for i in range(len(figure))
+        ]
+    return [
+        {
+            "figure": figure.figure,
+            "data": figure.data,
+            "description": figure.description,
+        }
+    ]
+
+
+def get_html_report_download_link(
+    title: str, figures: Sequence[ReportFigureAbstractClass], downloads_path: Path
+) -> str:
+    """Create a download link for a single file interactive HTML report.
+    The report is written to the download store once per content.
+
+    Parameters
+    ----------
+    title : str
+        The report title.
+    figures : Sequence[ReportFigureAbstractClass]
+        The figures to include, one chapter per figure.
+    downloads_path : Path
+        The path to the downloads directory.
+
+    Returns
+    -------
+    str
+        The download link for the report.
     """
-    temp_file_path = downloads_path.joinpath(f"{str(uuid.uuid4())}.svg")
-    fig.write_image(temp_file_path)
-    return f"[Download as .svg file](downloads/{os.path.basename(temp_file_path)})"
+    report = build_html_report(
+        title=title,
+        chapters=[(figure.title, get_plots_data(figure=figure)) for figure in figures],
+    ).encode("utf-8")
+    file_path = get_download_store(path=str(downloads_path)).put(
+        name=f"{hashlib.sha256(report).hexdigest()}.html",
+        write=lambda path: path.write_bytes(report),
+    )
+    out_filename = f"{inflection.parameterize(title, separator='_')}_report.html"
+    return f'<a href="downloads/{file_path.name}" download="{out_filename}">Download file</a>'
+
+
+def get_data_bundle_download_link(
+    dataset_name: str,
+    parameters: Dict,
+    figures: Sequence[ReportFigureAbstractClass],
+    downloads_path: Path,
+    include_csv: bool = False,
+) -> str:
+    """Create a download link for a zip archive with the data of every figure.
+    The archive is written to the download store once per dataset, parameters
+    and figure data.
+
+    Parameters
+    ----------
+    dataset_name : str
+        The name of the dataset. E.g. '210308_MLLtx'.
+    parameters : Dict
+        The report parameters, written to the archive manifest.
+    figures : Sequence[ReportFigureAbstractClass]
+        The figures whose data to include.
+    downloads_path : Path
+        The path to the downloads directory.
+    include_csv : bool, optional
+        Whether to add a CSV file per table as well, by default False.
+
+    Returns
+    -------
+    str
+        The download link for the archive.
+    """
+    tables = []
+    for figure in figures:
+        plots_data = [
+            plot_data
+            for plot_data in get_plots_data(figure=figure)
+            if isinstance(plot_data["data"], (pd.DataFrame, pd.Series))
+        ]
+        name = inflection.parameterize(str(figure.title), separator="_")
+        for j, plot_data in enumerate(plots_data, start=1):
+            table_name = f"{name}_{j}" if len(plots_data) > 1 else name
+            tables.append((table_name, pd.DataFrame(plot_data["data"])))
+
+    bundle_hash = data_bundle_hash(
+        dataset_name=dataset_name,
+        parameters=parameters,
+        tables=tables,
+        include_csv=include_csv,
+    )
+    file_path = get_download_store(path=str(downloads_path)).put(
+        name=f"{bundle_hash}.zip",
+        write=lambda path: write_data_bundle(
+            path=path,
+            dataset_name=dataset_name,
+            parameters=parameters,
+            tables=tables,
+            include_csv=include_csv,
+        ),
+    )
+    out_filename = f"{dataset_name}_data_bundle.zip"
+    return f'<a href="downloads/{file_path.name}" download="{out_filename}">Download file</a>'
 
 
 class PDF(FPDF):
@@ -119,7 +346,13 @@ class PDF(FPDF):
         self.multi_cell(w=0, h=6, txt="%d: %s" % (num, label), border=0, align="L")
         self.ln(h=4)
 
-    def chapter_body(self, name: str, description: str, width: Optional[int] = 210):
+    def chapter_body(
+        self,
+        name: str,
+        description: str,
+        width: Optional[int] = 210,
+        image_info: Optional[Dict] = None,
+    ):
         """Create the body of a chapter.
 
         Parameters
@@ -130,17 +363,208 @@ class PDF(FPDF):
             The description of the object.
         width : int
             The width of the object.
+        image_info : Optional[Dict], optional
+            The already parsed image, by default the image file is parsed.
         """
         self.set_font(family="Helvetica", style="", size=12)
         self.multi_cell(w=0, h=5, txt=description)
+        if image_info is not None and name not in self.images:
+            # FPDF deletes the image data once it is written, so it gets a copy
+            self.images[name] = dict(image_info, i=len(self.images) + 1)
         self.image(name=name, w=width)
         self.ln()
 
+    def _fit_text(self, text: str, width: float) -> str:
+        """Shorten a text with '...' until it fits the width in the current font."""
+        text = text.encode("latin-1", errors="replace").decode("latin-1")
+        if self.get_string_width(s=text) <= width:
+            return text
+        while text and self.get_string_width(s=f"{text}...") > width:
+            text = text[:-1]
+        return f"{text}..."
+
+    def table(
+        self,
+        df: pd.DataFrame,
+        font_size: int = PDF_TABLE_FONT_SIZE,
+        row_height: float = PDF_TABLE_ROW_HEIGHT,
+    ):
+        """Draw a dataframe as a table, repeating its header on every page it spans.
+        Columns get a share of the page width by the length of their longest value,
+        and values that don't fit are shortened.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            The dataframe. Its index is drawn too unless it is a default range index.
+        font_size : int, optional
+            The font size, by default PDF_TABLE_FONT_SIZE.
+        row_height : float, optional
+            The height of every row, by default PDF_TABLE_ROW_HEIGHT.
+        """
+        if not isinstance(df.index, pd.RangeIndex):
+            df = df.reset_index()
+        header = [str(column) for column in df.columns]
+        rows = df.astype(str).to_numpy()
+
+        lengths = np.array([len(column) for column in header], dtype=float)
+        if rows.shape[0] > 0:
+            lengths = np.maximum(lengths, np.vectorize(len)(rows).max(axis=0))
+        lengths = np.clip(lengths, 4, 40)
+        page_width = self.w - self.l_margin - self.r_margin
+        widths = page_width * lengths / lengths.sum()
+
+        def draw_header():
+            self.set_font(family="Helvetica", style="B", size=font_size)
+            self.set_fill_color(r=200, g=220, b=255)
+            for text, width in zip(header, widths):
+                self.cell(
+                    w=width,
+                    h=row_height,
+                    txt=self._fit_text(text=text, width=width - 2),
+                    border=1,
+                    fill=1,
+                )
+            self.ln(h=row_height)
+            self.set_font(family="Helvetica", style="", size=font_size)
+
+        draw_header()
+        for row in rows:
+            if self.get_y() + row_height > self.page_break_trigger:
+                self.add_page()
+                draw_header()
+            for text, width in zip(row, widths):
+                self.cell(
+                    w=width,
+                    h=row_height,
+                    txt=self._fit_text(text=text, width=width - 2),
+                    border=1,
+                )
+            self.ln(h=row_height)
+        self.ln()
+
+    def chapter_table(self, df: pd.DataFrame, description: str):
+        """Create the body of a chapter that shows a table.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            The table.
+        description : str
+            The description of the table.
+        """
+        self.set_font(family="Helvetica", style="", size=12)
+        self.multi_cell(w=0, h=5, txt=description)
+        self.ln(h=2)
+        self.table(df=df)
+
+    def _image_asset(self, fig: go.Figure, asset_hash: str, figure_path: str) -> Dict:
+        """Get the parsed png image of a plot.
+        It is only rendered and parsed again if the figure content or description
+        changed since it was last exported.
+
+        Parameters
+        ----------
+        fig : go.Figure
+            The plot.
+        asset_hash : str
+            The page asset hash of the plot, see page_asset_hash.
+        figure_path : str
+            The path to write the image to if it has to be rendered.
+
+        Returns
+        -------
+        Dict
+            The image as parsed by FPDF. It is shared between exports and must not
+            be mutated.
+        """
+        asset_cache = get_pdf_image_cache()
+        with _PDF_IMAGE_CACHE_LOCK:
+            image_info = asset_cache.get(asset_hash)
+            if image_info is not None:
+                asset_cache.move_to_end(asset_hash)
+                return image_info
+
+        with open(figure_path, "wb") as figure_file:
+            figure_file.write(get_kaleido_pool().render(fig=fig, image_format="png"))
+        image_info = self._parsepng(figure_path)
+        with _PDF_IMAGE_CACHE_LOCK:
+            asset_cache[asset_hash] = image_info
+            while len(asset_cache) > MAX_CACHED_PDF_IMAGES:
+                asset_cache.popitem(last=False)
+        return image_info
+
+    def print_figures(
+        self,
+        figures: Sequence[ReportFigureAbstractClass],
+        width: Optional[int] = 210,
+        max_workers: int = MAX_PDF_RENDER_WORKERS,
+    ):
+        """Print figures to the PDF, one chapter per figure.
+        The images of all figures are rendered concurrently into a temporary
+        directory of this export, then the pages are added in order.
+        Images are kept by figure content and description, so a re-export only
+        renders the figures that changed. Figures without a plot are drawn as tables.
+
+        Parameters
+        ----------
+        figures : Sequence[ReportFigureAbstractClass]
+            The figures to print.
+        width : int
+            The width of the figures.
+        max_workers : int
+            The maximum number of images rendered at once.
+        """
+        plots_data = [get_plots_data(figure=figure) for figure in figures]
+        # The workers share the session's report context so they can use st.cache
+        with TemporaryDirectory() as job_directory_path, ThreadPoolExecutor(
+            max_workers=max_workers,
+            initializer=add_report_ctx,
+            initargs=(None, get_report_ctx()),
+        ) as executor:
+            assets = []
+            for i, figure_plots_data in enumerate(plots_data):
+                figure_assets = []
+                for j, plot_data in enumerate(figure_plots_data):
+                    if not plot_data["figure"]:
+                        figure_assets.append(None)
+                        continue
+                    asset_hash = page_asset_hash(
+                        fig=plot_data["figure"], description=plot_data["description"]
+                    )
+                    future = executor.submit(
+                        self._image_asset,
+                        plot_data["figure"],
+                        asset_hash,
+                        os.path.join(job_directory_path, f"fig{i}_{j}.png"),
+                    )
+                    figure_assets.append((asset_hash, future))
+                assets.append(figure_assets)
+
+            for figure, figure_plots_data, figure_assets in zip(
+                figures, plots_data, assets
+            ):
+                self.add_page()
+                self.chapter_title(num=self._current_page, label=figure.title)
+                for plot_data, asset in zip(figure_plots_data, figure_assets):
+                    if asset is None:
+                        self.chapter_table(
+                            df=plot_data["data"], description=plot_data["description"]
+                        )
+                    else:
+                        asset_hash, future = asset
+                        self.chapter_body(
+                            name=f"{asset_hash}.png",
+                            description=plot_data["description"],
+                            width=int(width * 0.8),
+                            image_info=future.result(),
+                        )
+                    self._current_page += 1
+
     def print_figure(
         self,
         figure: ReportFigureAbstractClass,
         width: Optional[int] = 210,
-        write_directory_path: Optional[str] = "/tmp",
     ):
         """Print a figure to the PDF.
 
@@ -150,47 +574,63 @@ class PDF(FPDF):
             The figure to print.
         width : int
             The width of the figure.
-        height : int
-            The height of the figure.
         """
-        self.add_page()
-        self.chapter_title(num=self._current_page, label=figure.title)
-        # Create temporary directory to write the figure and add it to the PDF
-        if isinstance(figure, Tuple):
-            figures_data = []
-            for i in range(len(figure)):
-                figures_data.append(
-                    {
-                        "figure": figure[i].figure,
-                        "data": figure[i].data,
-                        "description": figure[i].description,
-                    }
+        self.print_figures(figures=[figure], width=width)
+
+    def write_pdf(self, path: Path, chunk_size: int = PDF_CHUNK_SIZE) -> None:
+        """Write the PDF to a file in chunks, without encoding the whole document at once.
+
+        Parameters
+        ----------
+        path : Path
+            The path to write the PDF to.
+        chunk_size : int, optional
+            The number of characters encoded and written at once,
+            by default PDF_CHUNK_SIZE.
+        """
+        if self.state < 3:
+            self.close()
+        with open(path, "wb") as pdf_file:
+            for start in range(0, len(self.buffer), chunk_size):
+                pdf_file.write(
+                    self.buffer[start : start + chunk_size].encode("latin-1")
                 )
-        else:
-            figures_data = [
-                {
-                    "figure": figure.figure,
-                    "data": figure.data,
-                    "description": figure.description,
-                }
-            ]
-        for plot_data in figures_data:
-            figure_path = os.path.join(
-                write_directory_path, f"fig{self._current_page}.png"
-            )
-            if plot_data["figure"]:
-                plot_data["figure"].write_image(figure_path)
-            else:
-                df_image.export(obj=plot_data["data"], filename=figure_path)
-            self.chapter_body(
-                name=figure_path,
-                description=plot_data["description"],
-                width=int(width * 0.8),
-            )
-            self._current_page += 1
-
-    def get_html_download_link(self) -> str:
-        """Create a html download link for an object (which will be base64 encoded).
+
+    def content_hash(self, chunk_size: int = PDF_CHUNK_SIZE) -> str:
+        """Get the hash of the PDF's content.
+        The creation date is left out, so equal reports have equal hashes.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            The number of characters encoded and hashed at once,
+            by default PDF_CHUNK_SIZE.
+
+        Returns
+        -------
+        str
+            The SHA-256 hex digest of the PDF without its creation date.
+        """
+        if self.state < 3:
+            self.close()
+        # The document information is written after all pages
+        date_start = self.buffer.rfind("/CreationDate ")
+        date_stop = self.buffer.index("\n", date_start)
+        pdf_hash = hashlib.sha256()
+        for start, stop in ((0, date_start), (date_stop, len(self.buffer))):
+            for chunk_start in range(start, stop, chunk_size):
+                chunk_stop = min(chunk_start + chunk_size, stop)
+                pdf_hash.update(self.buffer[chunk_start:chunk_stop].encode("latin-1"))
+        return pdf_hash.hexdigest()
+
+    def get_html_download_link(self, downloads_path: Path) -> str:
+        """Create a html download link for the PDF.
+        The PDF is written to the download store and served as a file.
+
+        Parameters
+        ----------
+        downloads_path : Path
+            The path to the downloads directory.
 
         Returns
         -------
@@ -200,10 +640,10 @@ class PDF(FPDF):
         out_filename = (
             f"{inflection.parameterize(self.title, separator='_')}_report.pdf"
         )
-        b64_encoded = base64.b64encode(
-            self.output(out_filename, dest="S").encode("latin-1")
+        file_path = get_download_store(path=str(downloads_path)).put(
+            name=f"{self.content_hash()}.pdf", write=self.write_pdf
         )
-        return f'<a href="data:application/octet-stream;base64,{b64_encoded.decode()}" download="{out_filename}">Download file</a>'
+        return f'<a href="downloads/{file_path.name}" download="{out_filename}">Download file</a>'
 
 
 def get_file_to_condition_map(
@@ -0,0 +1,66 @@
+"""tests/test_clustering module."""
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from talus_standard_report.engines import clustering
+
+
+def test_get_clustergram_traces_cached(monkeypatch) -> None:
+    """Test get_clustergram_traces() clusters once per dataset and selection."""
+    calls = []
+
+    def fake_clustergram(data, return_computed_traces, **kwargs):
+        calls.append(data.shape)
+        return None, {"heatmap": data.to_numpy()}
+
+    monkeypatch.setattr(
+        clustering, "dashbio", SimpleNamespace(Clustergram=fake_clustergram)
+    )
+    data = pd.DataFrame(np.arange(12.0).reshape(4, 3))
+
+    traces = clustering.get_clustergram_traces(
+        dataset_name="test_get_clustergram_traces", selection=("pca", 1), data=data
+    )
+    cached = clustering.get_clustergram_traces(
+        dataset_name="test_get_clustergram_traces",
+        selection=("pca", 1),
+        data=data.iloc[:2],
+    )
+    other = clustering.get_clustergram_traces(
+        dataset_name="test_get_clustergram_traces",
+        selection=("chronological", 0),
+        data=data.iloc[:2],
+    )
+
+    assert cached is traces
+    assert other["heatmap"].shape == (2, 3)
+    assert calls == [(4, 3), (2, 3)]
+
+
+def test_fit_peptide_clusters() -> None:
+    """Test the centroids are geometric means and members() returns the closest rows."""
+    rng = np.random.default_rng(0)
+    centers = rng.uniform(1e3, 1e6, size=(3, 8))
+    data = pd.DataFrame(
+        np.repeat(centers, 40, axis=0) * rng.lognormal(sigma=0.1, size=(120, 8))
+    )
+    data.iloc[0, 0] = np.nan
+    values = np.log10(np.fmax(data.fillna(1).to_numpy(dtype=np.float32), 1))
+
+    clusters = clustering.fit_peptide_clusters(data=data, n_clusters=3)
+
+    assert clusters.centroids.shape == (3, 8)
+    for cluster, (name, centroid) in enumerate(clusters.centroids.iterrows()):
+        positions = np.flatnonzero(clusters.labels == cluster)
+        assert name == f"Cluster {cluster + 1} ({positions.shape[0]} rows)"
+        np.testing.assert_allclose(
+            centroid, 10 ** values[positions].mean(axis=0), rtol=1e-4
+        )
+
+        nearest = positions[np.argsort(clusters.distances[positions], kind="stable")]
+        np.testing.assert_array_equal(
+            clusters.members(cluster=cluster, k=5), nearest[:5]
+        )
+        np.testing.assert_array_equal(clusters.members(cluster=cluster), nearest)
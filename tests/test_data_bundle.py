@@ -0,0 +1,66 @@
+"""tests/test_data_bundle module."""
+import json
+import zipfile
+
+import pandas as pd
+
+from talus_standard_report.engines.data_bundle import (
+    data_bundle_hash,
+    write_data_bundle,
+)
+
+
+def test_write_data_bundle(tmp_path) -> None:
+    """Test write_data_bundle() writes every table and a manifest."""
+    tables = [
+        ("counts", pd.DataFrame({"Run": ["a", "b"], "Proteins": [10, 12]})),
+        ("mixed", pd.DataFrame({"Value": [1, "x"]})),
+    ]
+    path = tmp_path / "bundle.zip"
+
+    write_data_bundle(
+        path=path,
+        dataset_name="210308_MLLtx",
+        parameters={"tool": "Encyclopedia"},
+        tables=tables,
+        include_csv=True,
+    )
+
+    with zipfile.ZipFile(path) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        assert sorted(archive.namelist()) == [
+            "counts.parquet",
+            "csv/counts.csv",
+            "csv/mixed.csv",
+            "manifest.json",
+            "mixed.parquet",
+        ]
+        counts = pd.read_parquet(archive.open("counts.parquet"))
+
+    assert manifest["dataset"] == "210308_MLLtx"
+    assert manifest["parameters"] == {"tool": "Encyclopedia"}
+    assert [table["rows"] for table in manifest["tables"]] == [2, 2]
+    pd.testing.assert_frame_equal(counts, tables[0][1])
+
+
+def test_data_bundle_hash() -> None:
+    """Test data_bundle_hash() changes with the parameters and the data."""
+    tables = [("counts", pd.DataFrame({"Proteins": [10, 12]}))]
+    bundle_hash = data_bundle_hash(
+        dataset_name="a", parameters={"tool": "Encyclopedia"}, tables=tables
+    )
+
+    assert bundle_hash == data_bundle_hash(
+        dataset_name="a", parameters={"tool": "Encyclopedia"}, tables=tables
+    )
+    assert bundle_hash != data_bundle_hash(
+        dataset_name="a",
+        parameters={"tool": "Encyclopedia"},
+        tables=tables,
+        include_csv=True,
+    )
+    assert bundle_hash != data_bundle_hash(
+        dataset_name="a",
+        parameters={"tool": "Encyclopedia"},
+        tables=[("counts", pd.DataFrame({"Proteins": [10, 13]}))],
+    )
@@ -0,0 +1,96 @@
+"""tests/test_detection_counts module."""
+import numpy as np
+import pandas as pd
+
+from talus_standard_report.engines.detection_counts import (
+    count_unique_by_group,
+    describe_histogram,
+    detection_matrix,
+    peptides_per_protein_histogram,
+    unique_peptides_proteins,
+)
+
+
+QUANT_PEPTIDES = pd.DataFrame(
+    {
+        "Peptide": ["AAK", "CCK", "CCK", "DDK"],
+        "Protein": ["P1", "P1", "P2", "P2"],
+        "numFragments": [5, 5, 5, 5],
+        "A:B:1": [1.0, 0.0, 2.0, np.nan],
+        "A:B:2": [0.0, 1.0, np.nan, np.nan],
+        "C:B:1": [np.nan, np.nan, np.nan, 5.0],
+    }
+)
+QUANT_PROTEINS = pd.DataFrame(
+    {
+        "Protein": ["P1", "P2"],
+        "NumPeptides": [2, 2],
+        "PeptideSequences": ["AAK;CCK", "CCK;DDK"],
+        "A:B:1": [1.0, 2.0],
+        "A:B:2": [1.0, 0.0],
+        "C:B:1": [np.nan, 5.0],
+    }
+)
+
+
+def test_unique_peptides_proteins() -> None:
+    """Test unique_peptides_proteins() by sample and by condition."""
+    by_sample = unique_peptides_proteins(
+        quant_peptides=QUANT_PEPTIDES, quant_proteins=QUANT_PROTEINS
+    )
+    by_condition = unique_peptides_proteins(
+        quant_peptides=QUANT_PEPTIDES, quant_proteins=QUANT_PROTEINS, by="Condition"
+    )
+
+    assert by_sample.to_dict(orient="list") == {
+        "Sample Name": ["A:B:1", "A:B:2", "C:B:1"],
+        "Unique Proteins": [2, 1, 1],
+        "Unique Peptides": [2, 1, 1],
+    }
+    assert by_condition.to_dict(orient="list") == {
+        "Sample Name": ["A:B", "C:B"],
+        "Unique Proteins": [2, 1],
+        "Unique Peptides": [2, 1],
+    }
+
+
+def test_count_unique_by_group() -> None:
+    """Test count_unique_by_group() counts the peptides of every protein."""
+    detected = detection_matrix(
+        data=QUANT_PEPTIDES, id_columns=["Peptide", "Protein", "numFragments"]
+    )
+
+    actual = count_unique_by_group(
+        detected=detected,
+        ids=QUANT_PEPTIDES["Peptide"],
+        row_groups=QUANT_PEPTIDES["Protein"],
+    )
+
+    np.testing.assert_array_equal(actual.values, [[1, 1, 0], [1, 0, 1]])
+    assert list(actual.index) == ["P1", "P2"]
+
+
+def test_peptides_per_protein_histogram() -> None:
+    """Test peptides_per_protein_histogram() bins the peptides of every protein."""
+    by_sample = peptides_per_protein_histogram(
+        quant_peptides=QUANT_PEPTIDES, max_num_peptides=2
+    )
+    by_condition = peptides_per_protein_histogram(
+        quant_peptides=QUANT_PEPTIDES, max_num_peptides=1, by="Condition"
+    )
+
+    assert list(by_sample.index) == [1, 2]
+    np.testing.assert_array_equal(by_sample.values, [[2, 1, 1], [0, 0, 0]])
+    # P1 has two peptides in A:B but the last bin includes everything above 1
+    np.testing.assert_array_equal(by_condition.values, [[2, 1]])
+    assert list(by_condition.columns) == ["A:B", "C:B"]
+
+
+def test_describe_histogram() -> None:
+    """Test describe_histogram() matches describe() of the unbinned values."""
+    values = pd.Series([1, 1, 2, 3, 3, 3, 5])
+    histogram = values.value_counts().reindex(range(1, 6), fill_value=0).to_frame("A")
+
+    actual = describe_histogram(histogram=histogram)
+
+    np.testing.assert_allclose(actual["A"].values, values.describe().values)
@@ -0,0 +1,44 @@
+"""tests/test_download_store module."""
+import pandas as pd
+
+from talus_standard_report.engines.download_store import (
+    DownloadStore,
+    dataframe_content_hash,
+)
+
+
+def test_download_store_writes_once(tmp_path) -> None:
+    """Test DownloadStore.put() only writes an artifact the first time."""
+    store = DownloadStore(path=tmp_path)
+    writes = []
+
+    def write(path):
+        writes.append(path)
+        path.write_text("a,b")
+
+    first = store.put(name="abc.csv", write=write)
+    second = store.put(name="abc.csv", write=write)
+
+    assert first == second == tmp_path / "abc.csv"
+    assert len(writes) == 1
+    assert "abc.csv" in DownloadStore(path=tmp_path)
+
+
+def test_download_store_evicts_by_size(tmp_path) -> None:
+    """Test DownloadStore.evict() removes the least recently requested artifacts."""
+    store = DownloadStore(path=tmp_path, max_bytes=4)
+    store.put(name="old.csv", write=lambda path: path.write_text("abc"))
+    store.put(name="new.csv", write=lambda path: path.write_text("abc"))
+
+    store.evict(force=True)
+
+    assert "old.csv" not in store and not (tmp_path / "old.csv").exists()
+    assert "new.csv" in store
+
+
+def test_dataframe_content_hash() -> None:
+    """Test dataframe_content_hash() depends on the content only."""
+    df = pd.DataFrame({"a": [1, 2]})
+
+    assert dataframe_content_hash(df) == dataframe_content_hash(df.copy())
+    assert dataframe_content_hash(df) != dataframe_content_hash(df.rename(columns={"a": "b"}))
@@ -0,0 +1,11 @@
+"""tests/test_file_sizes module."""
+from talus_standard_report.engines.file_sizes import format_size
+
+
+def test_format_size() -> None:
+    """Test format_size() rounds down to the largest binary unit."""
+    assert format_size(0) == "0B"
+    assert format_size(1023) == "1023B"
+    assert format_size(1024) == "1K"
+    assert format_size(int(3.5 * 1024 ** 2)) == "3M"
+    assert format_size(5 * 1024 ** 5) == "5P"
@@ -0,0 +1,152 @@
+"""tests/test_go_annotations module."""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scipy.stats import mannwhitneyu
+
+from talus_standard_report.engines.go_annotations import (
+    GOAnnotationSnapshot,
+    build_go_snapshot,
+    main,
+    run_snapshot_enrichment,
+)
+
+
+OBO = """format-version: 1.2
+
+[Term]
+id: GO:0000001
+name: cellular_component
+namespace: cellular_component
+
+[Term]
+id: GO:0000002
+name: nucleus
+namespace: cellular_component
+is_a: GO:0000001 ! cellular_component
+
+[Term]
+id: GO:0000003
+name: nucleoplasm
+namespace: cellular_component
+relationship: part_of GO:0000002 ! nucleus
+"""
+
+CYTOPLASM_OBO = """
+[Term]
+id: GO:0000004
+name: cytoplasm
+namespace: cellular_component
+is_a: GO:0000001 ! cellular_component
+"""
+
+
+def build_snapshot(path: Path, n_cytoplasm: int = 0) -> GOAnnotationSnapshot:
+    """Build a snapshot of 100 proteins with 20 nucleoplasm proteins first.
+    The next n_cytoplasm proteins are in the cytoplasm.
+    """
+    gaf_lines = ["!gaf-version: 2.2"]
+    for i in range(100):
+        if i < 20:
+            term = "GO:0000003"
+        elif i < 20 + n_cytoplasm:
+            term = "GO:0000004"
+        else:
+            term = "GO:0000001"
+        gaf_lines.append("\t".join(["UniProtKB", f"P{i:05d}", "", "", term, "C"]))
+    (path / "annotations.gaf").write_text("\n".join(gaf_lines))
+    (path / "go.obo").write_text(OBO + CYTOPLASM_OBO if n_cytoplasm else OBO)
+    return build_go_snapshot(
+        gaf_path=path / "annotations.gaf",
+        obo_path=path / "go.obo",
+        output_path=path / "snapshot",
+        version="test",
+        # The test accessions overlap the shipped contaminants
+        contaminants=[],
+    )
+
+
+def test_build_go_snapshot(tmp_path: Path) -> None:
+    """Test build_go_snapshot() propagates annotations to ancestor terms."""
+    build_snapshot(path=tmp_path)
+    snapshot = GOAnnotationSnapshot(path=tmp_path / "snapshot")
+
+    assert snapshot.version == "test"
+    np.testing.assert_array_equal(
+        snapshot.positions(accessions=["P00000", "P00099", "Q00000"]), [0, 99, -1]
+    )
+    incidence = snapshot.incidence(accessions=["P00000", "Q00000", "P00050"])
+    np.testing.assert_array_equal(
+        incidence.toarray(), [[True, True, True], [False] * 3, [True, False, False]]
+    )
+
+
+def test_main(tmp_path: Path) -> None:
+    """Test the command line builds a snapshot with the shipped contaminants."""
+    build_snapshot(path=tmp_path)
+
+    main(
+        [
+            str(tmp_path / "annotations.gaf"),
+            str(tmp_path / "go.obo"),
+            "--snapshot-version",
+            "2021-09-01",
+            "--output-path",
+            str(tmp_path / "cli_snapshot"),
+        ]
+    )
+
+    snapshot = GOAnnotationSnapshot(path=tmp_path / "cli_snapshot")
+    assert snapshot.version == "2021-09-01"
+    assert {"P04264", "P00761", "P02768"} <= snapshot.contaminants
+    assert not any(accession.startswith("#") for accession in snapshot.contaminants)
+
+
+def test_run_snapshot_enrichment(tmp_path: Path) -> None:
+    """Test run_snapshot_enrichment() matches gopher's adjusted p-values.
+    gopher ranks the proteins annotated with a tested term, tests every term with
+    a one-sided Mann-Whitney U test and adjusts the p-values of every sample
+    with statsmodels' fdrcorrection.
+    """
+    multitest = pytest.importorskip("statsmodels.stats.multitest")
+    snapshot = build_snapshot(path=tmp_path, n_cytoplasm=30)
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(
+        rng.random((110, 2)),
+        index=[f"P{i:05d}" for i in range(100)] + [f"Q{i:05d}" for i in range(10)],
+        columns=["A", "B"],
+    )
+    data.iloc[:20] += 0.2
+    go_filters = ["nucleus", "nucleoplasm", "cytoplasm"]
+
+    actual = run_snapshot_enrichment(
+        data=data, snapshot=snapshot, go_filters=go_filters
+    )
+
+    # Only the nuclear and cytoplasmic proteins are annotated with a tested term
+    background = data.iloc[:50]
+    members = {
+        "nucleus": background.index[:20],
+        "nucleoplasm": background.index[:20],
+        "cytoplasm": background.index[20:],
+    }
+    expected = pd.DataFrame(
+        [
+            [
+                mannwhitneyu(
+                    background.loc[members[name], column],
+                    background.loc[~background.index.isin(members[name]), column],
+                    alternative="greater",
+                    method="asymptotic",
+                ).pvalue
+                for column in data.columns
+            ]
+            for name in actual["GO Name"]
+        ],
+        columns=data.columns,
+    ).apply(lambda pvalues: multitest.fdrcorrection(pvalues)[1], raw=True)
+    assert sorted(actual["GO Name"]) == sorted(go_filters)
+    np.testing.assert_allclose(actual[["A", "B"]].values, expected.values, rtol=1e-10)
@@ -0,0 +1,123 @@
+"""tests/test_go_enrichment module."""
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from talus_standard_report.engines import go_enrichment
+
+
+ANNOTATIONS = pd.DataFrame(
+    {
+        "uniprot_accession": ["P1", "P2", "P3", "P1"],
+        "go_id": ["GO:1", "GO:1", "GO:2", "GO:3"],
+    }
+)
+
+
+@pytest.fixture
+def fake_gopher(monkeypatch) -> SimpleNamespace:
+    """Replace gopher with a fake that counts its calls.
+    Its terms come in a different order for every shard, like unordered results.
+    """
+    calls = SimpleNamespace(load_annotations=0, test_enrichment=0)
+
+    def load_annotations(species, aspect):
+        calls.load_annotations += 1
+        return ANNOTATIONS, {}
+
+    def test_enrichment(proteins, annotations, mapping, progress, **options):
+        calls.test_enrichment += 1
+        results = []
+        for go_id, members in annotations.groupby("go_id"):
+            in_term = proteins.index.isin(members["uniprot_accession"])
+            results.append(
+                [go_id, f"term {go_id}", "c"]
+                + list(1 / (1 + proteins[in_term].sum() - proteins[~in_term].sum()))
+            )
+        results = pd.DataFrame(
+            results, columns=list(go_enrichment.GO_ANNOTATION_COLUMNS) + list(proteins)
+        )
+        return results.sample(
+            frac=1, random_state=len(proteins.columns) + calls.test_enrichment
+        )
+
+    monkeypatch.setattr(
+        go_enrichment,
+        "gopher",
+        SimpleNamespace(
+            load_annotations=load_annotations, test_enrichment=test_enrichment
+        ),
+    )
+    # Threads share the fake, unlike worker processes
+    monkeypatch.setattr(go_enrichment, "ProcessPoolExecutor", ThreadPoolExecutor)
+    return calls
+
+
+@pytest.fixture
+def data() -> pd.DataFrame:
+    """Get the intensities of 4 proteins in 10 samples."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        rng.random((4, 10)),
+        index=["P1", "P2", "P3", "P4"],
+        columns=[f"S{i}" for i in range(10)],
+    )
+
+
+def sort_terms(enrichment: pd.DataFrame) -> pd.DataFrame:
+    """Sort enrichment results by GO ID."""
+    return enrichment.sort_values("GO ID").reset_index(drop=True)
+
+
+def test_run_enrichment_sharded(fake_gopher, data) -> None:
+    """Test run_enrichment() merges the shards into the result of a serial run."""
+    serial = go_enrichment.run_enrichment(data=data, n_workers=1)
+    progress = []
+
+    sharded = go_enrichment.run_enrichment(
+        data=data, n_workers=3, shards_per_worker=2, progress_callback=progress.append
+    )
+
+    pd.testing.assert_frame_equal(sort_terms(sharded), sort_terms(serial))
+    assert fake_gopher.load_annotations == 2
+    assert fake_gopher.test_enrichment == 1 + 6
+    assert progress[-1] == 1.0
+
+
+def test_select_samples(fake_gopher, data) -> None:
+    """Test select_samples() equals testing only the selected samples."""
+    samples = ["S7", "S2", "S5"]
+    enrichment = go_enrichment.run_enrichment(data=data, n_workers=1)
+
+    selected = go_enrichment.select_samples(enrichment=enrichment, samples=samples)
+    subset = go_enrichment.run_enrichment(data=data[samples], n_workers=1)
+
+    assert list(selected.columns[3:]) == ["S2", "S5", "S7"]
+    pd.testing.assert_frame_equal(
+        sort_terms(selected), sort_terms(subset[list(selected.columns)])
+    )
+
+
+def test_get_go_enrichment_ignores_data(fake_gopher, data) -> None:
+    """Test get_go_enrichment() is cached by the dataset and data name only."""
+    enrichment = go_enrichment.get_go_enrichment(
+        dataset_name="test_get_go_enrichment", data_name="quant_proteins", data=data
+    )
+    n_calls = fake_gopher.test_enrichment
+
+    cached = go_enrichment.get_go_enrichment(
+        dataset_name="test_get_go_enrichment",
+        data_name="quant_proteins",
+        data=data[["S0", "S1"]],
+    )
+    other = go_enrichment.get_go_enrichment(
+        dataset_name="test_get_go_enrichment", data_name="peptides", data=data
+    )
+
+    assert cached is enrichment
+    assert other is not enrichment
+    assert fake_gopher.test_enrichment > n_calls
+    assert fake_gopher.load_annotations == 2
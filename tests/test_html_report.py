@@ -0,0 +1,26 @@
+"""tests/test_html_report module."""
+import base64
+
+import numpy as np
+
+from talus_standard_report.engines.html_report import (
+    MIN_TYPED_ARRAY_LENGTH,
+    encode_typed_array,
+)
+
+
+def test_encode_typed_array() -> None:
+    """Test encode_typed_array() round trips long numeric arrays only."""
+    values = np.arange(2 * MIN_TYPED_ARRAY_LENGTH, dtype=np.int64).reshape(2, -1)
+
+    encoded = encode_typed_array(values)
+    decoded = np.frombuffer(base64.b64decode(encoded["bdata"]), dtype=encoded["dtype"])
+
+    assert encoded["dtype"] == "f8"
+    assert encoded["shape"] == [2, MIN_TYPED_ARRAY_LENGTH]
+    np.testing.assert_array_equal(decoded.reshape(encoded["shape"]), values)
+    assert encode_typed_array(list(range(MIN_TYPED_ARRAY_LENGTH))) != list(
+        range(MIN_TYPED_ARRAY_LENGTH)
+    )
+    assert encode_typed_array([1.0, 2.0]) == [1.0, 2.0]
+    assert encode_typed_array(["a"] * MIN_TYPED_ARRAY_LENGTH) == ["a"] * MIN_TYPED_ARRAY_LENGTH
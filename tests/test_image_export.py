@@ -0,0 +1,135 @@
+"""tests/test_image_export module."""
+import gc
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.graph_objects as go
+
+from talus_standard_report.constants import MAX_PDF_RENDER_WORKERS
+from talus_standard_report.engines import image_export
+
+
+class FakeScope:
+    """A renderer that waits until every PDF export worker is rendering a figure."""
+
+    barrier = threading.Barrier(MAX_PDF_RENDER_WORKERS, timeout=5)
+    n_started = 0
+
+    def __init__(self):
+        """Count the started renderers."""
+        FakeScope.n_started += 1
+
+    def transform(self, figure: dict, format: str) -> bytes:
+        """Render the title of a figure."""
+        self.barrier.wait()
+        return f"{figure['layout']['title']['text']}.{format}".encode()
+
+
+def test_kaleido_pool_renders_concurrently(monkeypatch) -> None:
+    """Test KaleidoPool renders the figures of every PDF export worker at once."""
+    monkeypatch.setattr(image_export, "PlotlyScope", FakeScope)
+    figures = [
+        go.Figure(layout={"title": f"fig{i}"})
+        for i in range(2 * MAX_PDF_RENDER_WORKERS)
+    ]
+    pool = image_export.KaleidoPool()
+
+    with ThreadPoolExecutor(max_workers=MAX_PDF_RENDER_WORKERS) as executor:
+        images = list(
+            executor.map(lambda fig: pool.render(fig=fig, image_format="png"), figures)
+        )
+
+    assert images == [f"fig{i}.png".encode() for i in range(len(figures))]
+    assert FakeScope.n_started == MAX_PDF_RENDER_WORKERS
+
+
+class CountingScope:
+    """A renderer that counts the renderers started and the figures rendered."""
+
+    n_started = 0
+    n_rendered = 0
+
+    def __init__(self):
+        """Count the started renderers."""
+        CountingScope.n_started += 1
+
+    def transform(self, figure: dict, format: str) -> bytes:
+        """Render the title of a figure."""
+        CountingScope.n_rendered += 1
+        return f"{figure['layout']['title']['text']}.{format}".encode()
+
+
+def test_kaleido_pool_reuses_renderers(monkeypatch) -> None:
+    """Test KaleidoPool only starts a renderer when all started ones are busy."""
+    monkeypatch.setattr(image_export, "PlotlyScope", CountingScope)
+    monkeypatch.setattr(CountingScope, "n_started", 0)
+    monkeypatch.setattr(CountingScope, "n_rendered", 0)
+    pool = image_export.KaleidoPool(size=2)
+
+    for i in range(3):
+        pool.render(fig=go.Figure(layout={"title": f"fig{i}"}), image_format="svg")
+
+    assert CountingScope.n_started == 1
+    assert CountingScope.n_rendered == 3
+
+
+def test_figure_content_hash() -> None:
+    """Test figure_content_hash() is memoized per figure until it is collected."""
+    fig = go.Figure(layout={"title": "test_figure_content_hash"})
+    figure_hash = image_export.figure_content_hash(fig=fig)
+    fig_id = id(fig)
+
+    assert image_export._FIGURE_HASHES[fig_id] == figure_hash
+    assert (
+        image_export.figure_content_hash(
+            fig=go.Figure(layout={"title": "test_figure_content_hash"})
+        )
+        == figure_hash
+    )
+    assert (
+        image_export.figure_content_hash(
+            fig=go.Figure(layout={"title": "test_figure_content_hash 2"})
+        )
+        != figure_hash
+    )
+
+    del fig
+    gc.collect()
+    assert fig_id not in image_export._FIGURE_HASHES
+
+
+def test_render_image_cache(monkeypatch) -> None:
+    """Test render_image() renders once per content and format, least recent out."""
+    pool = image_export.KaleidoPool()
+    monkeypatch.setattr(image_export, "PlotlyScope", CountingScope)
+    monkeypatch.setattr(image_export, "get_kaleido_pool", lambda: pool)
+    cache = OrderedDict()
+    monkeypatch.setattr(image_export, "get_image_cache", lambda: cache)
+    monkeypatch.setattr(image_export, "MAX_CACHED_IMAGES", 2)
+    monkeypatch.setattr(CountingScope, "n_rendered", 0)
+
+    def render(title: str, image_format: str = "png") -> bytes:
+        fig = go.Figure(layout={"title": title})
+        return image_export.render_image(fig=fig, image_format=image_format)
+
+    assert render("a") == b"a.png"
+    assert render("a") == b"a.png"
+    assert CountingScope.n_rendered == 1
+
+    # A changed figure has a new hash, and so does another format
+    assert render("b") == b"b.png"
+    assert render("a", image_format="svg") == b"a.svg"
+    assert CountingScope.n_rendered == 3
+    assert (
+        image_export.get_cached_image(
+            figure_hash=image_export.figure_content_hash(
+                fig=go.Figure(layout={"title": "a"})
+            ),
+            image_format="png",
+        )
+        is None
+    )
+    assert render("b") == b"b.png"
+    assert CountingScope.n_rendered == 3
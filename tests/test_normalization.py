@@ -0,0 +1,70 @@
+"""tests/test_normalization module."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from talus_standard_report.engines.normalization import normalize
+
+
+DATA = pd.DataFrame(
+    {
+        "A": [1.0, 2.0, np.nan, 4.0],
+        "B": [4.0, np.nan, 2.0, 8.0],
+        "C": [3.0, 6.0, 9.0, 12.0],
+    },
+    index=["P1", "P2", "P3", "P4"],
+)
+
+
+def test_normalize_median() -> None:
+    """Test normalize() with how='median'."""
+    expected = DATA / DATA.median()
+    actual = normalize(df=DATA, how="median")
+
+    assert actual.dtypes.eq(np.float32).all()
+    np.testing.assert_allclose(actual.values, expected.values, rtol=1e-6)
+
+
+def test_normalize_row_and_column() -> None:
+    """Test normalize() with how='row' and how='column'."""
+    expected_row = DATA.div(DATA.sum(axis=1), axis=0)
+    expected_column = DATA / DATA.sum()
+
+    np.testing.assert_allclose(
+        normalize(df=DATA, how="Row").values, expected_row.values, rtol=1e-6
+    )
+    np.testing.assert_allclose(
+        normalize(df=DATA, how="Column").values, expected_column.values, rtol=1e-6
+    )
+
+
+def test_normalize_min_max() -> None:
+    """Test normalize() with how='min-max'."""
+    expected = (DATA - DATA.min()) / (DATA.max() - DATA.min())
+    actual = normalize(df=DATA, how="min-max")
+
+    np.testing.assert_allclose(actual.values, expected.values, rtol=1e-6)
+
+
+def test_normalize_quantile() -> None:
+    """Test normalize() with how='quantile' keeps missing values missing."""
+    actual = normalize(df=DATA, how="quantile")
+
+    assert actual.isna().equals(DATA.isna())
+    # The smallest value of every column maps to the mean of the column minima
+    assert actual.loc["P1", "A"] == pytest.approx((1.0 + 2.0 + 3.0) / 3)
+    assert actual.loc["P3", "B"] == pytest.approx((1.0 + 2.0 + 3.0) / 3)
+    # Only column C has a fourth value
+    assert actual.loc["P4", "C"] == pytest.approx(12.0)
+
+
+def test_normalize_none() -> None:
+    """Test normalize() returns the data unchanged without a method."""
+    assert normalize(df=DATA, how=None) is DATA
+    assert normalize(df=DATA, how="None") is DATA
+
+
+def test_normalize_invalid() -> None:
+    """Test normalize() with an invalid method."""
+    with pytest.raises(ValueError):
+        normalize(df=DATA, how="invalid")
@@ -0,0 +1,67 @@
+"""tests/test_overlap module."""
+import pandas as pd
+
+from talus_standard_report.engines.overlap import ProteinBitsets, protein_sets
+from talus_standard_report.engines.protein_index import ProteinIndex, protein_names
+
+
+SETS = {
+    "A": ["P1", "P2", "P3", "P4"],
+    "B": ["P2", "P3", "P5"],
+    "C": ["P3", "P6"],
+}
+
+
+def test_protein_bitsets_intersection_size() -> None:
+    """Test ProteinBitsets.intersection_size() and ProteinBitsets.set_sizes."""
+    protein_bitsets = ProteinBitsets(sets=SETS)
+
+    assert protein_bitsets.set_sizes.to_dict() == {"A": 4, "B": 3, "C": 2}
+    assert protein_bitsets.intersection_size(names=["A", "B"]) == 2
+    assert protein_bitsets.intersection_size(names=["A", "B", "C"]) == 1
+
+
+def test_protein_bitsets_intersections() -> None:
+    """Test ProteinBitsets.intersections() counts every protein exactly once."""
+    protein_bitsets = ProteinBitsets(sets=SETS)
+
+    actual = protein_bitsets.intersections(names=["A", "B"])
+
+    expected = pd.DataFrame(
+        {
+            "A": [True, True, False],
+            "B": [False, True, True],
+            "Size": [2, 2, 1],
+        }
+    )
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    assert protein_bitsets.intersections(max_intersections=2).shape[0] == 2
+
+
+def test_protein_sets_match_protein_groups() -> None:
+    """Test protein_sets() matches lists by any group member and by accession."""
+    proteins = pd.Series(
+        ["sp|P1|ABC_HUMAN;sp|P2|DEF_HUMAN", "sp|P3|GHI_HUMAN", "sp|P4|JKL_HUMAN"]
+    )
+    data = pd.DataFrame(
+        {"Sample": [True, False, True]}, index=protein_names(proteins=proteins)
+    )
+    collections = pd.DataFrame({"Nuclear": ["DEF", "GHI", "XYZ"]})
+
+    sets = protein_sets(
+        data=data,
+        collections=collections,
+        protein_index=ProteinIndex(proteins=proteins),
+        custom_proteins=frozenset({"P2", "P4", "Q9"}),
+    )
+    protein_bitsets = ProteinBitsets(sets=sets)
+
+    assert sets["Nuclear"] == {"ABC", "GHI", "XYZ"}
+    assert sets["Custom Proteins"] == {"ABC", "JKL", "Q9"}
+    assert protein_bitsets.intersection_size(names=["Measured Proteins", "Nuclear"]) == 2
+    assert (
+        protein_bitsets.intersection_size(
+            names=["Measured Proteins", "Nuclear", "Custom Proteins", "Sample"]
+        )
+        == 1
+    )
@@ -0,0 +1,131 @@
+"""tests/test_pca module."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sklearn.decomposition import PCA, TruncatedSVD
+
+from talus_standard_report.engines.pca import (
+    IMPUTATION_METHODS,
+    fit_pca,
+    get_top_loadings,
+)
+
+
+def low_rank_data() -> pd.DataFrame:
+    """Get positive rank 3 intensities of 30 features in 40 samples."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        rng.random((30, 3)) @ rng.random((3, 40)) + 1,
+        index=[f"F{i}" for i in range(30)],
+        columns=[f"S{i}" for i in range(40)],
+    )
+
+
+@pytest.fixture
+def data() -> pd.DataFrame:
+    """Get low rank intensities with missing values and a feature never observed."""
+    data = low_rank_data()
+    data[np.random.default_rng(1).random(data.shape) < 0.1] = np.nan
+    data.iloc[0] = np.nan
+    return data
+
+
+def assert_scores_equal(actual: np.ndarray, expected: np.ndarray) -> None:
+    """Assert two score matrices are equal up to the sign of every component."""
+    signs = np.sign((actual * expected).sum(axis=0))
+    np.testing.assert_allclose(actual * signs, expected, rtol=1e-3, atol=1e-3)
+
+
+@pytest.mark.parametrize("imputation", IMPUTATION_METHODS)
+def test_fit_pca_imputation(data, imputation) -> None:
+    """Test fit_pca() imputes every feature with its own statistic."""
+    observed = data.iloc[1:]
+    fill_values = {
+        "zero": pd.Series(0.0, index=observed.index),
+        "min": observed.min(axis=1),
+        "mean": observed.mean(axis=1),
+        "median": observed.median(axis=1),
+    }[imputation]
+    imputed = observed.T.fillna(fill_values)
+
+    result = fit_pca(data=data, imputation=imputation, solver="full")
+
+    assert list(result.loadings.index) == list(observed.index)
+    assert_scores_equal(
+        result.scores.to_numpy(), PCA(n_components=3).fit_transform(imputed)
+    )
+
+
+def test_fit_pca_log_transform(data) -> None:
+    """Test fit_pca() takes the log2 of positive values and imputes the others."""
+    data.iloc[1, :5] = 0
+    data.iloc[2, 5] = -1
+    observed = np.log2(data.iloc[1:].where(data.iloc[1:] > 0))
+
+    result = fit_pca(data=data, imputation="mean", log_transform=True, solver="full")
+
+    assert_scores_equal(
+        result.scores.to_numpy(),
+        PCA(n_components=3).fit_transform(observed.T.fillna(observed.mean(axis=1))),
+    )
+
+
+def test_fit_pca_uncentered(data) -> None:
+    """Test fit_pca() fits a truncated SVD of the uncentered data."""
+    values = data.iloc[1:].T.fillna(0).to_numpy()
+
+    result = fit_pca(data=data, center=False, solver="full")
+
+    assert isinstance(result.model, TruncatedSVD)
+    np.testing.assert_allclose(
+        result.model.singular_values_,
+        np.linalg.svd(values, compute_uv=False)[:3],
+        rtol=1e-4,
+    )
+    assert_scores_equal(
+        result.scores.to_numpy(),
+        TruncatedSVD(n_components=3, algorithm="arpack").fit_transform(values),
+    )
+    with pytest.raises(ValueError):
+        fit_pca(data=data, center=False, solver="incremental")
+
+
+def test_fit_pca_incremental(data) -> None:
+    """Test the incremental solver agrees with a full PCA."""
+    full = fit_pca(data=low_rank_data(), solver="full")
+
+    incremental = fit_pca(data=low_rank_data(), solver="incremental", batch_size=8)
+
+    np.testing.assert_allclose(
+        incremental.explained_variance_ratio,
+        full.explained_variance_ratio,
+        rtol=1e-3,
+    )
+    assert_scores_equal(incremental.scores.to_numpy(), full.scores.to_numpy())
+    with pytest.raises(ValueError):
+        fit_pca(data=data, imputation="median", solver="incremental", batch_size=8)
+
+
+def test_get_top_loadings(data) -> None:
+    """Test get_top_loadings() selects the largest absolute loadings once per dataset."""
+    loadings = fit_pca(data=data).loadings
+
+    top_loadings = get_top_loadings(
+        dataset_name="test_get_top_loadings",
+        data_name="quant_peptides",
+        data=data,
+        k=5,
+    )
+    cached = get_top_loadings(
+        dataset_name="test_get_top_loadings",
+        data_name="quant_peptides",
+        data=data.iloc[:10],
+        k=5,
+    )
+
+    assert cached is top_loadings
+    assert list(top_loadings.columns) == ["pc1", "pc2", "pc3"]
+    for column in top_loadings.columns:
+        expected = loadings[column].abs().sort_values(ascending=False).index[:5]
+        assert list(top_loadings[column]) == list(expected)
@@ -0,0 +1,117 @@
+"""tests/test_pdf module."""
+import io
+import itertools
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import fpdf
+import pandas as pd
+import plotly.graph_objects as go
+
+from PIL import Image
+
+from talus_standard_report import utils
+
+
+def png_image() -> bytes:
+    """Get a small png image."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), color=(0, 20, 37)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_print_figures_reuses_page_assets(monkeypatch, tmp_path) -> None:
+    """Test a re-export only renders the figures whose content or description changed."""
+    rendered = []
+
+    def render(fig: go.Figure, image_format: str) -> bytes:
+        rendered.append(fig.layout.title.text)
+        return png_image()
+
+    monkeypatch.setattr(
+        utils, "get_kaleido_pool", lambda: SimpleNamespace(render=render)
+    )
+    figures = [
+        SimpleNamespace(
+            title=f"Figure {i}",
+            figure=go.Figure(layout={"title": f"test_print_figures {i}"}),
+            data=None,
+            description=f"Description {i}",
+        )
+        for i in range(3)
+    ]
+
+    def export() -> None:
+        pdf = utils.PDF()
+        pdf.set_title("Report")
+        pdf.print_figures(figures=figures)
+        pdf.write_pdf(path=tmp_path / "report.pdf")
+
+    export()
+    assert sorted(rendered) == [f"test_print_figures {i}" for i in range(3)]
+
+    figures[1].description = "A new description"
+    export()
+    export()
+    assert sorted(rendered) == [f"test_print_figures {i}" for i in (0, 1, 1, 2)]
+
+
+def test_table_repeats_header() -> None:
+    """Test PDF.table() draws the header again at the top of every page it spans."""
+    pdf = utils.PDF()
+    pdf.set_title("Report")
+    pdf.add_page()
+    cells = []
+    draw_cell = pdf.cell
+
+    def cell(**kwargs) -> None:
+        cells.append((pdf.page_no(), kwargs["txt"]))
+        draw_cell(**kwargs)
+
+    pdf.cell = cell
+    pdf.table(df=pd.DataFrame({"Protein": [f"P{i}" for i in range(100)], "Value": 1}))
+
+    pages = sorted({page for page, _ in cells})
+    assert len(pages) > 1
+    for page in pages[1:]:
+        # The page title, then the table header
+        texts = [text for cell_page, text in cells if cell_page == page]
+        assert texts[:3] == ["Report", "Protein", "Value"]
+    assert [text for _, text in cells].count("Protein") == len(pages)
+
+
+def test_fit_text() -> None:
+    """Test PDF._fit_text() shortens text with '...' until it fits."""
+    pdf = utils.PDF()
+    pdf.set_title("Report")
+    pdf.add_page()
+    pdf.set_font(family="Helvetica", size=8)
+
+    assert pdf._fit_text(text="CDK9", width=50) == "CDK9"
+    shortened = pdf._fit_text(text="A very long protein description", width=20)
+    assert shortened.endswith("...")
+    assert "A very long protein description".startswith(shortened[:-3])
+    assert pdf.get_string_width(s=shortened) <= 20
+
+
+def test_content_hash_ignores_creation_date(monkeypatch) -> None:
+    """Test equal reports created at different times have equal hashes."""
+    # Every report is created a day after the previous one
+    dates = (datetime(2021, 9, day, 12, 0, 0) for day in itertools.count(start=1))
+    monkeypatch.setattr(fpdf.fpdf, "datetime", SimpleNamespace(now=lambda: next(dates)))
+
+    def report(text: str) -> utils.PDF:
+        pdf = utils.PDF()
+        pdf.set_title("Report")
+        pdf.add_page()
+        pdf.chapter_title(num=1, label=text)
+        pdf.close()
+        return pdf
+
+    first, second = report(text="Figure"), report(text="Figure")
+
+    assert first.buffer != second.buffer
+    assert first.content_hash() == second.content_hash()
+    assert first.content_hash(chunk_size=7) == first.content_hash()
+    assert report(text="Other figure").content_hash() != first.content_hash()
@@ -0,0 +1,62 @@
+"""tests/test_protein_collections module."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from talus_standard_report.engines.protein_collections import ProteinCollectionLibrary
+
+
+def test_protein_collection_library(tmp_path) -> None:
+    """Test ProteinCollectionLibrary keeps every version across reopening."""
+    library = ProteinCollectionLibrary(path=tmp_path)
+    assert library.names == []
+
+    assert library.save(name="Kinases", proteins=["CDK9", "BRD4"]) == 1
+    assert library.save(name="TFs", proteins=["MYC", "CDK9"]) == 1
+    assert library.save(name="Kinases", proteins=["CDK9", "AAK1"]) == 2
+
+    reopened = ProteinCollectionLibrary(path=tmp_path)
+    assert reopened.names == ["Kinases", "TFs"]
+    assert reopened.versions(name="Kinases") == [1, 2]
+    assert reopened.proteins(name="Kinases", version=1) == {"CDK9", "BRD4"}
+    assert reopened.proteins(name="Kinases") == {"CDK9", "AAK1"}
+    assert reopened.proteins(name="TFs") == {"MYC", "CDK9"}
+    with pytest.raises(ValueError):
+        reopened.proteins(name="Degraders")
+
+
+def test_protein_collection_library_reloads(tmp_path) -> None:
+    """Test ProteinCollectionLibrary sees the saves of another instance."""
+    library = ProteinCollectionLibrary(path=tmp_path)
+    other = ProteinCollectionLibrary(path=tmp_path)
+    library.save(name="Kinases", proteins=["CDK9", "BRD4"])
+    assert other.proteins(name="Kinases") == {"CDK9", "BRD4"}
+
+    library.save(name="Kinases", proteins=["AAK1"])
+    library.save(name="TFs", proteins=["MYC"])
+
+    assert other.versions(name="Kinases") == [1, 2]
+    assert other.proteins(name="TFs") == {"MYC"}
+    # Only the current and the previous generations are kept
+    assert len(list(tmp_path.glob("generation-*"))) == 2
+
+
+def test_protein_collection_library_concurrent_saves(tmp_path) -> None:
+    """Test saves of separate instances are serialized by the directory lock."""
+    libraries = [ProteinCollectionLibrary(path=tmp_path) for _ in range(4)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        versions = list(
+            executor.map(
+                lambda i: libraries[i % 4].save(name="Kinases", proteins=[f"P{i}"]),
+                range(20),
+            )
+        )
+
+    assert sorted(versions) == list(range(1, 21))
+    reopened = ProteinCollectionLibrary(path=tmp_path)
+    assert {
+        protein
+        for version in reopened.versions(name="Kinases")
+        for protein in reopened.proteins(name="Kinases", version=version)
+    } == {f"P{i}" for i in range(20)}
@@ -0,0 +1,44 @@
+"""tests/test_protein_index module."""
+import numpy as np
+
+from talus_standard_report.engines.protein_index import ProteinIndex, protein_keys
+
+
+PROTEINS = ["sp|P1|ABC_HUMAN;sp|P2|DEF_HUMAN", "sp|P3|GHI_HUMAN", "JKL"]
+
+
+def test_protein_keys() -> None:
+    """Test protein_keys() on a protein group."""
+    assert protein_keys(PROTEINS[0]) == ["P1", "ABC_HUMAN", "ABC", "P2", "DEF_HUMAN", "DEF"]
+    assert protein_keys(PROTEINS[2]) == ["JKL"]
+
+
+def test_protein_index_positions() -> None:
+    """Test ProteinIndex.positions() and ProteinIndex.matches()."""
+    protein_index = ProteinIndex(proteins=PROTEINS)
+
+    np.testing.assert_array_equal(
+        protein_index.positions(proteins=["DEF", "P3", "XYZ", "ABC_HUMAN"]), [0, 1]
+    )
+    assert protein_index.positions(proteins=["XYZ"]).shape == (0,)
+    assert protein_index.matches(proteins={"DEF", "JKL", "XYZ"}) == {"DEF", "JKL"}
+    assert protein_index.n_rows == 3
+
+
+def test_protein_index_measured_names() -> None:
+    """Test ProteinIndex.measured_names() names matched rows after the protein."""
+    protein_index = ProteinIndex(proteins=PROTEINS + ["sp|P4|ABC_MOUSE", None])
+
+    assert protein_index.measured_names(proteins=set()) == {"ABC", "GHI", "JKL"}
+    assert protein_index.measured_names(proteins={"P2", "XYZ"}) == {
+        "P2",
+        "ABC",
+        "GHI",
+        "JKL",
+    }
+    assert protein_index.measured_names(proteins={"P2", "P4", "GHI_HUMAN"}) == {
+        "P2",
+        "P4",
+        "GHI_HUMAN",
+        "JKL",
+    }
@@ -0,0 +1,45 @@
+"""tests/test_protein_lists module."""
+import pandas as pd
+import pytest
+
+from talus_standard_report.engines.protein_lists import (
+    detect_format,
+    normalize_proteins,
+    parse_protein_list,
+)
+
+
+def test_normalize_proteins() -> None:
+    """Test normalize_proteins() on headers, entry names, groups and accessions."""
+    proteins = pd.Series(
+        [">sp|P1|ABC_HUMAN Some protein", "DEF_HUMAN", "sp|P3|GHI_HUMAN;P4", None, " "]
+    )
+
+    assert list(normalize_proteins(proteins=proteins)) == ["ABC", "DEF", "GHI", "P4"]
+
+
+@pytest.mark.parametrize(
+    "content,file_name,kind,expected",
+    [
+        (b">sp|P1|ABC_HUMAN\nMKV\n>sp|P2|DEF_HUMAN\nMKL\n", "a.fasta", "fasta", {"ABC", "DEF"}),
+        (b"P1\nsp|P2|DEF_HUMAN\n\n", "a.txt", "list", {"P1", "DEF"}),
+        (b"Gene\tProtein\nX\tsp|P1|ABC_HUMAN\nY\tP2\n", "a.txt", "table", {"ABC", "P2"}),
+        (b"Protein\nsp|P1|ABC_HUMAN\n", "a.csv", "table", {"ABC"}),
+        (
+            b'Protein,Description\nsp|P1|ABC_HUMAN,"Kinase, putative"\nP2,Other\n',
+            "a.txt",
+            "table",
+            {"ABC", "P2"},
+        ),
+        (b"sp|P1|ABC_HUMAN;P4\nP2\nP3\n", "a.txt", "list", {"ABC", "P2", "P3", "P4"}),
+    ],
+)
+def test_parse_protein_list(content, file_name, kind, expected) -> None:
+    """Test parse_protein_list() on every supported format."""
+    list_format = detect_format(head=content, file_name=file_name)
+    protein_column = "Protein" if kind == "table" else None
+
+    assert list_format.kind == kind
+    assert parse_protein_list(
+        content=content, list_format=list_format, protein_column=protein_column
+    ) == frozenset(expected)
@@ -0,0 +1,71 @@
+"""tests/test_ranking module."""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from talus_standard_report.engines.ranking import (
+    RankIndex,
+    ranking_scores,
+    top_k_indices,
+)
+
+
+def test_top_k_indices() -> None:
+    """Test top_k_indices() ranks missing values last and ties by index."""
+    values = np.array([1.0, np.nan, 3.0, 3.0, 2.0])
+
+    np.testing.assert_array_equal(top_k_indices(values=values, k=3), [2, 3, 4])
+    np.testing.assert_array_equal(top_k_indices(values=values, k=9), [2, 3, 4, 0, 1])
+    assert top_k_indices(values=values, k=0).shape == (0,)
+    np.testing.assert_array_equal(
+        top_k_indices(values=np.stack([values, -values], axis=1), k=2),
+        [[2, 0], [3, 4]],
+    )
+
+
+def test_ranking_scores() -> None:
+    """Test ranking_scores() against the scores computed row by row."""
+    values = np.array(
+        [
+            [1.0, 2.0, 3.0, 4.0],
+            [2.0, np.nan, 6.0, 6.0],
+            [np.nan, np.nan, 5.0, 1.0],
+        ]
+    )
+
+    scores = ranking_scores(values=values, groups=["a", "a", "b", "b"])
+
+    np.testing.assert_allclose(scores["Max Intensity"], [4.0, 6.0, 5.0])
+    np.testing.assert_allclose(scores["Variance"], np.nanvar(values, axis=1))
+    np.testing.assert_allclose(
+        scores["Coefficient of Variation"],
+        [np.std([1.5, 3.5]) / 2.5, np.std([2.0, 6.0]) / 4.0, 0.0],
+    )
+    np.testing.assert_allclose(scores["Missingness"], [0.0, -0.25, -0.5])
+
+
+def test_rank_index() -> None:
+    """Test RankIndex windows and ranks agree with a full sort, also when shared."""
+    rng = np.random.default_rng(0)
+    scores = rng.random(1000)
+    scores[rng.choice(1000, size=50, replace=False)] = np.nan
+    expected = top_k_indices(values=scores, k=len(scores))
+
+    rank_index = RankIndex(scores=scores)
+    np.testing.assert_array_equal(rank_index.window(start=10, size=5), expected[10:15])
+    np.testing.assert_array_equal(rank_index.window(start=0, size=20), expected[:20])
+    positions = np.array([expected[500], expected[3], expected[990]])
+    np.testing.assert_array_equal(
+        rank_index.rank(positions=positions), expected[[3, 500, 990]]
+    )
+
+    shared_index = RankIndex(scores=scores)
+    starts = list(range(0, 1000, 37))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        windows = list(
+            executor.map(
+                lambda start: shared_index.window(start=start, size=37), starts
+            )
+        )
+    for start, window in zip(starts, windows):
+        np.testing.assert_array_equal(window, expected[start : start + 37])
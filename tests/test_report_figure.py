@@ -0,0 +1,54 @@
+"""tests/test_report_figure module."""
+import pandas as pd
+
+from talus_standard_report.figures import report_figure_abstract_class
+from talus_standard_report.figures.report_figure_abstract_class import (
+    ReportFigureAbstractClass,
+)
+
+
+class TableFigure(ReportFigureAbstractClass):
+    """A figure that only shows its data."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    def preprocess_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Keep the data unchanged."""
+        return data
+
+    def get_figure(self, *args, **kwargs) -> None:
+        """Plot nothing."""
+
+    def display(self, *args, **kwargs) -> None:
+        """Display nothing."""
+
+
+def test_parameters(monkeypatch, tmp_path) -> None:
+    """Test the parameters of a figure are the state of its own widgets."""
+    monkeypatch.setattr(
+        report_figure_abstract_class.st,
+        "session_state",
+        {
+            "protein_heatmap_sort_by": "Variance",
+            "protein_heatmap_protein_collections": ["Kinases"],
+            "protein_heatmap_description": "Some wording",
+            "protein_heatmap_export_svg": False,
+            "go_enrichment_go_filters": ["GO:0005634"],
+        },
+    )
+    figure = TableFigure(
+        title="Protein Heatmap",
+        short_title="Protein Heatmap",
+        dataset_name="210308_MLLtx",
+        data=pd.DataFrame(),
+        description_placeholder="",
+        width=800,
+        height=600,
+        downloads_path=tmp_path,
+    )
+
+    assert figure.parameters == {
+        "protein_collections": ["Kinases"],
+        "sort_by": "Variance",
+    }
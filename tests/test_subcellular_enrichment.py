@@ -0,0 +1,43 @@
+"""tests/test_subcellular_enrichment module."""
+import numpy as np
+import pandas as pd
+
+from talus_standard_report.engines.subcellular_enrichment import (
+    subcellular_enrichment_scores,
+)
+
+
+def test_subcellular_enrichment_scores() -> None:
+    """Test subcellular_enrichment_scores() on a small dataset."""
+    detected = pd.DataFrame(
+        {"A": [True, True, True, False], "B": [True, False, True, True]},
+        index=["P1", "P2", "P3", "P4"],
+    )
+    protein_locations = pd.DataFrame(
+        {
+            "Entry name": ["P1", "P2", "P2", "P4", "P5"],
+            "Main location": ["Nucleus", "Cytosol", "Cytosol", "Nucleus", "Cytosol"],
+        }
+    )
+    expected_fractions_of_locations = pd.DataFrame(
+        {
+            "Main location": ["Nucleus", "Cytosol", "Mitochondria"],
+            "Expected Fraction": [0.5, 0.25, 0.25],
+        }
+    )
+
+    actual = subcellular_enrichment_scores(
+        detected=detected,
+        protein_locations=protein_locations,
+        expected_fractions_of_locations=expected_fractions_of_locations,
+    )
+
+    expected = np.array(
+        [
+            [(1 / 3) / 0.5, (2 / 3) / 0.5],
+            [(1 / 3) / 0.25, np.nan],
+            [np.nan, np.nan],
+        ]
+    )
+    assert list(actual.index) == ["Nucleus", "Cytosol", "Mitochondria"]
+    np.testing.assert_allclose(actual.values, expected)
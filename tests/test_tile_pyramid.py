@@ -0,0 +1,62 @@
+"""tests/test_tile_pyramid module."""
+import numpy as np
+import pandas as pd
+
+from talus_standard_report.engines.tile_pyramid import TilePyramid, get_tile_pyramid
+
+
+def test_tile_pyramid() -> None:
+    """Test TilePyramid averages pairs of rows, ignoring missing values."""
+    data = pd.DataFrame(
+        [[1.0, np.nan], [3.0, np.nan], [np.nan, 2.0], [5.0, 4.0], [7.0, 6.0]],
+        index=list("abcde"),
+        columns=["S1", "S2"],
+    )
+
+    pyramid = TilePyramid(data=data, tile_size=2)
+
+    assert pyramid.n_zoom_levels == 3
+    assert pyramid.value_range == (1.0, 7.0)
+    assert [pyramid.n_tiles(zoom=zoom) for zoom in range(3)] == [1, 2, 3]
+    pd.testing.assert_frame_equal(
+        pyramid.get_tile(zoom=0, tile=0),
+        pd.DataFrame(
+            [[3.0, 3.0], [7.0, 6.0]],
+            index=["a - d (4)", "e"],
+            columns=data.columns,
+            dtype=np.float32,
+        ),
+    )
+    pd.testing.assert_frame_equal(
+        pyramid.get_tile(zoom=1, tile=0),
+        pd.DataFrame(
+            [[2.0, np.nan], [5.0, 3.0]],
+            index=["a - b (2)", "c - d (2)"],
+            columns=data.columns,
+            dtype=np.float32,
+        ),
+    )
+    pd.testing.assert_frame_equal(
+        pyramid.get_tile(zoom=2, tile=2), data.iloc[4:].astype(np.float32)
+    )
+
+
+def test_get_tile_pyramid_positions() -> None:
+    """Test get_tile_pyramid() only includes the selected rows, in rank order."""
+    data = pd.DataFrame(
+        {"S1": [1.0, 8.0, 3.0, 6.0], "S2": [2.0, 7.0, 4.0, 5.0]},
+        index=["A", "B", "C", "D"],
+    )
+
+    pyramid = get_tile_pyramid(
+        dataset_name="test_get_tile_pyramid",
+        data_name="quant_proteins",
+        data=data,
+        how=None,
+        tile_size=4,
+        sort_by="Max Intensity",
+        positions=(0, 2, 3),
+    )
+
+    assert list(pyramid.get_tile(zoom=0, tile=0).index) == ["D", "C", "A"]
+    assert pyramid.value_range == (1.0, 6.0)